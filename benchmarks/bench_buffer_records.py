@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark buffer record encoding: JSON lines vs binary records.
+
+Encodes and decodes the same messages with encode_message/decode_message
+(the JSON line format of the original buffer file) and with
+encode_record/decode_record (the CRC-framed binary WAL format), and reports
+throughput and bytes per message for RFC 3164 syslog, RFC 5424 syslog with
+structured data, and SNMP traps.
+
+Usage:
+    python benchmarks/bench_buffer_records.py --messages 100000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mutt.listeners.syslog_listener import SyslogListener  # noqa: E402
+from mutt.models.message import MessageType, Severity, SNMPTrap  # noqa: E402
+from mutt.storage.serialization import (  # noqa: E402
+    decode_message, decode_record, encode_message, encode_record
+)
+
+RFC3164_LINES = [
+    b"<189>Oct  1 03:04:05 core-sw-01 %LINK-3-UPDOWN: Interface GigabitEthernet0/{n}, changed state to down",
+    b"<38>Feb 28 23:59:59 fw01.dc1.example.com sshd[{n}]: Failed password for root from 10.1.1.1 port 22 ssh2",
+    b"<86>Mar  3 12:00:00 web_01 CRON[{n}]: (root) CMD (run-parts /etc/cron.hourly)",
+]
+
+RFC5424_LINES = [
+    b'<165>1 2003-10-11T22:14:15.003Z mymachine.example.com evntslog {n} ID47 '
+    b'[exampleSDID@32473 iut="3" eventSource="Application" eventID="1011"] An application event log entry',
+    b'<165>1 2024-05-01T12:00:00.000001+02:00 core-sw-01 ifmgr {n} LINKDOWN '
+    b'[ifState@32473 ifIndex="{n}" ifName="Gi0/1" state="down"][origin ip="192.0.2.1"] Interface down',
+]
+
+
+def make_syslog(templates, count, rng):
+    listener = SyslogListener(asyncio.Queue())
+    return [
+        listener._parse_datagram(
+            rng.choice(templates).replace(b"{n}", str(rng.randint(0, 9999)).encode()),
+            f"10.0.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+        )
+        for _ in range(count)
+    ]
+
+
+def make_traps(count, rng):
+    return [
+        SNMPTrap(
+            source_ip=f"10.1.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+            message_type=MessageType.SNMP_TRAP,
+            severity=Severity.WARNING,
+            payload="linkDown",
+            oid="1.3.6.1.6.3.1.1.5.3",
+            varbinds={
+                "1.3.6.1.2.1.1.3.0": str(rng.randint(0, 10 ** 9)),
+                "1.3.6.1.2.1.2.2.1.1": str(rng.randint(1, 48)),
+                "1.3.6.1.2.1.2.2.1.2": f"GigabitEthernet0/{rng.randint(1, 48)}",
+            },
+            metadata={"hostname": "core-sw-01.example.net"}
+        )
+        for _ in range(count)
+    ]
+
+
+def rate(fn, items):
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return len(items) / (time.perf_counter() - start)
+
+
+def report(name, messages):
+    lines = [encode_message(msg) for msg in messages]
+    records = [encode_record(msg) for msg in messages]
+    json_bytes = sum(len(line.encode("utf-8")) + 1 for line in lines) / len(messages)
+    record_bytes = sum(len(record) for record in records) / len(messages)
+
+    json_encode = rate(encode_message, messages)
+    record_encode = rate(encode_record, messages)
+    json_decode = rate(decode_message, lines)
+    record_decode = rate(decode_record, records)
+    print(
+        f"{name:<10} {'encode':<7} {json_encode:>12,.0f} {record_encode:>12,.0f} "
+        f"{record_encode / json_encode:>7.2f}x {json_bytes:>7.0f} {record_bytes:>7.0f}"
+    )
+    print(
+        f"{'':<10} {'decode':<7} {json_decode:>12,.0f} {record_decode:>12,.0f} "
+        f"{record_decode / json_decode:>7.2f}x"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=100000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"{'corpus':<10} {'op':<7} {'json msg/s':>12} {'binary msg/s':>12} "
+          f"{'speedup':>8} {'json B':>7} {'bin B':>7}")
+    report("rfc3164", make_syslog(RFC3164_LINES, args.messages, rng))
+    report("rfc5424", make_syslog(RFC5424_LINES, args.messages, rng))
+    report("snmp", make_traps(args.messages, rng))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark MIB name resolution: startup time and per-trap lookups.
+
+Startup compares building the OID index from the MIB modules with loading
+it from the JSON cache file. Per-trap resolution annotates a corpus of
+interface and system traps (trap OID plus varbinds with instance suffixes)
+with MibResolver, with the LRU cold and warm, against resolving every OID
+through pysnmp's MibViewController.
+
+Usage:
+    python benchmarks/bench_mib_resolver.py --traps 20000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pysnmp.smi import builder, view  # noqa: E402
+
+from mutt.listeners.mib_resolver import MibResolver  # noqa: E402
+from mutt.models.message import MessageType, Severity, SNMPTrap  # noqa: E402
+
+MODULES = ["SNMPv2-MIB", "RFC1213-MIB", "SNMPv2-SMI"]
+
+TRAP_OIDS = [f"1.3.6.1.6.3.1.1.5.{n}" for n in range(1, 7)]
+
+
+def make_trap(rng, interfaces):
+    n = rng.randint(1, interfaces)
+    varbinds = {
+        "1.3.6.1.2.1.1.3.0": str(rng.getrandbits(31)),
+        "1.3.6.1.6.3.1.1.4.1.0": rng.choice(TRAP_OIDS),
+        f"1.3.6.1.2.1.2.2.1.1.{n}": str(n),
+        f"1.3.6.1.2.1.2.2.1.2.{n}": f"GigabitEthernet0/{n}",
+        f"1.3.6.1.2.1.2.2.1.7.{n}": "1",
+        f"1.3.6.1.2.1.2.2.1.8.{n}": "2",
+    }
+    return SNMPTrap(
+        source_ip="10.0.0.1", message_type=MessageType.SNMP_TRAP, severity=Severity.INFO,
+        payload="trap", oid=varbinds["1.3.6.1.6.3.1.1.4.1.0"], varbinds=varbinds
+    )
+
+
+def view_resolve(mib_view, oid):
+    arcs = tuple(int(arc) for arc in oid.split("."))
+    prefix, _, suffix = mib_view.get_node_name(arcs)
+    module, symbol, _ = mib_view.get_node_location(prefix)
+    name = f"{module}::{symbol}"
+    return name + "." + ".".join(map(str, suffix)) if suffix else name
+
+
+def view_annotate(mib_view, trap):
+    trap.trap_name = view_resolve(mib_view, trap.oid)
+    trap.varbind_names = {oid: view_resolve(mib_view, oid) for oid in trap.varbinds}
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--traps", type=int, default=20000)
+    parser.add_argument("--interfaces", type=int, default=48)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = os.path.join(tmp, "mib_index.json")
+
+        def load_resolver():
+            resolver = MibResolver(MODULES, cache_file=cache_file)
+            resolver.load()
+            return resolver
+
+        def load_view():
+            mib_builder = builder.MibBuilder()
+            mib_builder.load_modules(*MODULES)
+            return view.MibViewController(mib_builder)
+
+        view_ms, mib_view = timed(load_view)
+        build_ms, resolver = timed(load_resolver)
+        cache_ms, resolver = timed(load_resolver)
+        assert resolver.stats["from_cache"]
+
+    print(f"startup ({resolver.stats['index_size']} OIDs from {len(MODULES)} modules)")
+    print(f"  MibViewController     {view_ms:>8.1f} ms")
+    print(f"  index built from MIBs {build_ms:>8.1f} ms")
+    print(f"  index from cache      {cache_ms:>8.1f} ms  ({build_ms / cache_ms:.1f}x faster)")
+
+    rng = random.Random(42)
+    corpus = [make_trap(rng, args.interfaces) for _ in range(args.traps)]
+    view_annotate(mib_view, corpus[0])
+    expected = dict(corpus[0].varbind_names)
+    resolver.annotate(corpus[0])
+    assert corpus[0].varbind_names == expected, (corpus[0].varbind_names, expected)
+
+    print(f"\nper-trap resolution ({args.traps} traps, {len(corpus[0].varbinds) + 1} OIDs each)")
+    baseline = None
+    for name, fn in (
+        ("MibViewController", lambda trap: view_annotate(mib_view, trap)),
+        ("MibResolver, no LRU", lambda trap: (resolver._lru.clear(), resolver.annotate(trap))),
+        ("MibResolver, LRU", resolver.annotate),
+    ):
+        resolver.stats.update(hits=0, misses=0)
+        ms, _ = timed(lambda: [fn(trap) for trap in corpus])
+        traps_per_s = args.traps / (ms / 1000)
+        baseline = baseline or traps_per_s
+        print(f"  {name:<21} {traps_per_s:>10,.0f} traps/s  ({traps_per_s / baseline:.1f}x)")
+    stats = resolver.stats
+    print(f"  LRU hit rate (warm run) {stats['hits'] / (stats['hits'] + stats['misses']):.1%}")
+
+
+if __name__ == "__main__":
+    main()
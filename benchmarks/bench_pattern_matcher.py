@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark PatternMatcher against the original per-rule loop.
+
+Builds a synthetic rule file (mostly KEYWORD rules, some EXACT and REGEX)
+and reports messages/sec for each implementation as the rule count grows.
+
+Usage:
+    python benchmarks/bench_pattern_matcher.py --rules 50 400 1000
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mutt.models.message import Message, MessageType, Severity  # noqa: E402
+from mutt.models.rules import AlertRule, PatternType, ActionType  # noqa: E402
+from mutt.processors.pattern_matcher import PatternMatcher  # noqa: E402
+
+
+def naive_match(rules, msg):
+    matches = []
+    for rule in rules:
+        if not rule.enabled or not rule.pattern:
+            continue
+        if rule.pattern_type == PatternType.REGEX:
+            if re.search(rule.pattern, msg.payload, re.IGNORECASE):
+                matches.append(rule)
+        elif rule.pattern_type == PatternType.KEYWORD:
+            if rule.pattern.lower() in msg.payload.lower():
+                matches.append(rule)
+        elif rule.pattern_type == PatternType.EXACT:
+            if rule.pattern == msg.payload:
+                matches.append(rule)
+    return matches
+
+
+def make_rules(count, rng):
+    rules = []
+    for i in range(count):
+        roll = rng.random()
+        token = f"evt{i:05d}"
+        if roll < 0.8:
+            kind, pattern = PatternType.KEYWORD, f"{token} detected"
+        elif roll < 0.9:
+            kind, pattern = PatternType.EXACT, f"{token} exact payload"
+        else:
+            kind, pattern = PatternType.REGEX, rf"{token}\s+.*threshold \d+"
+        rules.append(AlertRule(id=f"r{i}", name=f"r{i}", pattern_type=kind,
+                               pattern=pattern, actions=[ActionType.STORE]))
+    return rules
+
+
+def make_messages(count, rng):
+    lines = [
+        "%LINK-3-UPDOWN: Interface GigabitEthernet0/{n}, changed state to down",
+        "%SEC-6-IPACCESSLOGP: list 101 denied tcp 10.0.{n}.1(3312) -> 10.1.1.1(22), 1 packet",
+        "%SYS-5-CONFIG_I: Configured from console by admin on vty{n}",
+        "evt{n:05d} detected on chassis",
+    ]
+    return [
+        Message(source_ip="10.0.0.1", message_type=MessageType.SYSLOG, severity=Severity.INFO,
+                payload=rng.choice(lines).format(n=rng.randint(0, 999)))
+        for _ in range(count)
+    ]
+
+
+def rate(fn, messages):
+    start = time.perf_counter()
+    for msg in messages:
+        fn(msg)
+    return len(messages) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rules", type=int, nargs="+", default=[50, 400, 1000])
+    parser.add_argument("--messages", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    messages = make_messages(args.messages, rng)
+    print(f"{'rules':>6} {'naive msg/s':>14} {'engine msg/s':>14} {'speedup':>8}")
+    for count in args.rules:
+        rules = make_rules(count, rng)
+        matcher = PatternMatcher(rules)
+        naive = rate(lambda m: naive_match(rules, m), messages)
+        engine = rate(matcher.match, messages)
+        print(f"{count:>6} {naive:>14,.0f} {engine:>14,.0f} {engine / naive:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark the message pipeline per message vs in batches.
+
+Runs MessageProcessor's validate -> match -> enrich -> route -> buffer stages
+over synthetic syslog messages, once through _process_message() and once
+through _process_batch() for each batch size. DNS answers come from a warm
+cache and the device registry is write-behind, so the numbers show pipeline
+overhead rather than I/O.
+
+Usage:
+    python benchmarks/bench_pipeline_batch.py --messages 50000 --batch-sizes 8 64 256
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mutt.models.message import MessageType, Severity, SyslogMessage  # noqa: E402
+from mutt.processors.dns_cache import DNSCache  # noqa: E402
+from mutt.processors.message_processor import MessageProcessor  # noqa: E402
+
+
+async def resolve(ip):
+    return f"dev-{ip.replace('.', '-')}.example.net"
+
+
+def make_messages(count, sources, rng):
+    return [
+        SyslogMessage(
+            source_ip=f"10.0.{s // 256}.{s % 256}",
+            message_type=MessageType.SYSLOG,
+            severity=Severity.INFO,
+            payload=f"%LINK-3-UPDOWN: Interface Gi0/{rng.randint(0, 48)}, changed state to down",
+            hostname="sw", process_name="kernel"
+        )
+        for s in (rng.randrange(sources) for _ in range(count))
+    ]
+
+
+async def run(args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        processor = MessageProcessor({
+            'storage': {
+                'db_path': os.path.join(tmp, 'bench.db'),
+                'buffer_dir': os.path.join(tmp, 'buffer'),
+            },
+        }, asyncio.Queue())
+        await processor.database.initialize()
+        await processor.writer.start()
+        processor.enricher.dns_cache = DNSCache(resolve)
+
+        rng = random.Random(42)
+        messages = make_messages(args.messages, args.sources, rng)
+        # Warm the DNS cache and registry so every run sees the same state
+        await processor._process_batch(messages[:args.sources * 4])
+
+        print(f"{'mode':>12} {'msgs/sec':>12} {'speedup':>8}")
+        start = time.perf_counter()
+        for msg in messages:
+            await processor._process_message(msg)
+        baseline = len(messages) / (time.perf_counter() - start)
+        print(f"{'per-message':>12} {baseline:>12,.0f} {1.0:>7.2f}x")
+
+        for batch_size in args.batch_sizes:
+            start = time.perf_counter()
+            for offset in range(0, len(messages), batch_size):
+                await processor._process_batch(messages[offset:offset + batch_size])
+            rate = len(messages) / (time.perf_counter() - start)
+            print(f"{'batch ' + str(batch_size):>12} {rate:>12,.0f} {rate / baseline:>7.2f}x")
+
+        await processor.file_buffer.flush()
+        await processor.writer.stop()
+        await processor.database.connection.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--sources", type=int, default=200, help="Distinct source IPs")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 64, 256])
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark SNMP trap intake under a local trap storm.
+
+A sender process blasts pre-encoded SNMPv2c traps (built with pysnmp) at an
+SNMPListener on localhost. Each mode runs in a fresh process so peak RSS is
+its own:
+
+- task:  the previous callback, one asyncio task per trap
+- batch: the current callback, which queues traps and decodes them in
+         bounded batches from a loop callback
+
+Reports traps/sec reaching the message queue, traps dropped by the pending
+cap and by the kernel, and the peak RSS of the listener process.
+
+Usage:
+    python benchmarks/bench_snmp_trap_storm.py --traps 50000
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import resource
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyasn1.codec.ber import encoder  # noqa: E402
+from pysnmp.proto import api  # noqa: E402
+
+from mutt.listeners.snmp_listener import SNMPListener  # noqa: E402
+
+
+class TaskPerTrapListener(SNMPListener):
+    """The previous callback: a task is created for every trap."""
+
+    def _cb_fun(self, snmpEngine, stateReference, contextEngineId, contextName, varBinds, cbCtx=None):
+        self.ingest_stats["parsed"] += 1
+        _, transport_address = snmpEngine.msgAndPduDsp.get_transport_info(stateReference)
+        asyncio.create_task(self.process_trap(varBinds, transport_address[0], stateReference))
+
+
+def encode_trap(n):
+    p_mod = api.PROTOCOL_MODULES[api.SNMP_VERSION_2C]
+    pdu = p_mod.SNMPv2TrapPDU()
+    p_mod.apiTrapPDU.set_defaults(pdu)
+    p_mod.apiTrapPDU.set_varbinds(pdu, list(p_mod.apiTrapPDU.get_varbinds(pdu)) + [
+        (p_mod.ObjectIdentifier(f"1.3.6.1.2.1.2.2.1.1.{n}"), p_mod.Integer(n)),
+        (p_mod.ObjectIdentifier(f"1.3.6.1.2.1.2.2.1.2.{n}"), p_mod.OctetString(f"GigabitEthernet0/{n}")),
+        (p_mod.ObjectIdentifier(f"1.3.6.1.2.1.2.2.1.8.{n}"), p_mod.Integer(2)),
+    ])
+    msg = p_mod.Message()
+    p_mod.apiMessage.set_defaults(msg)
+    p_mod.apiMessage.set_community(msg, "public")
+    p_mod.apiMessage.set_pdu(msg, pdu)
+    return encoder.encode(msg)
+
+
+def send_storm(port, count):
+    datagrams = [encode_trap(n % 48 + 1) for n in range(256)]
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        for n in range(count):
+            sock.sendto(datagrams[n % len(datagrams)], ("127.0.0.1", port))
+
+
+async def run_listener(mode, args, results):
+    queue = asyncio.Queue()
+    cls = TaskPerTrapListener if mode == "task" else SNMPListener
+    listener = cls(
+        queue, config={"listeners": {"snmp": {"communities": ["public"]}}},
+        port=0, host="127.0.0.1", recv_buffer_size=args.recv_buffer_mb * 1024 * 1024,
+        max_pending_traps=args.max_pending
+    )
+    await listener.start()
+    port = listener._sock.getsockname()[1]
+
+    consumed = 0
+    last_time = start = time.perf_counter()
+
+    async def consume():
+        nonlocal consumed, last_time
+        while True:
+            await queue.get()
+            consumed += 1
+            last_time = time.perf_counter()
+
+    consumer = asyncio.create_task(consume())
+    sender = multiprocessing.Process(target=send_storm, args=(port, args.traps))
+    sender.start()
+    while sender.is_alive() or time.perf_counter() - last_time < 1.0:
+        await asyncio.sleep(0.1)
+    sender.join()
+    consumer.cancel()
+
+    stats = listener.get_ingest_stats()
+    await listener.stop()
+    results.put({
+        "mode": mode,
+        "consumed": consumed,
+        "rate": consumed / (last_time - start),
+        "cap_dropped": listener.get_stats()["traps_dropped"] if mode == "batch" else 0,
+        "kernel_dropped": stats["kernel_dropped"],
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    })
+
+
+def run_mode(mode, args, results):
+    asyncio.run(run_listener(mode, args, results))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--traps", type=int, default=50000)
+    parser.add_argument("--recv-buffer-mb", type=int, default=32)
+    parser.add_argument("--max-pending", type=int, default=10000)
+    args = parser.parse_args()
+
+    results = multiprocessing.Queue()
+    print(f"{'mode':>6} {'traps/sec':>10} {'consumed':>9} {'cap drop':>9} {'kernel drop':>12} {'peak RSS MB':>12}")
+    for mode in ("task", "batch"):
+        process = multiprocessing.Process(target=run_mode, args=(mode, args, results))
+        process.start()
+        r = results.get()
+        process.join()
+        kernel = "n/a" if r["kernel_dropped"] is None else r["kernel_dropped"]
+        print(f"{r['mode']:>6} {r['rate']:>10,.0f} {r['consumed']:>9} {r['cap_dropped']:>9} "
+              f"{kernel:>12} {r['peak_rss_mb']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark SNMP varbind rendering: prettyPrint vs fast rendering.
+
+Decodes a corpus of SNMPv2c traps (linkDown-style interface traps and
+traps carrying counters, addresses and binary strings) with pysnmp once,
+then renders their variable bindings with render_varbinds_pretty() and
+render_varbinds(), and times the listener's whole trap -> SNMPTrap step in
+both of its varbind_rendering modes.
+
+Usage:
+    python benchmarks/bench_snmp_varbinds.py --traps 20000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyasn1.codec.ber import decoder, encoder  # noqa: E402
+from pysnmp.proto import api  # noqa: E402
+
+from mutt.listeners.snmp_listener import SNMPListener  # noqa: E402
+from mutt.listeners.snmp_varbinds import render_varbinds, render_varbinds_pretty  # noqa: E402
+
+P_MOD = api.PROTOCOL_MODULES[api.SNMP_VERSION_2C]
+
+
+def make_var_binds(rng):
+    n = rng.randint(1, 48)
+    if rng.random() < 0.5:
+        extra = [
+            (P_MOD.ObjectIdentifier(f"1.3.6.1.2.1.2.2.1.1.{n}"), P_MOD.Integer(n)),
+            (P_MOD.ObjectIdentifier(f"1.3.6.1.2.1.2.2.1.2.{n}"), P_MOD.OctetString(f"GigabitEthernet0/{n}")),
+            (P_MOD.ObjectIdentifier(f"1.3.6.1.2.1.2.2.1.7.{n}"), P_MOD.Integer(1)),
+            (P_MOD.ObjectIdentifier(f"1.3.6.1.2.1.2.2.1.8.{n}"), P_MOD.Integer(2)),
+        ]
+    else:
+        extra = [
+            (P_MOD.ObjectIdentifier(f"1.3.6.1.2.1.31.1.1.1.6.{n}"), P_MOD.Counter64(rng.getrandbits(48))),
+            (P_MOD.ObjectIdentifier(f"1.3.6.1.2.1.2.2.1.14.{n}"), P_MOD.Counter32(rng.getrandbits(31))),
+            (P_MOD.ObjectIdentifier(f"1.3.6.1.2.1.4.20.1.1.{n}"), P_MOD.IpAddress(f"192.0.2.{n}")),
+            (P_MOD.ObjectIdentifier(f"1.3.6.1.2.1.2.2.1.6.{n}"), P_MOD.OctetString(rng.randbytes(6))),
+        ]
+    pdu = P_MOD.SNMPv2TrapPDU()
+    P_MOD.apiTrapPDU.set_defaults(pdu)
+    P_MOD.apiTrapPDU.set_varbinds(pdu, list(P_MOD.apiTrapPDU.get_varbinds(pdu)) + extra)
+    msg = P_MOD.Message()
+    P_MOD.apiMessage.set_defaults(msg)
+    P_MOD.apiMessage.set_community(msg, "public")
+    P_MOD.apiMessage.set_pdu(msg, pdu)
+
+    # Round-trip through BER so the objects are what the listener receives
+    decoded, _ = decoder.decode(encoder.encode(msg), asn1Spec=P_MOD.Message())
+    return list(P_MOD.apiTrapPDU.get_varbinds(P_MOD.apiMessage.get_pdu(decoded)))
+
+
+def rate(fn, items):
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return len(items) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--traps", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    corpus = [make_var_binds(rng) for _ in range(args.traps)]
+    assert all(render_varbinds(vb) == render_varbinds_pretty(vb) for vb in corpus[:1000])
+
+    pretty_listener = SNMPListener(asyncio.Queue(), varbind_rendering="pretty")
+    fast_listener = SNMPListener(asyncio.Queue(), varbind_rendering="fast")
+
+    print(f"{'benchmark':<22} {'pretty traps/s':>15} {'fast traps/s':>13} {'speedup':>8}")
+    for name, pretty_fn, fast_fn in (
+        ("render varbinds", render_varbinds_pretty, render_varbinds),
+        ("varbinds -> SNMPTrap",
+         lambda vb: pretty_listener._decode_trap(vb, "10.0.0.1"),
+         lambda vb: fast_listener._decode_trap(vb, "10.0.0.1")),
+    ):
+        pretty = rate(pretty_fn, corpus)
+        fast = rate(fast_fn, corpus)
+        print(f"{name:<22} {pretty:>15,.0f} {fast:>13,.0f} {fast / pretty:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark syslog header parsing.
+
+Compares the header fast path with the original SYSLOG_REGEX path on a
+corpus of realistic lines, both for the header fields alone and for the
+full datagram -> SyslogMessage conversion done by SyslogListener. RFC 5424
+and mixed-format corpora show the cost of autodetection and structured-data
+parsing against the regex-only path, which cannot parse RFC 5424 at all.
+
+Usage:
+    python benchmarks/bench_syslog_parser.py --lines 200000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mutt.listeners.syslog_listener import SyslogListener  # noqa: E402
+from mutt.listeners.syslog_parser import parse_rfc3164, parse_rfc3164_regex  # noqa: E402
+
+RFC3164_LINES = [
+    b"<189>Oct  1 03:04:05 core-sw-01 %LINK-3-UPDOWN: Interface GigabitEthernet0/{n}, changed state to down",
+    b"<38>Feb 28 23:59:59 fw01.dc1.example.com sshd[{n}]: Failed password for root from 10.1.1.1 port 22 ssh2",
+    b"<86>Mar  3 12:00:00 web_01 CRON[{n}]: (root) CMD (run-parts /etc/cron.hourly)",
+    b"<134>Jan 09 20:30:00 edge-rtr-2 bgpd: neighbor 192.0.2.{n} Down BGP Notification sent",
+]
+
+RFC5424_LINES = [
+    b"<34>1 2003-10-11T22:14:15.003Z mymachine.example.com su - ID47 - 'su root' failed for lonvick {n}",
+    b'<165>1 2003-10-11T22:14:15.003Z mymachine.example.com evntslog {n} ID47 '
+    b'[exampleSDID@32473 iut="3" eventSource="Application" eventID="1011"] An application event log entry',
+    b'<165>1 2024-05-01T12:00:00.000001+02:00 core-sw-01 ifmgr {n} LINKDOWN '
+    b'[ifState@32473 ifIndex="{n}" ifName="Gi0/1" state="down"][origin ip="192.0.2.1"] Interface down',
+    b"<13>1 - - - - - - plain message {n}",
+]
+
+
+def make_corpus(templates, count, rng):
+    return [rng.choice(templates).replace(b"{n}", str(rng.randint(0, 9999)).encode())
+            for _ in range(count)]
+
+
+def rate(fn, lines):
+    start = time.perf_counter()
+    for line in lines:
+        fn(line)
+    return len(lines) / (time.perf_counter() - start)
+
+
+def report(name, baseline_fn, fast_fn, lines):
+    baseline = rate(baseline_fn, lines)
+    fast = rate(fast_fn, lines)
+    print(f"{name:<28} {baseline:>14,.0f} {fast:>14,.0f} {fast / baseline:>8.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    listener = SyslogListener(asyncio.Queue())
+
+    print(f"{'benchmark':<28} {'regex lines/s':>14} {'fast lines/s':>14} {'speedup':>9}")
+    lines = make_corpus(RFC3164_LINES, args.lines, rng)
+    report(
+        "rfc3164 header fields",
+        lambda b: parse_rfc3164_regex(b.decode("utf-8", errors="replace").strip()),
+        lambda b: parse_rfc3164(b.decode("utf-8", errors="replace")),
+        lines,
+    )
+    report(
+        "rfc3164 -> SyslogMessage",
+        lambda b: listener._parse_syslog_message(b.decode("utf-8", errors="replace").strip(), "10.0.0.1"),
+        lambda b: listener._parse_datagram(b, "10.0.0.1"),
+        lines,
+    )
+
+    lines = make_corpus(RFC5424_LINES, args.lines, rng)
+    report(
+        "rfc5424 -> SyslogMessage",
+        lambda b: listener._parse_syslog_message(b.decode("utf-8", errors="replace").strip(), "10.0.0.1"),
+        lambda b: listener._parse_datagram(b, "10.0.0.1"),
+        lines,
+    )
+    lines = make_corpus(RFC3164_LINES + RFC5424_LINES, args.lines, rng)
+    report(
+        "mixed -> SyslogMessage",
+        lambda b: listener._parse_syslog_message(b.decode("utf-8", errors="replace").strip(), "10.0.0.1"),
+        lambda b: listener._parse_datagram(b, "10.0.0.1"),
+        lines,
+    )
+
+
+if __name__ == "__main__":
+    main()
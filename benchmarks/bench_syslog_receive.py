@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark SyslogListener receive paths: per-datagram protocol vs batch drain.
+
+A separate sender process blasts RFC 3164 datagrams at the listener; the
+listener parses and enqueues them. Reports received packets/sec and how many
+datagrams the kernel dropped because the listener fell behind.
+
+Usage:
+    python benchmarks/bench_syslog_receive.py --count 200000
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mutt.listeners.syslog_listener import SyslogListener  # noqa: E402
+
+
+def send(port: int, count: int, start_event) -> None:
+    payload = b"<134>Jan 09 20:30:00 core-sw-01 kernel: %LINK-3-UPDOWN: Interface Gi0/1, changed state to down"
+    start_event.wait()
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        for _ in range(count):
+            sock.sendto(payload, ("127.0.0.1", port))
+
+
+class CountingQueue(asyncio.Queue):
+    """Counts messages instead of holding them, so only receive cost is measured."""
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+        self.last = 0.0
+
+    def put_nowait(self, item):
+        self.count += 1
+        self.last = time.perf_counter()
+
+    def put_batch(self, items):
+        self.count += len(items)
+        self.last = time.perf_counter()
+
+
+async def run(mode: str, count: int, batch_size: int) -> None:
+    queue = CountingQueue()
+    listener = SyslogListener(queue, port=0, host="127.0.0.1",
+                              receive_mode=mode, batch_size=batch_size)
+    await listener.start()
+    sock = listener._sock if mode == "batch" else listener.transport.get_extra_info("socket")
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8 * 1024 * 1024)
+    port = sock.getsockname()[1]
+
+    start_event = multiprocessing.Event()
+    sender = multiprocessing.Process(target=send, args=(port, count, start_event))
+    sender.start()
+    start_event.set()
+    start = time.perf_counter()
+
+    # Stop once the sender is done and nothing has arrived for a moment
+    while sender.is_alive() or time.perf_counter() - max(queue.last, start) < 0.5:
+        await asyncio.sleep(0.1)
+    sender.join()
+    await listener.stop()
+
+    elapsed = queue.last - start
+    print(f"{mode:>9} {queue.count:>10,} {queue.count / elapsed:>14,.0f} {count - queue.count:>10,}", end="")
+    if mode == "batch":
+        stats = listener.get_receive_stats()
+        print(f"   avg batch {stats['avg_batch']:.1f}, max {stats['max_batch']}")
+    else:
+        print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=200000, help="Datagrams to send per run")
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    print(f"{'mode':>9} {'received':>10} {'packets/sec':>14} {'dropped':>10}")
+    for mode in ("protocol", "batch"):
+        asyncio.run(run(mode, args.count, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -11,9 +11,13 @@ import os
 from typing import Dict, Any, Optional
 
 from mutt.config import load_config, CredentialLoader
+from mutt.message_queue import BoundedMessageQueue, OverflowPolicy
 from mutt.logger import setup_logging, get_logger
 from mutt.listeners.syslog_listener import SyslogListener
+from mutt.listeners.multiprocess_listener import MultiProcessSyslogListener
+from mutt.listeners.syslog_tcp_listener import SyslogTCPListener, create_server_ssl_context
 from mutt.listeners.snmp_listener import SNMPListener
+from mutt.listeners.mib_resolver import MibResolver
 from mutt.processors.message_processor import MessageProcessor
 
 
@@ -25,10 +29,11 @@ class MUTTDaemon:
         self.config: Optional[Dict[str, Any]] = None
         self.credentials = {}
         self.logger = get_logger(__name__)
-        self.message_queue: Optional[asyncio.Queue] = None
+        self.message_queue: Optional[BoundedMessageQueue] = None
         self.listeners = []
         self.processor: Optional[MessageProcessor] = None
         self.shutdown_event = asyncio.Event()
+        self._stats_task: Optional[asyncio.Task] = None
         
     async def main(self) -> None:
         """Main entry point for the MUTT daemon."""
@@ -54,8 +59,8 @@ class MUTTDaemon:
             if self.credentials:
                 self.logger.info(f"[MUTTDaemon] Loaded SNMPv3 credentials for {len(self.credentials)} users")
             
-            # Create message queue
-            self.message_queue = asyncio.Queue()
+            # Create the bounded message queue
+            self.message_queue = self._create_queue()
             
             # Start message processor first so it's ready for messages
             await self._start_processor()
@@ -63,6 +68,11 @@ class MUTTDaemon:
             # Start listeners
             await self._start_listeners()
             
+            # Periodic per-listener ingest/loss counters
+            stats_interval = self.config.get('listeners', {}).get('stats_interval', 60)
+            if stats_interval:
+                self._stats_task = asyncio.create_task(self._listener_stats_loop(stats_interval))
+            
             # Setup signal handlers
             self._setup_signal_handlers()
             
@@ -91,6 +101,25 @@ class MUTTDaemon:
         )
         return parser.parse_args()
     
+    def _create_queue(self) -> BoundedMessageQueue:
+        """Create the bounded message queue from the processor config."""
+        processor_config = self.config.get('processor', {})
+        policy = OverflowPolicy(processor_config.get('overflow_policy', 'drop_lowest_severity'))
+        buffer_dir = self.config.get('storage', {}).get('buffer_dir', 'buffer')
+        queue = BoundedMessageQueue(
+            max_size=processor_config.get('queue_max_size', 10000),
+            policy=policy,
+            high_watermark=processor_config.get('high_watermark', 0.8),
+            low_watermark=processor_config.get('low_watermark', 0.5),
+            spill_path=os.path.join(buffer_dir, 'queue_spill.bin'),
+            spill_max_bytes=processor_config.get('spill_max_mb', 500) * 1024 * 1024
+        )
+        self.logger.info(
+            f"[MUTTDaemon] Message queue bounded at {queue.max_size} "
+            f"(overflow policy {policy.value})"
+        )
+        return queue
+    
     async def _start_listeners(self) -> None:
         """Start all configured listeners."""
         listeners_config = self.config.get('listeners', {})
@@ -101,17 +130,64 @@ class MUTTDaemon:
             try:
                 port = syslog_config.get('port', 5514)
                 host = syslog_config.get('host', '0.0.0.0')
-                syslog_listener = SyslogListener(
-                    queue=self.message_queue,
-                    port=port,
-                    host=host
-                )
+                processes = syslog_config.get('processes', 1)
+                receive_mode = syslog_config.get('receive_mode', 'protocol')
+                batch_size = syslog_config.get('batch_size', 256)
+                recv_buffer_size = self._recv_buffer_size(syslog_config)
+                if processes == 1:
+                    syslog_listener = SyslogListener(
+                        queue=self.message_queue,
+                        port=port,
+                        host=host,
+                        receive_mode=receive_mode,
+                        batch_size=batch_size,
+                        recv_buffer_size=recv_buffer_size
+                    )
+                else:
+                    # 0 = one ingest process per CPU
+                    syslog_listener = MultiProcessSyslogListener(
+                        queue=self.message_queue,
+                        port=port,
+                        host=host,
+                        processes=processes or None,
+                        batch_size=batch_size,
+                        receive_mode=receive_mode,
+                        recv_buffer_size=recv_buffer_size
+                    )
                 await syslog_listener.start()
                 self.listeners.append(syslog_listener)
                 self.logger.info(f"Syslog listener started on {host}:{port}")
             except Exception as e:
                 self.logger.error(f"Failed to start Syslog listener: {e}")
         
+        # Start Syslog TCP/TLS listener if enabled
+        tcp_config = listeners_config.get('syslog_tcp', {})
+        if tcp_config.get('enabled', False):
+            try:
+                port = tcp_config.get('port', 5514)
+                host = tcp_config.get('host', '0.0.0.0')
+                tls_config = tcp_config.get('tls') or {}
+                ssl_context = None
+                if tls_config.get('certfile'):
+                    ssl_context = create_server_ssl_context(
+                        tls_config['certfile'],
+                        keyfile=tls_config.get('keyfile'),
+                        cafile=tls_config.get('cafile')
+                    )
+                tcp_listener = SyslogTCPListener(
+                    queue=self.message_queue,
+                    port=port,
+                    host=host,
+                    ssl_context=ssl_context,
+                    max_connections=tcp_config.get('max_connections', 1000),
+                    max_frame_size=tcp_config.get('max_frame_size', 65536)
+                )
+                await tcp_listener.start()
+                self.listeners.append(tcp_listener)
+                self.logger.info(f"Syslog {'TLS' if ssl_context else 'TCP'} listener started on {host}:{port}")
+            except Exception as e:
+                self.logger.error(f"Failed to start Syslog TCP listener: {e}")
+        
         # Start SNMP listener if enabled
         snmp_config = listeners_config.get('snmp', {})
         if snmp_config.get('enabled', True):
@@ -124,7 +200,13 @@ class MUTTDaemon:
                     port=port,
                     host=host,
                     credentials_dict=self.credentials,
-                    auth_failure_tracker=self.processor.auth_failure_tracker
+                    auth_failure_tracker=self.processor.auth_failure_tracker,
+                    recv_buffer_size=self._recv_buffer_size(snmp_config),
+                    max_pending_traps=snmp_config.get('max_pending_traps', 10000),
+                    drain_batch_size=snmp_config.get('drain_batch', 256),
+                    varbind_rendering=snmp_config.get('varbind_rendering', 'fast'),
+                    mib_resolver=await self._load_mib_resolver(snmp_config.get('mibs', {})),
+                    usm_key_cache_size=snmp_config.get('usm_key_cache_size', 10000)
                 )
                 await snmp_listener.start()
                 self.listeners.append(snmp_listener)
@@ -134,6 +216,43 @@ class MUTTDaemon:
         
         if not self.listeners:
             self.logger.warning("No listeners enabled in configuration")
+        
+        for listener in self.listeners:
+            self.message_queue.add_watermark_callback(listener.on_backpressure)
+    
+    @staticmethod
+    def _recv_buffer_size(listener_config: Dict[str, Any]) -> Optional[int]:
+        """Return a listener's configured SO_RCVBUF in bytes, or None for the system default."""
+        recv_buffer_mb = listener_config.get('recv_buffer_mb')
+        return int(recv_buffer_mb * 1024 * 1024) if recv_buffer_mb else None
+    
+    async def _load_mib_resolver(self, mibs_config: Dict[str, Any]) -> Optional[MibResolver]:
+        """Load the configured MIB index; traps keep numeric OIDs if none or on error."""
+        modules = mibs_config.get('modules')
+        if not modules:
+            return None
+        resolver = MibResolver(
+            modules,
+            sources=mibs_config.get('sources', []),
+            cache_file=mibs_config.get('cache_file', 'data/mib_index.json'),
+            lru_size=mibs_config.get('lru_size', 10000)
+        )
+        try:
+            await asyncio.to_thread(resolver.load)
+        except Exception as e:
+            self.logger.error(f"Failed to load MIBs {modules}, traps will not be annotated: {e}")
+            return None
+        return resolver
+    
+    async def _listener_stats_loop(self, interval: float) -> None:
+        """Log each listener's received/parsed/enqueued/kernel-dropped counters."""
+        while True:
+            await asyncio.sleep(interval)
+            for listener in self.listeners:
+                try:
+                    listener.log_ingest_stats()
+                except Exception as e:
+                    self.logger.error(f"Error reading stats of {type(listener).__name__}: {e}")
     
     async def _start_processor(self) -> None:
         """Start the message processor."""
@@ -168,6 +287,17 @@ class MUTTDaemon:
         """Gracefully shutdown the MUTT daemon."""
         self.logger.info("Initiating graceful shutdown...")
         
+        if self._stats_task:
+            self._stats_task.cancel()
+            self._stats_task = None
+        
+        # Final counters, while the sockets still exist
+        for listener in self.listeners:
+            try:
+                listener.log_ingest_stats()
+            except Exception as e:
+                self.logger.error(f"Error reading stats of {type(listener).__name__}: {e}")
+        
         # Stop listeners
         for listener in self.listeners:
             try:
@@ -187,6 +317,10 @@ class MUTTDaemon:
         # Clear listeners list
         self.listeners.clear()
         
+        # Release the spill file; unprocessed spilled messages are resumed on restart
+        if self.message_queue:
+            self.message_queue.close()
+        
         self.logger.info("MUTT daemon shutdown complete")
 
 
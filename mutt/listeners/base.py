@@ -1,6 +1,9 @@
 import asyncio
 import abc
-from typing import Tuple
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
 
 
 class BaseListener(abc.ABC):
@@ -19,6 +22,9 @@ class BaseListener(abc.ABC):
         self.queue = queue
         self._is_running = False
         self._server_task = None
+        self._backpressure = False
+        self.ingest_stats: Dict[str, int] = {"received": 0, "parsed": 0, "enqueued": 0}
+        self._logged_kernel_drops = 0
     
     @abc.abstractmethod
     async def start(self) -> None:
@@ -59,3 +65,67 @@ class BaseListener(abc.ABC):
             True if the listener is running, False otherwise.
         """
         return self._is_running
+    
+    @property
+    def backpressure(self) -> bool:
+        """Check if the downstream queue has signalled backpressure.
+        
+        Returns:
+            True between a high watermark and the following low watermark event.
+        """
+        return self._backpressure
+    
+    def on_backpressure(self, active: bool, depth: int) -> None:
+        """React to the message queue crossing its watermarks.
+        
+        Registered with BoundedMessageQueue.add_watermark_callback(). The
+        default only records the state; subclasses that can slow their
+        sources (e.g. stop reading from a stream) override this.
+        
+        Args:
+            active: True when the high watermark is reached, False when the
+                queue has drained to the low watermark.
+            depth: Queue depth at the crossing.
+        """
+        self._backpressure = active
+        logger.debug(f"[{type(self).__name__}] Backpressure {'on' if active else 'off'} at depth {depth}")
+    
+    def kernel_drops(self) -> Optional[int]:
+        """Return datagrams the kernel dropped before the listener read them.
+        
+        Subclasses reading from UDP sockets override this.
+        
+        Returns:
+            Drop count since the socket was opened, or None if not available.
+        """
+        return None
+    
+    def get_ingest_stats(self) -> Dict[str, Any]:
+        """Return per-listener ingestion counters.
+        
+        Returns:
+            Dictionary with received, parsed, enqueued, kernel_dropped (None
+            if unknown) and loss_rate, the fraction of datagrams that reached
+            the host but were dropped by the kernel.
+        """
+        stats: Dict[str, Any] = dict(self.ingest_stats)
+        dropped = self.kernel_drops()
+        stats["kernel_dropped"] = dropped
+        offered = stats["received"] + (dropped or 0)
+        stats["loss_rate"] = (dropped or 0) / offered if offered else 0.0
+        return stats
+    
+    def log_ingest_stats(self) -> None:
+        """Log the ingestion counters; new kernel drops are logged as a warning."""
+        stats = self.get_ingest_stats()
+        dropped = stats["kernel_dropped"]
+        line = (
+            f"[{type(self).__name__}] received={stats['received']} parsed={stats['parsed']} "
+            f"enqueued={stats['enqueued']} kernel_dropped="
+            f"{'n/a' if dropped is None else dropped} loss={stats['loss_rate']:.2%}"
+        )
+        if dropped and dropped > self._logged_kernel_drops:
+            self._logged_kernel_drops = dropped
+            logger.warning(line)
+        else:
+            logger.info(line)
@@ -0,0 +1,223 @@
+"""
+Symbolic names for trap OIDs and varbinds.
+
+Loads the configured MIB modules with pysnmp's MibBuilder once, flattens
+every named OID they define into an OID -> "MODULE::name" index, and saves
+the index to a JSON cache file so later starts skip MIB loading unless the
+module list, the MIB sources or the pysnmp version changed.
+
+Lookups find the longest indexed prefix of an OID and append the remaining
+arcs as an instance suffix, e.g. 1.3.6.1.2.1.2.2.1.2.3 -> "IF-MIB::ifDescr.3".
+Results are kept in an LRU keyed by the dotted OID string, since traps
+repeat the same few names.
+"""
+
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pysnmp
+from pysnmp.smi import builder
+
+from mutt.models.message import SNMPTrap
+
+logger = logging.getLogger(__name__)
+
+INDEX_CACHE_VERSION = 1
+
+
+class MibResolver:
+    """Resolve numeric OIDs to symbolic names from a precomputed MIB index."""
+
+    def __init__(
+        self,
+        modules: Sequence[str],
+        sources: Sequence[str] = (),
+        cache_file: Optional[str] = None,
+        lru_size: int = 10000
+    ):
+        """
+        Initialize the resolver. Call load() before resolving.
+
+        Args:
+            modules: MIB modules to load; on duplicate OIDs the first wins
+            sources: Directories of pysnmp-compiled MIB modules, searched
+                before the modules bundled with pysnmp
+            cache_file: Path of the JSON index cache; None disables it
+            lru_size: Maximum number of cached lookups
+        """
+        self.modules = list(modules)
+        self.sources = list(sources)
+        self.cache_file = cache_file
+        self.lru_size = max(1, lru_size)
+        self._index: Dict[Tuple[int, ...], str] = {}
+        self._max_length = 0
+        self._lru: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self.stats: Dict[str, Any] = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "index_size": 0,
+            "load_ms": 0.0,
+            "from_cache": False,
+        }
+
+    def load(self) -> None:
+        """
+        Build the OID index, from the cache file when it is current.
+
+        Raises:
+            pysnmp.smi.error.MibNotFoundError: If a module cannot be loaded
+        """
+        start = time.perf_counter()
+        key = self._cache_key()
+        index = self._read_cache(key)
+        self.stats["from_cache"] = index is not None
+        if index is None:
+            index = self._build_index()
+            self._write_cache(key, index)
+
+        self._index = index
+        self._max_length = max((len(oid) for oid in index), default=0)
+        self._lru.clear()
+        self.stats["index_size"] = len(index)
+        self.stats["load_ms"] = (time.perf_counter() - start) * 1000
+        logger.info(
+            f"[MibResolver] Indexed {len(index)} OIDs from {len(self.modules)} modules in "
+            f"{self.stats['load_ms']:.0f} ms ({'cache' if self.stats['from_cache'] else 'MIBs'})"
+        )
+
+    def resolve(self, oid: str) -> Optional[str]:
+        """
+        Return the symbolic name for a dotted OID.
+
+        Args:
+            oid: Dotted numeric OID, e.g. "1.3.6.1.6.3.1.1.5.3"
+
+        Returns:
+            "MODULE::name" plus any instance suffix, or None if no indexed
+            prefix matches or oid is not numeric
+        """
+        try:
+            name = self._lru[oid]
+        except KeyError:
+            pass
+        else:
+            self._lru.move_to_end(oid)
+            self.stats["hits"] += 1
+            return name
+
+        self.stats["misses"] += 1
+        name = self._lookup(oid)
+        self._lru[oid] = name
+        if len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+            self.stats["evictions"] += 1
+        return name
+
+    def annotate(self, trap: SNMPTrap) -> None:
+        """
+        Set the trap's symbolic trap name and varbind names.
+
+        Args:
+            trap: Trap whose oid and varbinds hold numeric OIDs
+        """
+        trap.trap_name = self.resolve(trap.oid)
+        names = {}
+        for oid in trap.varbinds:
+            name = self.resolve(oid)
+            if name is not None:
+                names[oid] = name
+        trap.varbind_names = names
+
+    def _lookup(self, oid: str) -> Optional[str]:
+        """Find the longest indexed prefix of oid."""
+        try:
+            arcs = tuple(int(arc) for arc in oid.strip(".").split("."))
+        except ValueError:
+            return None
+        for length in range(min(len(arcs), self._max_length), 0, -1):
+            name = self._index.get(arcs[:length])
+            if name is not None:
+                if length == len(arcs):
+                    return name
+                return name + "." + ".".join(map(str, arcs[length:]))
+        return None
+
+    def _build_index(self) -> Dict[Tuple[int, ...], str]:
+        """Load the modules with pysnmp and collect every named OID."""
+        mib_builder = builder.MibBuilder()
+        if self.sources:
+            mib_builder.add_mib_sources(*(builder.DirMibSource(path) for path in self.sources))
+        mib_builder.load_modules(*self.modules)
+
+        # Configured modules first so they win over their imports
+        order = self.modules + [m for m in mib_builder.mibSymbols if m not in self.modules]
+        index: Dict[Tuple[int, ...], str] = {}
+        for module in order:
+            for symbol, obj in mib_builder.mibSymbols.get(module, {}).items():
+                get_name = getattr(obj, "getName", None)
+                if get_name is None:
+                    continue
+                try:
+                    oid = get_name()
+                except Exception:
+                    continue
+                if isinstance(oid, tuple) and oid and oid not in index:
+                    index[oid] = f"{module}::{symbol}"
+        return index
+
+    def _cache_key(self) -> Dict[str, Any]:
+        """Describe the inputs of the index; a cache with another key is stale."""
+        mtimes: List[float] = []
+        for path in self.sources:
+            try:
+                mtimes.append(max(
+                    [os.path.getmtime(path)] +
+                    [entry.stat().st_mtime for entry in os.scandir(path) if entry.is_file()]
+                ))
+            except OSError:
+                mtimes.append(0.0)
+        return {
+            "version": INDEX_CACHE_VERSION,
+            "pysnmp": pysnmp.__version__,
+            "modules": self.modules,
+            "sources": self.sources,
+            "mtimes": mtimes,
+        }
+
+    def _read_cache(self, key: Dict[str, Any]) -> Optional[Dict[Tuple[int, ...], str]]:
+        """Return the cached index if it was built from the same inputs."""
+        if not self.cache_file:
+            return None
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("key") != key:
+                logger.info(f"[MibResolver] MIB index cache {self.cache_file} is stale, rebuilding")
+                return None
+            return {tuple(map(int, oid.split("."))): name for oid, name in data["index"].items()}
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            logger.warning(f"[MibResolver] Ignoring unreadable MIB index cache {self.cache_file}: {e}")
+            return None
+
+    def _write_cache(self, key: Dict[str, Any], index: Dict[Tuple[int, ...], str]) -> None:
+        """Save the index next to the configured cache path."""
+        if not self.cache_file:
+            return
+        data = {"key": key, "index": {".".join(map(str, oid)): name for oid, name in index.items()}}
+        tmp = self.cache_file + ".tmp"
+        try:
+            directory = os.path.dirname(self.cache_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.cache_file)
+        except OSError as e:
+            logger.warning(f"[MibResolver] Could not write MIB index cache {self.cache_file}: {e}")
@@ -0,0 +1,254 @@
+"""
+Multi-process syslog ingestion.
+
+N child processes each bind the syslog UDP port with SO_REUSEPORT, so the
+kernel spreads datagrams across them by flow hash. Each child decodes and
+parses on its own core and sends parsed messages to the parent in batches
+over a multiprocessing queue. The parent forwards them into the main message
+queue, where the single pipeline and storage writer take over.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue as queue_module
+import threading
+from typing import Any, Dict, List, Optional
+
+from mutt.listeners.socket_stats import udp_drops
+from mutt.listeners.syslog_listener import SyslogListener
+
+logger = logging.getLogger(__name__)
+
+
+def _ingest_process(
+    host: str,
+    port: int,
+    out_queue: Any,
+    ready_event: Any,
+    stop_event: Any,
+    batch_size: int,
+    receive_mode: str,
+    recv_buffer_size: Optional[int]
+) -> None:
+    """Entry point of an ingest child process."""
+    try:
+        asyncio.run(_ingest_main(
+            host, port, out_queue, ready_event, stop_event, batch_size, receive_mode, recv_buffer_size
+        ))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _ingest_main(
+    host: str,
+    port: int,
+    out_queue: Any,
+    ready_event: Any,
+    stop_event: Any,
+    batch_size: int,
+    receive_mode: str,
+    recv_buffer_size: Optional[int]
+) -> None:
+    """Receive and parse syslog datagrams, forwarding parsed batches to the parent."""
+    local_queue: asyncio.Queue = asyncio.Queue()
+    listener = SyslogListener(
+        local_queue, port=port, host=host, reuse_port=True,
+        receive_mode=receive_mode, batch_size=batch_size,
+        recv_buffer_size=recv_buffer_size
+    )
+    reported = 0
+    await listener.start()
+    ready_event.set()
+
+    try:
+        while not stop_event.is_set():
+            try:
+                first = await asyncio.wait_for(local_queue.get(), timeout=0.2)
+            except asyncio.TimeoutError:
+                continue
+
+            # Take whatever else has arrived since; batches grow with load
+            batch = [first]
+            while len(batch) < batch_size and not local_queue.empty():
+                batch.append(local_queue.get_nowait())
+
+            # Datagrams received since the last batch, for the parent's counters
+            received = listener.ingest_stats["received"]
+            # Blocks when the parent falls behind; the kernel buffer absorbs the rest
+            await asyncio.to_thread(out_queue.put, (batch, received - reported))
+            reported = received
+    finally:
+        await listener.stop()
+
+
+class MultiProcessSyslogListener(SyslogListener):
+    """
+    Syslog listener that receives and parses in several child processes.
+
+    Parsing behaviour is that of SyslogListener; process_data() remains
+    usable in the parent for direct injection.
+    """
+
+    def __init__(
+        self,
+        queue: asyncio.Queue,
+        port: int = 5514,
+        host: str = "0.0.0.0",
+        processes: Optional[int] = None,
+        batch_size: int = 256,
+        ipc_queue_size: int = 1024,
+        start_timeout: float = 10.0,
+        receive_mode: str = "protocol",
+        recv_buffer_size: Optional[int] = None
+    ):
+        """
+        Initialize the multi-process listener.
+
+        Args:
+            queue: Queue to put parsed messages into
+            port: UDP port to listen on (default: 5514)
+            host: Host interface to bind to (default: "0.0.0.0")
+            processes: Number of ingest processes (default: CPU count)
+            batch_size: Maximum messages per batch sent to the parent
+            ipc_queue_size: Maximum batches in flight between children and parent
+            start_timeout: Seconds to wait for every child to bind the port
+            receive_mode: Receive path used by each child, as for SyslogListener
+            recv_buffer_size: SO_RCVBUF of each child's socket
+        """
+        super().__init__(
+            queue, port=port, host=host, reuse_port=True,
+            receive_mode=receive_mode, batch_size=batch_size,
+            recv_buffer_size=recv_buffer_size
+        )
+        self.processes = max(1, processes or os.cpu_count() or 1)
+        self.ipc_queue_size = ipc_queue_size
+        self.start_timeout = start_timeout
+        self._context = multiprocessing.get_context("spawn")
+        self._children: List[Any] = []
+        self._ipc_queue: Any = None
+        self._stop_event: Any = None
+        self._reader: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats: Dict[str, int] = {"batches": 0, "messages": 0, "dropped": 0}
+
+    async def start(self) -> None:
+        """Start the ingest processes and the thread forwarding their batches."""
+        self._loop = asyncio.get_running_loop()
+        self._ipc_queue = self._context.Queue(maxsize=self.ipc_queue_size)
+        self._stop_event = self._context.Event()
+
+        ready_events = []
+        for index in range(self.processes):
+            ready = self._context.Event()
+            child = self._context.Process(
+                target=_ingest_process,
+                args=(
+                    self.host, self.port, self._ipc_queue, ready, self._stop_event,
+                    self.batch_size, self.receive_mode, self.recv_buffer_size
+                ),
+                name=f"mutt-syslog-{index}",
+                daemon=True
+            )
+            child.start()
+            self._children.append(child)
+            ready_events.append(ready)
+
+        self._reader = threading.Thread(target=self._read_batches, name="syslog-ipc-reader", daemon=True)
+        self._reader.start()
+
+        bound = await asyncio.gather(*(
+            asyncio.to_thread(event.wait, self.start_timeout) for event in ready_events
+        ))
+        if not all(bound):
+            await self.stop()
+            raise RuntimeError(
+                f"{bound.count(False)} of {self.processes} syslog ingest processes "
+                f"failed to bind {self.host}:{self.port}"
+            )
+
+        self._is_running = True
+        logger.info(
+            f"[MultiProcessSyslogListener] Started {self.processes} ingest processes "
+            f"on {self.host}:{self.port}"
+        )
+
+    async def stop(self) -> None:
+        """Stop the ingest processes and forward any batches still in flight."""
+        if not self._children:
+            return
+
+        self._stop_event.set()
+        await asyncio.gather(*(
+            asyncio.to_thread(child.join, 5.0) for child in self._children
+        ))
+        for child in self._children:
+            if child.is_alive():
+                logger.warning(f"[MultiProcessSyslogListener] Terminating unresponsive {child.name}")
+                child.terminate()
+                child.join()
+        self._children = []
+
+        # Children have flushed their batches; the sentinel lands behind them
+        self._ipc_queue.put(None)
+        await asyncio.to_thread(self._reader.join)
+        self._reader = None
+        self._ipc_queue.close()
+        self._ipc_queue = None
+
+        self._is_running = False
+        logger.info(
+            f"[MultiProcessSyslogListener] Stopped after {self.stats['messages']} messages "
+            f"in {self.stats['batches']} batches"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return forwarding statistics.
+
+        Returns:
+            Dictionary with batches, messages, dropped and processes_alive
+        """
+        stats: Dict[str, Any] = dict(self.stats)
+        stats["processes_alive"] = sum(1 for child in self._children if child.is_alive())
+        return stats
+
+    def kernel_drops(self) -> Optional[int]:
+        """
+        Return datagrams dropped by the kernel across the children's sockets.
+
+        Returns:
+            Drop count of every UDP socket bound to the port, or None if not available
+        """
+        if not self._children:
+            return None
+        return udp_drops(port=self.port)
+
+    def _read_batches(self) -> None:
+        """Thread body: move batches from the IPC queue onto the event loop."""
+        while True:
+            try:
+                item = self._ipc_queue.get(timeout=1.0)
+            except queue_module.Empty:
+                continue
+            if item is None:
+                return
+            self._loop.call_soon_threadsafe(self._deliver, *item)
+
+    def _deliver(self, batch: List[Any], received: int) -> None:
+        """Put a batch of parsed messages onto the main queue."""
+        self.stats["batches"] += 1
+        self.ingest_stats["received"] += received
+        self.ingest_stats["parsed"] += len(batch)
+        for msg in batch:
+            try:
+                # BoundedMessageQueue returns False when its policy drops
+                accepted = self.queue.put_nowait(msg) is not False
+            except asyncio.QueueFull:
+                accepted = False
+            if accepted:
+                self.stats["messages"] += 1
+                self.ingest_stats["enqueued"] += 1
+            else:
+                self.stats["dropped"] += 1
@@ -4,25 +4,35 @@ SNMP listener implementation for Mutt with SNMPv3 support.
 
 import asyncio
 import logging
+import socket
 import uuid
+from collections import deque
 from datetime import datetime
-from typing import Optional, Tuple, Dict, List, Any
+from typing import Optional, Tuple, Dict, List, Any, Deque
 
 # pysnmp-lextudio imports
 from pysnmp.entity import engine, config
 from pysnmp.entity.rfc3413 import ntfrcv
+from pysnmp.proto import errind
 from pysnmp.proto.api import v2c
-from pysnmp.smi import builder, view, rfc1902
+from pysnmp.smi import rfc1902
 from pysnmp.entity.engine import SnmpEngine
 from pysnmp.carrier.asyncio.dgram import udp
 
 from mutt.listeners.base import BaseListener
+from mutt.listeners.mib_resolver import MibResolver
+from mutt.listeners.snmp_usm import RotatingUsmSecurityModel
+from mutt.listeners.snmp_varbinds import render_varbinds, render_varbinds_pretty
+from mutt.listeners.socket_stats import set_receive_buffer, socket_inode, udp_drops
 from mutt.models.message import MessageType, Severity, SNMPTrap
-from mutt.models.credentials import SNMPv3CredentialSet, SNMPv3Credential
+from mutt.models.credentials import SNMPv3CredentialSet
 from mutt.storage.auth_failure_tracker import AuthFailureTracker
 
 logger = logging.getLogger(__name__)
 
+# USM rejections counted as SNMPv3 authentication failures
+AUTH_FAILURES = (errind.authenticationFailure, errind.decryptionError, errind.unknownSecurityName)
+
 
 class SNMPListener(BaseListener):
     """
@@ -36,7 +46,13 @@ class SNMPListener(BaseListener):
         port: int = 5162,
         host: str = "0.0.0.0",
         credentials_dict: Dict[str, SNMPv3CredentialSet] = None,
-        auth_failure_tracker: AuthFailureTracker = None
+        auth_failure_tracker: AuthFailureTracker = None,
+        recv_buffer_size: Optional[int] = None,
+        max_pending_traps: int = 10000,
+        drain_batch_size: int = 256,
+        varbind_rendering: str = "fast",
+        mib_resolver: Optional[MibResolver] = None,
+        usm_key_cache_size: int = 10000
     ):
         """
         Initialize the SNMP listener.
@@ -48,6 +64,15 @@ class SNMPListener(BaseListener):
             host: Host interface to bind to (default: "0.0.0.0")
             credentials_dict: Dictionary of SNMPv3 credentials keyed by username
             auth_failure_tracker: Instance of AuthFailureTracker for v3 failures
+            recv_buffer_size: SO_RCVBUF in bytes; the system default if None
+            max_pending_traps: Received traps held for decoding before new
+                ones are dropped
+            drain_batch_size: Traps decoded per event loop iteration
+            varbind_rendering: "fast" renders common value types directly;
+                "pretty" uses pysnmp's prettyPrint() for everything
+            mib_resolver: Loaded resolver that adds symbolic names to traps
+            usm_key_cache_size: (engine ID, credential) localized SNMPv3
+                key pairs kept in memory
         """
         super().__init__(queue)
         self.config = config or {}
@@ -55,58 +80,44 @@ class SNMPListener(BaseListener):
         self.host = host
         self.credentials_dict = credentials_dict or {}
         self.auth_failure_tracker = auth_failure_tracker
+        self.recv_buffer_size = recv_buffer_size
         self.snmp_engine = SnmpEngine()
+        self._sock: Optional[socket.socket] = None
+        self._socket_inode: Optional[int] = None
+        
+        # Traps accepted by pysnmp, waiting to be decoded in batches
+        self.max_pending_traps = max_pending_traps
+        self.drain_batch_size = drain_batch_size
+        self._pending_traps: Deque[Tuple[Any, str]] = deque()
+        self._drain_scheduled = False
+        self._overflowing = False
+        self.stats: Dict[str, int] = {"traps_dropped": 0, "drains": 0, "max_pending": 0}
+        if varbind_rendering not in ("fast", "pretty"):
+            raise ValueError(f"Unknown varbind_rendering: {varbind_rendering}")
+        self._render_varbinds = render_varbinds if varbind_rendering == "fast" else render_varbinds_pretty
+        self.mib_resolver = mib_resolver
+        self.usm_key_cache_size = usm_key_cache_size
+        self.usm: Optional[RotatingUsmSecurityModel] = None
+        self._receiver: Optional[ntfrcv.NotificationReceiver] = None
         
-        # MIB resolving (optional but good for future)
-        self.mib_builder = builder.MibBuilder()
-        self.mib_view = view.MibViewController(self.mib_builder)
+        # Count messages the security model rejects. Registered once for the
+        # engine's lifetime: pysnmp keeps an unregistered callback known and
+        # would refuse to register it again on a restart.
+        if self.auth_failure_tracker is not None:
+            self.snmp_engine.observer.register_observer(
+                self._on_security_failure, "rfc3412.prepareDataElements:sm-failure"
+            )
 
     def _setup_v3_credentials(self):
-        """Configure the SNMP engine with all active V3 credentials."""
-        # Note: pysnmp USM (User-based Security Model) lookup usually happens
-        # by securityName. If we have multiple credentials for the SAME securityName,
-        # pysnmp's standard engine might struggle to 'try' them sequentially 
-        # unless we manage the decryption attempt manually or rotate them.
-        
-        # For now, we register the highest priority active credential for each user
-        # to the USM. The prompt suggests a 'try in order' approach which 
-        # might require custom USM handling if one fails.
-        
-        for username, cred_set in self.credentials_dict.items():
-            active_creds = cred_set.get_active_credentials()
-            if not active_creds:
-                continue
-                
-            # Register the first one (highest priority)
-            # In a real rotation, we might need a more complex hook into pysnmp's USM
-            self._add_user_to_engine(username, active_creds[0])
-
-    def _add_user_to_engine(self, username: str, cred: SNMPv3Credential):
-        """Adds a single V3 user to the SNMP engine."""
-        auth_proto = {
-            'SHA': config.usmHMACSHAAuthProtocol,
-            'MD5': config.usmHMACMD5AuthProtocol,
-            'SHA224': config.usmHMAC128SHA224AuthProtocol,
-            'SHA256': config.usmHMAC192SHA256AuthProtocol,
-            'SHA384': config.usmHMAC256SHA384AuthProtocol,
-            'SHA512': config.usmHMAC384SHA512AuthProtocol,
-        }.get(cred.auth_type.upper(), config.usmNoAuthProtocol)
-
-        priv_proto = {
-            'AES': config.usmAesCfb128Protocol,
-            'AES128': config.usmAesCfb128Protocol,
-            'AES192': config.usmAesCfb192Protocol,
-            'AES256': config.usmAesCfb256Protocol,
-            'DES': config.usmDESPrivProtocol,
-            '3DES': config.usm3DESEDEPrivProtocol,
-        }.get(cred.priv_type.upper(), config.usmNoPrivProtocol)
-
-        config.addV3User(
-            self.snmp_engine,
-            username,
-            auth_proto, cred.auth_password,
-            priv_proto, cred.priv_password
-        )
+        """
+        Install the USM that accepts every active V3 credential of a user.
+
+        Credentials are tried in priority order, starting with the one that
+        last authenticated the sending engine, so devices on the old and the
+        new password both work during a rotation.
+        """
+        self.usm = RotatingUsmSecurityModel(self.credentials_dict, key_cache_size=self.usm_key_cache_size)
+        self.snmp_engine.security_models[self.usm.SECURITY_MODEL_ID] = self.usm
 
     async def start(self) -> None:
         """Start listening for SNMP traps using pysnmp."""
@@ -123,24 +134,82 @@ class SNMPListener(BaseListener):
         # 2. Setup V3 Credentials
         self._setup_v3_credentials()
 
-        # 3. Configure Transport
+        # 3. Configure Transport on our own socket, so it can be sized and
+        # its kernel drop counter read
+        self._sock = self._open_socket()
+        transport = udp.UdpAsyncioTransport()
+        self._count_datagrams(transport)
         config.addTransport(
             self.snmp_engine,
             udp.domainName,
-            udp.UdpAsyncioTransport().openServerMode((self.host, self.port))
+            transport.openServerMode(sock=self._sock)
         )
 
         # 4. Register Notification Receiver Callback
-        ntfrcv.NotificationReceiver(self.snmp_engine, self._cb_fun)
+        self._receiver = ntfrcv.NotificationReceiver(self.snmp_engine, self._cb_fun)
         
         self._is_running = True
         logger.info(f"SNMP listener started on {self.host}:{self.port} (v1/v2c/v3 support)")
 
+    def _open_socket(self) -> socket.socket:
+        """Bind the trap socket, applying recv_buffer_size."""
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_DGRAM)
+        try:
+            sock.setblocking(False)
+            sock.bind((self.host, self.port))
+            if self.recv_buffer_size:
+                set_receive_buffer(sock, self.recv_buffer_size)
+        except OSError:
+            sock.close()
+            raise
+        self._socket_inode = socket_inode(sock)
+        return sock
+
+    def _count_datagrams(self, transport) -> None:
+        """Count datagrams pysnmp's transport receives, before decoding."""
+        datagram_received = transport.datagram_received
+
+        def counting_datagram_received(datagram, transportAddress):
+            self.ingest_stats["received"] += 1
+            datagram_received(datagram, transportAddress)
+
+        transport.datagram_received = counting_datagram_received
+
+    def kernel_drops(self) -> Optional[int]:
+        """
+        Return datagrams dropped by the kernel on the trap socket.
+
+        Returns:
+            Drop count from /proc/net/udp, or None if not available
+        """
+        if self._socket_inode is None:
+            return None
+        return udp_drops([self._socket_inode])
+
     def _cb_fun(self, snmpEngine, stateReference, contextEngineId, contextName, varBinds, cbCtx=None):
-        """Callback function for received traps."""
+        """
+        Callback function for received traps.
+
+        Only queues the trap for _drain_traps(), which decodes pending traps
+        in batches on a later loop iteration. Nothing is allocated per trap
+        beyond the queue entry, and when max_pending_traps are waiting new
+        traps are dropped and counted.
+        """
         if varBinds is None:
             logger.warning("Received SNMP trap with no varBinds (None)")
             return
+        self.ingest_stats["parsed"] += 1
+
+        if len(self._pending_traps) >= self.max_pending_traps:
+            self.stats["traps_dropped"] += 1
+            if not self._overflowing:
+                self._overflowing = True
+                logger.warning(
+                    f"[SNMPListener] {self.max_pending_traps} traps waiting to be decoded, "
+                    f"dropping new traps"
+                )
+            return
 
         try:
             # pysnmp 7.x uses snake_case and transportAddress is a tuple (ip, port)
@@ -149,48 +218,124 @@ class SNMPListener(BaseListener):
         except Exception as e:
             logger.error(f"Error getting transport info: {e}")
             source_ip = "0.0.0.0"
-        
-        # Dispatch processing to async task
-        asyncio.create_task(self.process_trap(varBinds, source_ip, stateReference))
 
-    async def process_trap(self, varBinds, source_ip: str, stateReference):
-        """Async processing of the trap data."""
+        self._pending_traps.append((varBinds, source_ip))
+        if len(self._pending_traps) > self.stats["max_pending"]:
+            self.stats["max_pending"] = len(self._pending_traps)
+        if not self._drain_scheduled:
+            self._drain_scheduled = True
+            asyncio.get_running_loop().call_soon(self._drain_traps)
+
+    def _on_security_failure(self, snmpEngine, execpoint, variables, cbCtx) -> None:
+        """
+        Observer for messages the security model rejected.
+
+        Called by pysnmp's message processing for every rejected SNMPv3
+        message, after RotatingUsmSecurityModel has tried each credential of
+        the user. Authentication failures are only counted here; the
+        tracker writes them to the database on its next flush.
+        """
+        status = variables.get("statusInformation")
+        if status is None or status.get("errorIndication") not in AUTH_FAILURES:
+            return
+        username = bytes(status.get("msgUserName", b"")).decode("utf-8", errors="replace")
+        transport_address = variables.get("transportAddress")
+        source_ip = transport_address[0] if transport_address else "0.0.0.0"
+        self.auth_failure_tracker.note_failure(username, source_ip)
+
+    def _drain_traps(self) -> None:
+        """Decode one batch of pending traps, rescheduling while more remain."""
+        self._drain_scheduled = False
+        self._decode_pending(self.drain_batch_size)
+        if self._pending_traps:
+            self._drain_scheduled = True
+            asyncio.get_running_loop().call_soon(self._drain_traps)
+        elif self._overflowing:
+            self._overflowing = False
+            logger.warning(
+                f"[SNMPListener] Trap backlog cleared; {self.stats['traps_dropped']} traps dropped so far"
+            )
+
+    def _decode_pending(self, limit: int) -> None:
+        """Decode up to limit pending traps and enqueue them in one batch."""
+        batch = []
+        for _ in range(min(limit, len(self._pending_traps))):
+            varBinds, source_ip = self._pending_traps.popleft()
+            trap = self._decode_trap(varBinds, source_ip)
+            if trap is not None:
+                batch.append(trap)
+        self.stats["drains"] += 1
+        if batch:
+            self._enqueue_batch(batch)
+
+    def _decode_trap(self, varBinds, source_ip: str) -> Optional[SNMPTrap]:
+        """
+        Build an SNMPTrap from the trap's variable bindings.
+
+        Args:
+            varBinds: (name, value) pairs delivered by pysnmp
+            source_ip: Address the trap came from
+
+        Returns:
+            SNMPTrap, or None if the varbinds could not be rendered
+        """
         try:
-            # Basic parsing of varBinds
-            data_dict = {}
-            oid = "unknown"
-            for name, val in varBinds:
-                s_name = name.prettyPrint()
-                s_val = val.prettyPrint()
-                data_dict[s_name] = s_val
-                if 'snmpTrapOID' in s_name or '1.3.6.1.6.3.1.1.4.1' in s_name:
-                    oid = s_val
+            data_dict, oid = self._render_varbinds(varBinds)
 
             # Determine version (simplified for this context)
             version = "v2c"
             
-            # Here we would implement the 'Try each credential' logic if pysnmp 
-            # hadn't already handled it. Since pysnmp's NotificationReceiver 
-            # only calls the callback IF decryption succeeded, we clear the failure here.
-            # If it fails, the callback isn't even called (usually).
-            
-            # To strictly follow the "record failure" requirement, we'd need to hook 
-            # into the MessageDispatcher's error handling.
-            
             trap = SNMPTrap(
                 source_ip=source_ip,
                 message_type=MessageType.SNMP_TRAP,
                 severity=Severity.INFO,
                 payload=f"SNMP Trap from {source_ip}",
-                oid=oid,
+                oid=oid or "unknown",
                 varbinds=data_dict,
                 version=version
             )
-            
-            self.queue.put_nowait(trap)
+            if self.mib_resolver is not None:
+                self.mib_resolver.annotate(trap)
+            return trap
             
         except Exception as e:
             logger.error(f"Error processing SNMP trap: {e}")
+            return None
+
+    def _enqueue_batch(self, batch: List[SNMPTrap]) -> None:
+        """Put a batch of decoded traps on the queue in one call where supported."""
+        put_batch = getattr(self.queue, 'put_batch', None)
+        try:
+            if put_batch is not None:
+                self.ingest_stats["enqueued"] += put_batch(batch)
+            else:
+                for trap in batch:
+                    # BoundedMessageQueue returns False when its policy drops
+                    if self.queue.put_nowait(trap) is not False:
+                        self.ingest_stats["enqueued"] += 1
+        except asyncio.QueueFull:
+            logger.warning("SNMP queue full, dropping remainder of batch")
+
+    async def process_trap(self, varBinds, source_ip: str, stateReference):
+        """Decode a single trap and enqueue it, bypassing the pending queue."""
+        trap = self._decode_trap(varBinds, source_ip)
+        if trap is not None:
+            self._enqueue_batch([trap])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return trap decoding statistics.
+
+        Returns:
+            Dictionary with traps_dropped, drains and max_pending counters,
+            pending, the traps currently waiting to be decoded, and the
+            SNMPv3 key and credential counters once started
+        """
+        stats: Dict[str, Any] = dict(self.stats)
+        stats["pending"] = len(self._pending_traps)
+        if self.usm is not None:
+            stats.update(self.usm.stats)
+        return stats
 
     def process_data(self, data: bytes, addr: Tuple[str, int]) -> None:
         """
@@ -202,5 +347,17 @@ class SNMPListener(BaseListener):
     async def stop(self) -> None:
         """Stop the listener."""
         self.snmp_engine.transportDispatcher.closeDispatcher()
+        # Detached so that start() can register a new dispatcher
+        if self.snmp_engine.transport_dispatcher is not None:
+            self.snmp_engine.unregister_transport_dispatcher()
+        if self._receiver is not None:
+            self._receiver.close(self.snmp_engine)
+            self._receiver = None
+        # Traps already accepted are still delivered
+        self._decode_pending(len(self._pending_traps))
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+            self._socket_inode = None
         self._is_running = False
         logger.info("SNMP listener stopped")
\ No newline at end of file
@@ -0,0 +1,224 @@
+"""
+SNMPv3 user lookup with credential rotation.
+
+pysnmp's USM keeps one set of keys per (engine ID, user name) in its local
+configuration datastore, so only one credential of a user can be accepted
+and devices still on the previous password fail while a rotation is rolled
+out. RotatingUsmSecurityModel replaces that lookup for configured users:
+
+- Every active credential of the user is tried in priority order until one
+  authenticates and decrypts the message
+- The credential that worked is remembered per (engine ID, user) and tried
+  first for the next message from that engine
+- Keys are derived from a password once per credential (the 1 MB
+  password-to-key expansion of RFC 3414) and localized once per
+  (engine ID, credential), then kept in memory
+
+Users without configured credentials fall back to pysnmp's datastore.
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from pysnmp.entity import config
+from pysnmp.proto import errind, error
+from pysnmp.proto.secmod.rfc3414.service import SnmpUSMSecurityModel
+
+from mutt.models.credentials import SNMPv3Credential, SNMPv3CredentialSet
+
+logger = logging.getLogger(__name__)
+
+AUTH_PROTOCOLS = {
+    'SHA': config.USM_AUTH_HMAC96_SHA,
+    'MD5': config.USM_AUTH_HMAC96_MD5,
+    'SHA224': config.USM_AUTH_HMAC128_SHA224,
+    'SHA256': config.USM_AUTH_HMAC192_SHA256,
+    'SHA384': config.USM_AUTH_HMAC256_SHA384,
+    'SHA512': config.USM_AUTH_HMAC384_SHA512,
+}
+
+PRIV_PROTOCOLS = {
+    'AES': config.USM_PRIV_CFB128_AES,
+    'AES128': config.USM_PRIV_CFB128_AES,
+    'AES192': config.USM_PRIV_CFB192_AES,
+    'AES256': config.USM_PRIV_CFB256_AES,
+    'DES': config.USM_PRIV_CBC56_DES,
+    '3DES': config.USM_PRIV_CBC168_3DES,
+}
+
+# Failures another credential of the same user could fix
+RETRY_ERRORS = (errind.authenticationFailure, errind.decryptionError)
+
+Keys = Tuple[Any, Any]
+
+
+def credential_protocols(cred: SNMPv3Credential) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """
+    Map a credential's auth and priv types to pysnmp protocol IDs.
+
+    Args:
+        cred: Credential to map
+
+    Returns:
+        Tuple of (auth protocol, priv protocol); unknown types map to none
+    """
+    return (
+        AUTH_PROTOCOLS.get(cred.auth_type.upper(), config.USM_AUTH_NONE),
+        PRIV_PROTOCOLS.get(cred.priv_type.upper(), config.USM_PRIV_NONE),
+    )
+
+
+class RotatingUsmSecurityModel(SnmpUSMSecurityModel):
+    """USM that accepts any active credential of a user, trying the last good one first."""
+
+    def __init__(self, credentials_dict: Dict[str, SNMPv3CredentialSet], key_cache_size: int = 10000):
+        """
+        Initialize the security model.
+
+        Args:
+            credentials_dict: SNMPv3 credentials keyed by username
+            key_cache_size: Maximum number of (engine ID, credential)
+                localized key pairs kept in memory
+        """
+        super().__init__()
+        self._users: Dict[bytes, List[SNMPv3Credential]] = {}
+        for username, cred_set in credentials_dict.items():
+            active = cred_set.get_active_credentials()
+            if active:
+                self._users[username.encode()] = active
+
+        self.key_cache_size = max(1, key_cache_size)
+        self._master_keys: Dict[Tuple[bytes, int], Keys] = {}
+        self._local_keys: "OrderedDict[Tuple[bytes, bytes, int], Keys]" = OrderedDict()
+        self._preferred: Dict[Tuple[bytes, bytes], int] = {}
+
+        # Credentials tried for the message being processed, None outside
+        # process_incoming_message()
+        self._tried: Optional[List[int]] = None
+        self._attempt_user: Optional[Tuple[bytes, bytes]] = None
+
+        self.stats: Dict[str, int] = {
+            "key_derivations": 0,
+            "key_localizations": 0,
+            "credential_retries": 0,
+            "credential_switches": 0,
+        }
+
+    def process_incoming_message(
+        self, snmpEngine, messageProcessingModel, maxMessageSize, securityParameters,
+        securityModel, securityLevel, wholeMsg, msg
+    ):
+        """Process an incoming message, retrying with the user's other credentials."""
+        scoped_pdu_data = msg.getComponentByPosition(3)
+        encrypted_pdu = None
+        if scoped_pdu_data.getName() == "encryptedPDU":
+            encrypted_pdu = scoped_pdu_data.getComponent()
+
+        self._tried = []
+        self._attempt_user = None
+        try:
+            while True:
+                try:
+                    result = super().process_incoming_message(
+                        snmpEngine, messageProcessingModel, maxMessageSize, securityParameters,
+                        securityModel, securityLevel, wholeMsg, msg
+                    )
+                except error.StatusInformation as e:
+                    user = self._attempt_user
+                    if (user is None or e.get("errorIndication") not in RETRY_ERRORS
+                            or len(self._tried) >= len(self._users[user[1]])):
+                        raise
+                    # The failed attempt's security state is not reported
+                    if "securityStateReference" in e:
+                        self._cache.pop(e["securityStateReference"])
+                    # A wrong privacy key may have replaced the ciphertext
+                    if encrypted_pdu is not None:
+                        scoped_pdu_data.setComponentByPosition(1, encrypted_pdu)
+                    self._attempt_user = None
+                    self.stats["credential_retries"] += 1
+                    continue
+
+                if self._attempt_user is not None:
+                    self._remember(self._attempt_user, self._tried[-1])
+                return result
+        finally:
+            self._tried = None
+            self._attempt_user = None
+
+    def _SnmpUSMSecurityModel__get_user_info(self, mibInstrumController, securityEngineID, userName):
+        """
+        Return user info for one of the user's credentials.
+
+        Overrides pysnmp's private datastore lookup. While a message is
+        being processed, each call returns the next untried credential.
+        """
+        user_name = bytes(userName)
+        creds = self._users.get(user_name)
+        if creds is None:
+            return SnmpUSMSecurityModel._SnmpUSMSecurityModel__get_user_info(
+                mibInstrumController, securityEngineID, userName
+            )
+
+        engine_id = bytes(securityEngineID)
+        user = (engine_id, user_name)
+        order = self._order(user, len(creds))
+        if self._tried is None:
+            index = order[0]
+        else:
+            index = next(i for i in order if i not in self._tried)
+            self._tried.append(index)
+            self._attempt_user = user
+
+        auth_proto, priv_proto = credential_protocols(creds[index])
+        auth_key, priv_key = self._keys(securityEngineID, user_name, index)
+        return userName, userName, auth_proto, auth_key, priv_proto, priv_key
+
+    def _order(self, user: Tuple[bytes, bytes], count: int) -> List[int]:
+        """Credential indexes for a user, the last one that worked first."""
+        preferred = self._preferred.get(user, 0)
+        return [preferred] + [i for i in range(count) if i != preferred]
+
+    def _remember(self, user: Tuple[bytes, bytes], index: int) -> None:
+        """Record the credential that authenticated a message."""
+        if self._preferred.get(user, 0) != index:
+            self.stats["credential_switches"] += 1
+            logger.info(
+                f"[RotatingUsmSecurityModel] User {user[1].decode(errors='replace')} on engine {user[0].hex()} "
+                f"authenticated with credential priority {self._users[user[1]][index].priority}"
+            )
+        self._preferred[user] = index
+
+    def _keys(self, engine_id: Any, user_name: bytes, index: int) -> Keys:
+        """Return the localized (auth, priv) keys of a credential for an engine ID."""
+        key = (bytes(engine_id), user_name, index)
+        keys = self._local_keys.get(key)
+        if keys is not None:
+            self._local_keys.move_to_end(key)
+            return keys
+
+        auth_proto, priv_proto = credential_protocols(self._users[user_name][index])
+        master_auth, master_priv = self._master(user_name, index)
+        keys = (
+            self.AUTH_SERVICES[auth_proto].localize_key(master_auth, engine_id),
+            self.PRIV_SERVICES[priv_proto].localize_key(auth_proto, master_priv, engine_id),
+        )
+        self.stats["key_localizations"] += 1
+        self._local_keys[key] = keys
+        if len(self._local_keys) > self.key_cache_size:
+            self._local_keys.popitem(last=False)
+        return keys
+
+    def _master(self, user_name: bytes, index: int) -> Keys:
+        """Return the (auth, priv) master keys of a credential, deriving them once."""
+        keys = self._master_keys.get((user_name, index))
+        if keys is None:
+            cred = self._users[user_name][index]
+            auth_proto, priv_proto = credential_protocols(cred)
+            keys = (
+                self.AUTH_SERVICES[auth_proto].hash_passphrase(cred.auth_password.encode()),
+                self.PRIV_SERVICES[priv_proto].hash_passphrase(auth_proto, cred.priv_password.encode()),
+            )
+            self.stats["key_derivations"] += 1
+            self._master_keys[(user_name, index)] = keys
+        return keys
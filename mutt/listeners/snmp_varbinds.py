@@ -0,0 +1,155 @@
+"""
+Fast rendering of SNMP variable bindings.
+
+pysnmp's prettyPrint() goes through several layers of generic pyasn1 code for
+every OID and value. Traps carry a small set of value types, so this module
+renders those directly and produces the same strings prettyPrint() would:
+
+- OIDs are joined from their integer tuples, with a cache keyed by the tuple,
+  since the same varbind names repeat across traps
+- Integer-based values (Integer32, Counter32/64, Gauge32, TimeTicks, ...)
+  via int()
+- OctetString and Opaque as text when every byte is printable ASCII,
+  otherwise 0x-prefixed hex
+- IpAddress as dotted octets
+
+A renderer is picked once per value class and only when the class keeps
+pyasn1's default formatting; anything else (Bits, enumerated Integers,
+non-pyasn1 objects) falls back to prettyPrint().
+"""
+
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from pyasn1.type import univ
+from pysnmp.proto import rfc1155, rfc1902
+
+# snmpTrapOID.0, whose value is the OID identifying the notification
+SNMP_TRAP_OID = (1, 3, 6, 1, 6, 3, 1, 1, 4, 1, 0)
+
+OID_CACHE_SIZE = 65536
+
+_oid_strings: Dict[Tuple[int, ...], str] = {}
+_renderers: Dict[type, Callable[[Any], str]] = {}
+
+_IP_ADDRESS_FORMATS = (rfc1902.IpAddress.prettyOut, rfc1155.IpAddress.prettyOut)
+
+
+def render_oid(oid: Tuple[int, ...]) -> str:
+    """
+    Render an OID tuple in dotted form.
+
+    Args:
+        oid: OID as a tuple of integers
+
+    Returns:
+        Dotted OID string, e.g. "1.3.6.1.2.1.1.3.0"
+    """
+    text = _oid_strings.get(oid)
+    if text is None:
+        if len(_oid_strings) >= OID_CACHE_SIZE:
+            _oid_strings.clear()
+        text = _oid_strings[oid] = ".".join(map(str, oid))
+    return text
+
+
+def render_value(value: Any) -> str:
+    """
+    Render a varbind value the way prettyPrint() would.
+
+    Args:
+        value: pyasn1/pysnmp value object
+
+    Returns:
+        String rendering of the value
+    """
+    cls = type(value)
+    renderer = _renderers.get(cls)
+    if renderer is None:
+        renderer = _renderers[cls] = _choose_renderer(cls)
+    return renderer(value)
+
+
+def render_varbinds(var_binds: Iterable[Tuple[Any, Any]]) -> Tuple[Dict[str, str], Optional[str]]:
+    """
+    Render trap variable bindings and find the trap OID.
+
+    Args:
+        var_binds: (name, value) pairs delivered by pysnmp
+
+    Returns:
+        Tuple of ({oid: value}, value of snmpTrapOID.0 or None)
+    """
+    rendered: Dict[str, str] = {}
+    trap_oid = None
+    for name, value in var_binds:
+        if isinstance(name, univ.ObjectIdentifier):
+            oid = name.asTuple()
+            key = render_oid(oid)
+            text = render_value(value)
+            if oid == SNMP_TRAP_OID:
+                trap_oid = text
+        else:
+            key = name.prettyPrint()
+            text = value.prettyPrint()
+            if 'snmpTrapOID' in key or '1.3.6.1.6.3.1.1.4.1' in key:
+                trap_oid = text
+        rendered[key] = text
+    return rendered, trap_oid
+
+
+def render_varbinds_pretty(var_binds: Iterable[Tuple[Any, Any]]) -> Tuple[Dict[str, str], Optional[str]]:
+    """
+    Render trap variable bindings with prettyPrint() only.
+
+    Same result as render_varbinds() for values it renders directly, kept
+    for comparison and as a fallback mode.
+    """
+    rendered: Dict[str, str] = {}
+    trap_oid = None
+    for name, value in var_binds:
+        key = name.prettyPrint()
+        text = value.prettyPrint()
+        rendered[key] = text
+        if 'snmpTrapOID' in key or '1.3.6.1.6.3.1.1.4.1' in key:
+            trap_oid = text
+    return rendered, trap_oid
+
+
+def _choose_renderer(cls: type) -> Callable[[Any], str]:
+    """Pick the cheapest renderer that matches prettyPrint() for a class."""
+    if issubclass(cls, univ.ObjectIdentifier) and cls.prettyOut is univ.ObjectIdentifier.prettyOut:
+        return _render_oid_value
+    if issubclass(cls, univ.OctetString) and cls.prettyPrint is univ.OctetString.prettyPrint:
+        if cls.prettyOut in _IP_ADDRESS_FORMATS:
+            return _render_ip_address
+        if cls.prettyOut is univ.OctetString.prettyOut:
+            return _render_octets
+    if (issubclass(cls, univ.Integer) and cls.prettyOut is univ.Integer.prettyOut
+            and not cls.namedValues):
+        return _render_integer
+    return _render_pretty
+
+
+def _render_oid_value(value: Any) -> str:
+    return render_oid(value.asTuple())
+
+
+def _render_octets(value: Any) -> str:
+    raw = value.asOctets()
+    if raw.isascii():
+        text = raw.decode("ascii")
+        if text.isprintable():
+            return text
+    return "0x" + raw.hex()
+
+
+def _render_ip_address(value: Any) -> str:
+    return ".".join(map(str, value.asOctets()))
+
+
+def _render_integer(value: Any) -> str:
+    return str(int(value))
+
+
+def _render_pretty(value: Any) -> str:
+    return value.prettyPrint()
@@ -4,11 +4,16 @@ Listens for syslog messages over UDP and parses them into SyslogMessage objects.
 """
 
 import asyncio
-import re
 import logging
-from typing import Optional, Tuple
+import socket
+from typing import Any, Dict, List, Optional, Tuple
 
 from mutt.listeners.base import BaseListener
+from mutt.listeners.socket_stats import set_receive_buffer, socket_inode, udp_drops
+from mutt.listeners.syslog_parser import (
+    SYSLOG_REGEX, Syslog5424Fields, SyslogFields,
+    parse_rfc3164, parse_rfc3164_regex, parse_rfc5424, split_tag
+)
 from mutt.models.message import MessageType, Severity, SyslogMessage
 
 logger = logging.getLogger(__name__)
@@ -28,16 +33,14 @@ class SyslogListener(BaseListener):
     """
     Listener for syslog messages over UDP.
     
-    Parses syslog messages according to RFC 3164 format and converts them
-    to SyslogMessage objects for processing.
+    Parses syslog messages in RFC 3164 or RFC 5424 format, detected per
+    datagram, and converts them to SyslogMessage objects for processing.
+    RFC 3164 lines go through the header fast path in syslog_parser, with
+    SYSLOG_REGEX as fallback.
     """
     
-    # RFC 3164 syslog format regex
-    # <PRI>TIMESTAMP HOSTNAME TAG: MESSAGE
-    SYSLOG_REGEX = re.compile(
-        r'<(\d+)>(\w{3}\s+\d+\s+\d+:\d+:\d+)\s+([\w\.-]+)\s+([^:]+):\s*(.*)',
-        re.DOTALL
-    )
+    # RFC 3164 syslog format regex, used for lines the fast path rejects
+    SYSLOG_REGEX = SYSLOG_REGEX
     
     # Map syslog severity numbers to Severity enum
     SEVERITY_MAP = {
@@ -55,7 +58,12 @@ class SyslogListener(BaseListener):
         self,
         queue: asyncio.Queue,
         port: int = 5514,
-        host: str = "0.0.0.0"
+        host: str = "0.0.0.0",
+        reuse_port: bool = False,
+        receive_mode: str = "protocol",
+        batch_size: int = 256,
+        max_datagram_size: int = 65535,
+        recv_buffer_size: Optional[int] = None
     ):
         """
         Initialize the syslog listener.
@@ -64,28 +72,69 @@ class SyslogListener(BaseListener):
             queue: Queue to put parsed messages into
             port: UDP port to listen on (default: 5514)
             host: Host interface to bind to (default: "0.0.0.0")
+            reuse_port: Bind with SO_REUSEPORT so several sockets can share
+                the port and the kernel spreads datagrams across them
+            receive_mode: "protocol" for one event-loop callback per datagram,
+                "batch" to drain up to batch_size datagrams per wakeup
+            batch_size: Maximum datagrams read per wakeup in batch mode
+            max_datagram_size: Receive buffer size in batch mode; longer
+                datagrams are truncated
+            recv_buffer_size: SO_RCVBUF in bytes; the system default if None
+        
+        Raises:
+            ValueError: If receive_mode is not "protocol" or "batch"
         """
+        if receive_mode not in ("protocol", "batch"):
+            raise ValueError(f"Unknown syslog receive_mode: {receive_mode}")
         super().__init__(queue)
         self.port = port
         self.host = host
+        self.reuse_port = reuse_port
+        self.receive_mode = receive_mode
+        self.batch_size = max(1, batch_size)
+        self.max_datagram_size = max_datagram_size
+        self.recv_buffer_size = recv_buffer_size
+        self._socket_inode: Optional[int] = None
         self.transport: Optional[asyncio.DatagramTransport] = None
         self.protocol: Optional[SyslogProtocol] = None
+        self._sock: Optional[socket.socket] = None
+        self._recv_buffer: Optional[memoryview] = None
+        self.receive_stats: Dict[str, int] = {"wakeups": 0, "datagrams": 0, "max_batch": 0}
         
     async def start(self) -> None:
         """Start listening for syslog messages."""
+        if self.receive_mode == "batch":
+            self._start_batch_receiver()
+            self._is_running = True
+            logger.info(
+                f"Syslog listener started on {self.host}:{self.port} "
+                f"(batch receive, up to {self.batch_size} datagrams per wakeup)"
+            )
+            return
+        
         loop = asyncio.get_running_loop()
         self.protocol = SyslogProtocol(self)
         
         # Create UDP endpoint
         self.transport, _ = await loop.create_datagram_endpoint(
             lambda: self.protocol,
-            local_addr=(self.host, self.port)
+            local_addr=(self.host, self.port),
+            reuse_port=self.reuse_port or None
         )
+        self._configure_socket(self.transport.get_extra_info("socket"))
         self._is_running = True
         logger.info(f"Syslog listener started on {self.host}:{self.port}")
     
     async def stop(self) -> None:
         """Stop the listener and clean up resources."""
+        self._socket_inode = None
+        if self._sock:
+            asyncio.get_running_loop().remove_reader(self._sock.fileno())
+            self._sock.close()
+            self._sock = None
+            self._recv_buffer = None
+            self._is_running = False
+            logger.info("Syslog listener stopped")
         if self.transport:
             self.transport.close()
             self.transport = None
@@ -101,21 +150,152 @@ class SyslogListener(BaseListener):
             data: Raw UDP payload
             addr: Tuple of (source_ip, source_port)
         """
+        self.ingest_stats["received"] += 1
         try:
-            # Decode the data
-            text = data.decode('utf-8', errors='replace').strip()
-            source_ip, source_port = addr
-            
             # Parse the syslog message
-            syslog_msg = self._parse_syslog_message(text, source_ip)
+            syslog_msg = self._parse_datagram(data, addr[0])
             
             if syslog_msg:
+                self.ingest_stats["parsed"] += 1
                 # Put the message in the queue
-                self.queue.put_nowait(syslog_msg)
+                if self.queue.put_nowait(syslog_msg) is not False:
+                    self.ingest_stats["enqueued"] += 1
                 
         except Exception as e:
             logger.error(f"Error processing syslog data: {e}")
     
+    def get_receive_stats(self) -> Dict[str, Any]:
+        """
+        Return batch receive statistics.
+        
+        Returns:
+            Dictionary with wakeups, datagrams, max_batch and avg_batch
+        """
+        stats: Dict[str, Any] = dict(self.receive_stats)
+        wakeups = stats["wakeups"]
+        stats["avg_batch"] = stats["datagrams"] / wakeups if wakeups else 0.0
+        return stats
+    
+    def kernel_drops(self) -> Optional[int]:
+        """
+        Return datagrams dropped by the kernel on this listener's socket.
+        
+        Returns:
+            Drop count from /proc/net/udp, or None if not available
+        """
+        if self._socket_inode is None:
+            return None
+        return udp_drops([self._socket_inode])
+    
+    def _configure_socket(self, sock: socket.socket) -> None:
+        """Apply recv_buffer_size and remember the socket for drop accounting."""
+        if self.recv_buffer_size:
+            set_receive_buffer(sock, self.recv_buffer_size)
+        self._socket_inode = socket_inode(sock)
+    
+    def _start_batch_receiver(self) -> None:
+        """Bind a non-blocking socket and drain it from an event-loop reader callback."""
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_DGRAM)
+        try:
+            if self.reuse_port:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            sock.setblocking(False)
+            sock.bind((self.host, self.port))
+            self._configure_socket(sock)
+        except OSError:
+            sock.close()
+            raise
+        self._sock = sock
+        # One preallocated buffer, reused for every datagram
+        self._recv_buffer = memoryview(bytearray(self.max_datagram_size))
+        asyncio.get_running_loop().add_reader(sock.fileno(), self._drain_socket)
+    
+    def _drain_socket(self) -> None:
+        """Read every pending datagram (up to batch_size), parse them and enqueue as one batch."""
+        sock = self._sock
+        buffer = self._recv_buffer
+        if sock is None:
+            return
+        
+        batch: List[SyslogMessage] = []
+        received = 0
+        for _ in range(self.batch_size):
+            try:
+                nbytes, addr = sock.recvfrom_into(buffer)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError as e:
+                logger.error(f"Error receiving syslog datagram: {e}")
+                break
+            received += 1
+            try:
+                syslog_msg = self._parse_datagram(bytes(buffer[:nbytes]), addr[0])
+            except Exception as e:
+                logger.error(f"Error processing syslog data: {e}")
+                continue
+            if syslog_msg:
+                batch.append(syslog_msg)
+        
+        if not received:
+            return
+        self.ingest_stats["received"] += received
+        self.ingest_stats["parsed"] += len(batch)
+        stats = self.receive_stats
+        stats["wakeups"] += 1
+        stats["datagrams"] += received
+        if received > stats["max_batch"]:
+            stats["max_batch"] = received
+        
+        if batch:
+            self._enqueue_batch(batch)
+    
+    def _enqueue_batch(self, batch: List[SyslogMessage]) -> None:
+        """Put a batch of parsed messages on the queue in one call where supported."""
+        put_batch = getattr(self.queue, 'put_batch', None)
+        try:
+            if put_batch is not None:
+                self.ingest_stats["enqueued"] += put_batch(batch)
+            else:
+                for syslog_msg in batch:
+                    # BoundedMessageQueue returns False when its policy drops
+                    if self.queue.put_nowait(syslog_msg) is not False:
+                        self.ingest_stats["enqueued"] += 1
+        except asyncio.QueueFull:
+            logger.warning("Syslog queue full, dropping remainder of batch")
+    
+    def _parse_datagram(self, data: bytes, source_ip: str) -> Optional[SyslogMessage]:
+        """
+        Parse a raw datagram, detecting RFC 3164 or RFC 5424.
+        
+        Args:
+            data: Raw UDP payload
+            source_ip: Source IP address
+            
+        Returns:
+            SyslogMessage object if parsing successful, None otherwise
+        """
+        return self._parse_text(data.decode('utf-8', errors='replace'), source_ip)
+    
+    def _parse_text(self, text: str, source_ip: str) -> Optional[SyslogMessage]:
+        """
+        Parse a decoded syslog line, detecting RFC 3164 or RFC 5424.
+        
+        Args:
+            text: Decoded syslog line; it does not need to be stripped
+            source_ip: Source IP address
+            
+        Returns:
+            SyslogMessage object if parsing successful, None otherwise
+        """
+        fields = parse_rfc3164(text)
+        if fields is not None:
+            return self._build_message(fields, source_ip)
+        fields_5424 = parse_rfc5424(text)
+        if fields_5424 is not None:
+            return self._build_5424_message(fields_5424, source_ip)
+        return self._parse_syslog_message(text.strip(), source_ip)
+    
     def _parse_syslog_message(
         self, 
         text: str, 
@@ -132,42 +312,87 @@ class SyslogListener(BaseListener):
             SyslogMessage object if parsing successful, None otherwise
         """
         try:
-            match = self.SYSLOG_REGEX.match(text)
+            fields = parse_rfc3164_regex(text)
+            if fields is not None:
+                return self._build_message(fields, source_ip)
             
-            if match:
-                # Parse structured syslog message
-                priority_str, timestamp, hostname, process_name, payload = match.groups()
-                
-                # Parse priority
-                priority = int(priority_str)
-                facility = priority // 8
-                severity_num = priority % 8
-                
-                # Map severity number to Severity enum
-                severity = self.SEVERITY_MAP.get(severity_num, Severity.INFO)
-                
-            else:
-                # Unstructured message - use defaults
-                priority = 13  # Default: user-level, notice (1*8 + 5)
-                facility = 1  # user-level
-                severity_num = 5  # notice
-                severity = Severity.INFO  # Default for unknown format
-                hostname = "unknown"
-                process_name = "unknown"
-                payload = text
-            
-            # Create and return the syslog message
+            # Unstructured message - use defaults
             return SyslogMessage(
                 source_ip=source_ip,
                 message_type=MessageType.SYSLOG,
-                severity=severity,
-                payload=payload,
-                facility=facility,
-                priority=priority,
-                hostname=hostname,
-                process_name=process_name
+                severity=Severity.INFO,  # Default for unknown format
+                payload=text,
+                facility=1,  # user-level
+                priority=13,  # Default: user-level, notice (1*8 + 5)
+                hostname="unknown",
+                process_name="unknown"
             )
             
         except Exception as e:
             logger.error(f"Failed to parse syslog message: {e}")
             return None
+    
+    def _build_message(self, fields: SyslogFields, source_ip: str) -> SyslogMessage:
+        """
+        Create a SyslogMessage from parsed header fields.
+        
+        Args:
+            fields: Parsed RFC 3164 fields
+            source_ip: Source IP address
+            
+        Returns:
+            SyslogMessage with process_id split from TAG[PID] and the header
+            timestamp kept in metadata
+        """
+        priority, timestamp, hostname, tag, payload = fields
+        process_name, process_id = split_tag(tag)
+        return SyslogMessage(
+            source_ip=source_ip,
+            message_type=MessageType.SYSLOG,
+            severity=self.SEVERITY_MAP.get(priority % 8, Severity.INFO),
+            payload=payload,
+            metadata={"syslog_timestamp": timestamp},
+            facility=priority // 8,
+            priority=priority,
+            hostname=hostname,
+            process_name=process_name,
+            process_id=process_id
+        )
+    
+    def _build_5424_message(self, fields: Syslog5424Fields, source_ip: str) -> SyslogMessage:
+        """
+        Create a SyslogMessage from parsed RFC 5424 fields.
+        
+        Args:
+            fields: Parsed RFC 5424 fields
+            source_ip: Source IP address
+            
+        Returns:
+            SyslogMessage with APP-NAME as process_name, a numeric PROCID as
+            process_id (others kept in metadata) and MSGID/STRUCTURED-DATA set
+        """
+        (priority, version, timestamp, hostname, app_name,
+         procid, msgid, structured_data, payload) = fields
+        metadata = {"syslog_format": "rfc5424", "syslog_version": version}
+        if timestamp is not None:
+            metadata["syslog_timestamp"] = timestamp
+        process_id = None
+        if procid is not None:
+            if procid.isascii() and procid.isdigit():
+                process_id = int(procid)
+            else:
+                metadata["procid"] = procid
+        return SyslogMessage(
+            source_ip=source_ip,
+            message_type=MessageType.SYSLOG,
+            severity=self.SEVERITY_MAP.get(priority % 8, Severity.INFO),
+            payload=payload,
+            metadata=metadata,
+            facility=priority // 8,
+            priority=priority,
+            hostname=hostname or "unknown",
+            process_name=app_name,
+            process_id=process_id,
+            msg_id=msgid,
+            structured_data=structured_data
+        )
@@ -0,0 +1,193 @@
+"""
+Syslog header parsing for SyslogListener.
+
+parse_rfc5424() handles RFC 5424 lines, including STRUCTURED-DATA.
+parse_rfc3164() is the fast path for the common BSD layout
+
+    <PRI>Mmm dd hh:mm:ss HOST TAG[PID]: MSG
+
+It matches only the header, with single-space separators and character
+classes that never overlap their delimiters, so the match is one forward
+pass with no backtracking and the message body is never scanned by the
+regex engine. Lines outside that layout (tabs, runs of spaces, non-ASCII
+hostnames, ...) return None and go through parse_rfc3164_regex(), the
+original SYSLOG_REGEX behaviour. Where the fast path accepts a line, both
+return the same fields.
+"""
+
+import re
+from typing import Dict, Optional, Tuple
+
+# RFC 3164 syslog format regex
+# <PRI>TIMESTAMP HOSTNAME TAG: MESSAGE
+SYSLOG_REGEX = re.compile(
+    r'<(\d+)>(\w{3}\s+\d+\s+\d+:\d+:\d+)\s+([\w\.-]+)\s+([^:]+):\s*(.*)',
+    re.DOTALL
+)
+
+# Strict header-only subset of SYSLOG_REGEX; the day is space padded or two digits
+RFC3164_HEADER = re.compile(
+    r'<([0-9]{1,3})>'
+    r'([A-Za-z]{3} [ 0-9][0-9] [0-9][0-9]:[0-9][0-9]:[0-9][0-9]) '
+    r'([A-Za-z0-9_.-]+) '
+    r'([^:\s][^:]*):'
+)
+
+
+# (priority, timestamp, hostname, tag, payload); a plain tuple keeps the
+# per-datagram cost down
+SyslogFields = Tuple[int, str, str, str, str]
+
+
+def parse_rfc3164(text: str) -> Optional[SyslogFields]:
+    """
+    Parse an RFC 3164 line with the header-only fast path.
+
+    Args:
+        text: Decoded syslog line; it does not need to be stripped
+
+    Returns:
+        SyslogFields, or None if the line is not in the common layout and
+        must go through parse_rfc3164_regex()
+    """
+    match = RFC3164_HEADER.match(text)
+    if match is None:
+        return None
+    priority, timestamp, hostname, tag = match.groups()
+    return int(priority), timestamp, hostname, tag, text[match.end():].strip()
+
+
+def parse_rfc3164_regex(text: str) -> Optional[SyslogFields]:
+    """
+    Parse an RFC 3164 line with SYSLOG_REGEX.
+
+    Args:
+        text: Decoded and stripped syslog line
+
+    Returns:
+        SyslogFields, or None if the line does not match
+    """
+    match = SYSLOG_REGEX.match(text)
+    if not match:
+        return None
+    priority_str, timestamp, hostname, tag, payload = match.groups()
+    return int(priority_str), timestamp, hostname, tag, payload
+
+
+def split_tag(tag: str) -> Tuple[str, Optional[int]]:
+    """
+    Split a TAG[PID] field into process name and PID.
+
+    Args:
+        tag: Tag as parsed from the header, e.g. "sshd[1234]"
+
+    Returns:
+        (process_name, process_id); process_id is None without a numeric PID
+    """
+    if tag.endswith("]"):
+        bracket = tag.rfind("[")
+        pid = tag[bracket + 1:-1]
+        if bracket > 0 and pid.isascii() and pid.isdigit():
+            return tag[:bracket], int(pid)
+    return tag, None
+
+
+# <PRI>VERSION TIMESTAMP HOSTNAME APP-NAME PROCID MSGID, then STRUCTURED-DATA
+RFC5424_HEADER = re.compile(
+    r'<([0-9]{1,3})>([1-9][0-9]?) (\S+) (\S+) (\S+) (\S+) (\S+) '
+)
+
+# One PARAM-NAME="PARAM-VALUE" inside an SD-ELEMENT; values escape " \ ]
+_SD_PARAM = re.compile(r' ([^= \]"]{1,32})="((?:[^"\\]|\\.)*)"')
+_SD_ESCAPE = re.compile(r'\\(["\\\]])')
+
+NILVALUE = "-"
+
+# (priority, version, timestamp, hostname, app_name, procid, msgid,
+#  structured_data, payload); NILVALUE fields are None
+Syslog5424Fields = Tuple[
+    int, int, Optional[str], Optional[str], Optional[str], Optional[str],
+    Optional[str], Dict[str, Dict[str, str]], str
+]
+
+
+def parse_structured_data(text: str, pos: int) -> Tuple[Optional[Dict[str, Dict[str, str]]], int]:
+    """
+    Parse the STRUCTURED-DATA field of an RFC 5424 message.
+
+    Args:
+        text: Full syslog line
+        pos: Offset of the field (a NILVALUE or the first '[')
+
+    Returns:
+        (elements, end offset); elements maps SD-ID to its parameters and is
+        None if the field is malformed
+    """
+    if text.startswith(NILVALUE, pos):
+        return {}, pos + 1
+
+    elements: Dict[str, Dict[str, str]] = {}
+    length = len(text)
+    while pos < length and text[pos] == "[":
+        id_end = pos + 1
+        while id_end < length and text[id_end] not in ' ]="':
+            id_end += 1
+        if id_end == pos + 1 or id_end >= length:
+            return None, pos
+        params = elements.setdefault(text[pos + 1:id_end], {})
+        pos = id_end
+        while True:
+            match = _SD_PARAM.match(text, pos)
+            if match is None:
+                break
+            name, value = match.groups()
+            params[name] = _SD_ESCAPE.sub(r"\1", value) if "\\" in value else value
+            pos = match.end()
+        if pos >= length or text[pos] != "]":
+            return None, pos
+        pos += 1
+
+    return (elements or None), pos
+
+
+def parse_rfc5424(text: str) -> Optional[Syslog5424Fields]:
+    """
+    Parse an RFC 5424 line.
+
+    A malformed STRUCTURED-DATA field keeps the header fields and returns
+    everything after MSGID as the payload.
+
+    Args:
+        text: Decoded syslog line; it does not need to be stripped
+
+    Returns:
+        Syslog5424Fields, or None if the line has no RFC 5424 header
+    """
+    match = RFC5424_HEADER.match(text)
+    if match is None:
+        return None
+    priority, version, timestamp, hostname, app_name, procid, msgid = match.groups()
+
+    structured_data, pos = parse_structured_data(text, match.end())
+    if structured_data is None:
+        structured_data, payload = {}, text[match.end():]
+    elif pos == len(text) or text[pos].isspace():
+        # A line terminator may follow the SD directly when there is no MSG
+        payload = text[pos + 1:]
+    else:
+        structured_data, payload = {}, text[match.end():]
+
+    # MSG may be marked as UTF-8 with a BOM
+    payload = payload.strip()
+    if payload.startswith("\ufeff"):
+        payload = payload[1:]
+
+    return (
+        int(priority), int(version),
+        None if timestamp == NILVALUE else timestamp,
+        None if hostname == NILVALUE else hostname,
+        None if app_name == NILVALUE else app_name,
+        None if procid == NILVALUE else procid,
+        None if msgid == NILVALUE else msgid,
+        structured_data, payload,
+    )
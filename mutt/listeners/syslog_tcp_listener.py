@@ -0,0 +1,415 @@
+"""
+Syslog over TCP and TLS (RFC 6587 / RFC 5425).
+
+Each connection reads straight into its own fixed buffer through
+asyncio.BufferedProtocol. SyslogFramer splits the buffer into frames in place,
+handing out memoryview slices that are decoded without an intermediate bytes
+copy; only the incomplete frame at the end of a read is moved back to the
+start of the buffer. Both RFC 6587 framings are accepted, detected per frame:
+
+- octet counting: "<length> <message>", used when a frame starts with a digit
+- non-transparent framing: "<message>\\n", anything else
+
+Unlike UDP, TCP can push back: while the message queue is above its high
+watermark every connection stops reading, so senders are slowed by TCP flow
+control instead of datagrams being lost in the kernel.
+"""
+
+import asyncio
+import logging
+import ssl
+from typing import Any, Dict, List, Optional, Set
+
+from mutt.listeners.syslog_listener import SyslogListener
+from mutt.models.message import SyslogMessage
+
+logger = logging.getLogger(__name__)
+
+# Bytes skipped between frames
+_FRAME_SEPARATORS = frozenset(b"\r\n\0 ")
+
+
+class FramingError(ValueError):
+    """Raised when a stream cannot be split into syslog frames."""
+
+
+class SyslogFramer:
+    """
+    Incremental RFC 6587 framer over a fixed-size buffer.
+
+    Usage mirrors asyncio.BufferedProtocol: write received bytes into
+    get_buffer(), then call feed() with the byte count. Frames returned by
+    feed() are views into the buffer and are only valid until the next
+    get_buffer() call.
+    """
+
+    def __init__(self, max_frame_size: int = 65536):
+        """
+        Initialize the framer.
+
+        Args:
+            max_frame_size: Largest frame accepted. Longer octet-counted frames
+                are a FramingError; longer LF-terminated frames are truncated.
+        """
+        self.max_frame_size = max_frame_size
+        # Room for one maximum frame plus its "<length> " header
+        self._header_max = len(str(max_frame_size)) + 1
+        self._buffer = bytearray(max_frame_size + self._header_max)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+        self._discarding = False
+        self.truncated = 0
+
+    def get_buffer(self) -> memoryview:
+        """
+        Return the free space at the end of the buffer.
+
+        Returns:
+            Writable view to receive into
+        """
+        if self._start:
+            # Only the partial frame at the end is copied
+            remaining = self._end - self._start
+            self._buffer[:remaining] = self._buffer[self._start:self._end]
+            self._start = 0
+            self._end = remaining
+        return self._view[self._end:]
+
+    def feed(self, nbytes: int) -> List[memoryview]:
+        """
+        Account for nbytes written into get_buffer() and extract complete frames.
+
+        Args:
+            nbytes: Number of bytes received
+
+        Returns:
+            Complete frames, without framing bytes
+
+        Raises:
+            FramingError: On an invalid or oversized octet count
+        """
+        self._end += nbytes
+        buffer = self._buffer
+        view = self._view
+        start = self._start
+        end = self._end
+        frames: List[memoryview] = []
+
+        while start < end:
+            if self._discarding:
+                newline = buffer.find(b"\n", start, end)
+                if newline < 0:
+                    start = end
+                    break
+                start = newline + 1
+                self._discarding = False
+                continue
+
+            first = buffer[start]
+            if first in _FRAME_SEPARATORS:
+                start += 1
+                continue
+
+            if 0x30 <= first <= 0x39:
+                # Octet counting: "<length> <message>"
+                space = buffer.find(b" ", start, min(end, start + self._header_max))
+                if space < 0:
+                    if end - start >= self._header_max:
+                        raise FramingError("invalid octet count")
+                    break
+                digits = bytes(buffer[start:space])
+                if not digits.isdigit():
+                    raise FramingError(f"invalid octet count {digits[:16]!r}")
+                length = int(digits)
+                if length > self.max_frame_size:
+                    raise FramingError(f"frame of {length} bytes exceeds max_frame_size")
+                frame_end = space + 1 + length
+                if frame_end > end:
+                    break
+                frames.append(view[space + 1:frame_end])
+                start = frame_end
+                continue
+
+            # Non-transparent framing: "<message>\n"
+            newline = buffer.find(b"\n", start, end)
+            if newline < 0:
+                if end - start > self.max_frame_size:
+                    frames.append(view[start:start + self.max_frame_size])
+                    self.truncated += 1
+                    self._discarding = True
+                    start = end
+                break
+            frame_end = newline
+            if frame_end > start and buffer[frame_end - 1] == 0x0D:
+                frame_end -= 1
+            if frame_end - start > self.max_frame_size:
+                frame_end = start + self.max_frame_size
+                self.truncated += 1
+            frames.append(view[start:frame_end])
+            start = newline + 1
+
+        if start == end:
+            start = end = 0
+        self._start = start
+        self._end = end
+        return frames
+
+    def flush(self) -> Optional[memoryview]:
+        """
+        Return a trailing LF-framed message that was never terminated.
+
+        Called at end of stream, since many senders omit the final newline.
+        An incomplete octet-counted frame is discarded.
+
+        Returns:
+            The pending frame, or None
+        """
+        start, end = self._start, self._end
+        self._start = self._end = 0
+        if start == end or self._discarding or 0x30 <= self._buffer[start] <= 0x39:
+            return None
+        return self._view[start:end]
+
+    def feed_data(self, data: bytes) -> List[bytes]:
+        """
+        Feed bytes that were received elsewhere and return frames as bytes.
+
+        Args:
+            data: Received bytes
+
+        Returns:
+            Complete frames
+
+        Raises:
+            FramingError: On an invalid or oversized octet count
+        """
+        frames: List[bytes] = []
+        data_view = memoryview(data)
+        while data_view:
+            buffer = self.get_buffer()
+            count = min(len(buffer), len(data_view))
+            buffer[:count] = data_view[:count]
+            frames.extend(bytes(frame) for frame in self.feed(count))
+            data_view = data_view[count:]
+        return frames
+
+
+class SyslogStreamProtocol(asyncio.BufferedProtocol):
+    """Protocol handler for one syslog TCP/TLS connection."""
+
+    def __init__(self, listener: 'SyslogTCPListener'):
+        self.listener = listener
+        self.framer = SyslogFramer(listener.max_frame_size)
+        self.transport: Optional[asyncio.Transport] = None
+        self.source_ip = "unknown"
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport
+        peername = transport.get_extra_info("peername")
+        if peername:
+            self.source_ip = peername[0]
+        self.listener._connection_made(self)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.listener._connection_lost(self)
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self.framer.get_buffer()
+
+    def buffer_updated(self, nbytes: int) -> None:
+        self.listener.stats["bytes"] += nbytes
+        try:
+            frames = self.framer.feed(nbytes)
+        except FramingError as e:
+            self.listener.stats["framing_errors"] += 1
+            logger.warning(f"[SyslogTCPListener] Closing connection from {self.source_ip}: {e}")
+            self.transport.close()
+            return
+        if frames:
+            self.listener._process_frames(frames, self.source_ip)
+
+    def eof_received(self) -> bool:
+        frame = self.framer.flush()
+        if frame is not None:
+            self.listener._process_frames([frame], self.source_ip)
+        return False
+
+
+def create_server_ssl_context(
+    certfile: str,
+    keyfile: Optional[str] = None,
+    cafile: Optional[str] = None
+) -> ssl.SSLContext:
+    """
+    Build a TLS server context for the syslog listener.
+
+    Args:
+        certfile: PEM certificate (chain) presented to clients
+        keyfile: PEM private key, if not included in certfile
+        cafile: CA bundle; when set, clients must present a certificate it signed
+
+    Returns:
+        Server-side SSLContext
+    """
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(certfile, keyfile)
+    if cafile:
+        context.load_verify_locations(cafile)
+        context.verify_mode = ssl.CERT_REQUIRED
+    return context
+
+
+class SyslogTCPListener(SyslogListener):
+    """
+    Listener for syslog messages over TCP, optionally with TLS.
+
+    Parsing is that of SyslogListener; each frame is handled like one UDP
+    datagram. Connections beyond max_connections are closed on accept, and
+    reading is paused on every connection while the queue signals
+    backpressure.
+    """
+
+    def __init__(
+        self,
+        queue: asyncio.Queue,
+        port: int = 5514,
+        host: str = "0.0.0.0",
+        ssl_context: Optional[ssl.SSLContext] = None,
+        max_connections: int = 1000,
+        max_frame_size: int = 65536
+    ):
+        """
+        Initialize the TCP syslog listener.
+
+        Args:
+            queue: Queue to put parsed messages into
+            port: TCP port to listen on (default: 5514)
+            host: Host interface to bind to (default: "0.0.0.0")
+            ssl_context: Server context to accept TLS connections, see
+                create_server_ssl_context()
+            max_connections: Maximum concurrent connections
+            max_frame_size: Largest frame accepted, and the per-connection
+                read buffer size
+        """
+        super().__init__(queue, port=port, host=host)
+        self.ssl_context = ssl_context
+        self.max_connections = max(1, max_connections)
+        self.max_frame_size = max_frame_size
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.connections: Set[SyslogStreamProtocol] = set()
+        self._closed_truncated = 0
+        self.stats: Dict[str, int] = {
+            "connections_accepted": 0,
+            "connections_rejected": 0,
+            "bytes": 0,
+            "frames": 0,
+            "framing_errors": 0,
+            "pauses": 0,
+        }
+
+    async def start(self) -> None:
+        """Start accepting syslog connections."""
+        loop = asyncio.get_running_loop()
+        self.server = await loop.create_server(
+            lambda: SyslogStreamProtocol(self),
+            host=self.host,
+            port=self.port,
+            ssl=self.ssl_context,
+            reuse_address=True
+        )
+        self._is_running = True
+        transport = "TLS" if self.ssl_context else "TCP"
+        logger.info(f"[SyslogTCPListener] Listening for syslog over {transport} on {self.host}:{self.port}")
+
+    async def stop(self) -> None:
+        """Stop accepting connections and close the open ones."""
+        if not self.server:
+            return
+        self.server.close()
+        for connection in list(self.connections):
+            connection.transport.close()
+        await self.server.wait_closed()
+        self.server = None
+        self._is_running = False
+        logger.info("[SyslogTCPListener] Stopped")
+
+    def on_backpressure(self, active: bool, depth: int) -> None:
+        """
+        Pause or resume reading on every connection.
+
+        Args:
+            active: True to pause, False to resume
+            depth: Queue depth at the watermark crossing
+        """
+        super().on_backpressure(active, depth)
+        if active:
+            self.stats["pauses"] += 1
+        for connection in self.connections:
+            self._set_reading(connection, not active)
+        if self.connections:
+            logger.info(
+                f"[SyslogTCPListener] {'Paused' if active else 'Resumed'} reading on "
+                f"{len(self.connections)} connections (queue depth {depth})"
+            )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return connection and framing statistics.
+
+        Returns:
+            Dictionary with the counters in stats plus active_connections,
+            truncated_frames and paused
+        """
+        stats: Dict[str, Any] = dict(self.stats)
+        stats["active_connections"] = len(self.connections)
+        stats["truncated_frames"] = self._closed_truncated + sum(
+            connection.framer.truncated for connection in self.connections
+        )
+        stats["paused"] = self._backpressure
+        return stats
+
+    def _connection_made(self, connection: SyslogStreamProtocol) -> None:
+        if len(self.connections) >= self.max_connections:
+            self.stats["connections_rejected"] += 1
+            logger.warning(
+                f"[SyslogTCPListener] Rejecting connection from {connection.source_ip}: "
+                f"{self.max_connections} connections open"
+            )
+            connection.transport.close()
+            return
+        self.connections.add(connection)
+        self.stats["connections_accepted"] += 1
+        if self._backpressure:
+            self._set_reading(connection, False)
+
+    def _connection_lost(self, connection: SyslogStreamProtocol) -> None:
+        if connection in self.connections:
+            self.connections.discard(connection)
+            self._closed_truncated += connection.framer.truncated
+
+    def _set_reading(self, connection: SyslogStreamProtocol, reading: bool) -> None:
+        transport = connection.transport
+        if transport is None or transport.is_closing():
+            return
+        if reading:
+            transport.resume_reading()
+        else:
+            transport.pause_reading()
+
+    def _process_frames(self, frames: List[memoryview], source_ip: str) -> None:
+        """Parse frames from one read and enqueue them as a batch."""
+        batch: List[SyslogMessage] = []
+        for frame in frames:
+            try:
+                syslog_msg = self._parse_text(str(frame, 'utf-8', 'replace'), source_ip)
+            except Exception as e:
+                logger.error(f"Error processing syslog data: {e}")
+                continue
+            if syslog_msg:
+                batch.append(syslog_msg)
+        self.stats["frames"] += len(frames)
+        self.ingest_stats["received"] += len(frames)
+        self.ingest_stats["parsed"] += len(batch)
+        if batch:
+            self._enqueue_batch(batch)
@@ -0,0 +1,417 @@
+"""
+Bounded ingestion queue with overflow policies and watermark events.
+
+put_nowait() never raises QueueFull. When the queue is at capacity it
+applies the configured overflow policy instead:
+
+- drop_newest: discard the incoming message
+- drop_oldest: discard the message at the head of the queue
+- drop_lowest_severity: discard the oldest message of the lowest severity
+  present (DEBUG before INFO before ... EMERGENCY), or the incoming message
+  if nothing queued is less severe
+- spill_to_disk: append messages to a spill file while memory is full and
+  read them back in order as the queue drains
+
+Crossing the high watermark upwards and the low watermark downwards calls
+the registered watermark callbacks, so listeners can shed or pause load.
+"""
+
+import asyncio
+import logging
+import os
+import pickle
+import struct
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from mutt.models.message import Severity
+
+logger = logging.getLogger(__name__)
+
+# Index 0 is the most severe; messages without a Severity rank as INFO
+_SEVERITY_RANK = {severity: rank for rank, severity in enumerate(Severity)}
+_DEFAULT_RANK = _SEVERITY_RANK[Severity.INFO]
+
+_RECORD_HEADER = struct.Struct("!I")
+
+
+class OverflowPolicy(Enum):
+    """What to do with a message when the queue is full."""
+    DROP_NEWEST = "drop_newest"
+    DROP_OLDEST = "drop_oldest"
+    DROP_LOWEST_SEVERITY = "drop_lowest_severity"
+    SPILL_TO_DISK = "spill_to_disk"
+
+
+def _rank(item: Any) -> int:
+    """Return the severity rank of a queued item."""
+    return _SEVERITY_RANK.get(getattr(item, "severity", None), _DEFAULT_RANK)
+
+
+class _SeverityDeque:
+    """
+    FIFO that can also remove the oldest item of the lowest severity present.
+
+    Items are held in cells shared between an arrival-order deque and one
+    deque per severity. Removing by severity empties the cell; emptied cells
+    are skipped on popleft() and compacted away when they pile up.
+    """
+
+    def __init__(self):
+        self._order: Deque[List[Any]] = deque()
+        self._buckets: List[Deque[List[Any]]] = [deque() for _ in _SEVERITY_RANK]
+        self._live = 0
+
+    def __len__(self) -> int:
+        return self._live
+
+    def append(self, item: Any) -> None:
+        cell = [item]
+        self._order.append(cell)
+        self._buckets[_rank(item)].append(cell)
+        self._live += 1
+
+    def popleft(self) -> Any:
+        while True:
+            cell = self._order.popleft()
+            if cell:
+                break
+        item = cell[0]
+        # The oldest live cell overall is the oldest of its severity
+        self._buckets[_rank(item)].popleft()
+        self._live -= 1
+        return item
+
+    def lowest_rank(self) -> int:
+        """Rank of the least severe item queued, or -1 if empty."""
+        for rank in range(len(self._buckets) - 1, -1, -1):
+            if self._buckets[rank]:
+                return rank
+        return -1
+
+    def remove_lowest(self) -> Any:
+        """Remove and return the oldest item of the least severe rank queued."""
+        cell = self._buckets[self.lowest_rank()].popleft()
+        item = cell[0]
+        cell.clear()
+        self._live -= 1
+        if len(self._order) > 2 * self._live + 1024:
+            self._order = deque(c for c in self._order if c)
+        return item
+
+
+class _SpillDeque:
+    """
+    FIFO holding up to memory_limit items in memory and the rest in a file.
+
+    Once anything is spilled, new items go to the file until it has been
+    read back, so arrival order is preserved. Records are pickled with a
+    length prefix. A spill file left over from a previous run is resumed
+    from the offset saved in a side file (path + ".offset"), which points at
+    the oldest record not yet consumed, so consumed records are not replayed.
+    The offset is saved on every refill and on close(); after a crash, only
+    records read back but not yet consumed since the last refill are replayed.
+    """
+
+    def __init__(self, memory_limit: int, path: str, max_bytes: int):
+        self.memory_limit = memory_limit
+        self.path = path
+        self.max_bytes = max_bytes
+        self.offset_path = path + ".offset"
+        self._memory: Deque[Any] = deque()
+        # File offsets of the records read back into memory and not yet
+        # consumed; they are always the newest items in memory
+        self._read_offsets: Deque[int] = deque()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._writer = open(path, "ab")
+        self._reader = open(path, "rb")
+        self._reader.seek(self._load_offset())
+        self._spilled = self._count_records()
+        self._bytes = self._writer.tell()
+        if self._spilled:
+            logger.warning(f"[BoundedMessageQueue] Resuming {self._spilled} spilled messages from {path}")
+
+    def __len__(self) -> int:
+        return len(self._memory) + self._spilled
+
+    @property
+    def memory_len(self) -> int:
+        return len(self._memory)
+
+    @property
+    def spilled(self) -> int:
+        return self._spilled
+
+    def can_spill(self) -> bool:
+        return self._bytes < self.max_bytes
+
+    def append(self, item: Any) -> None:
+        if not self._spilled and len(self._memory) < self.memory_limit:
+            self._memory.append(item)
+            return
+        data = pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)
+        self._writer.write(_RECORD_HEADER.pack(len(data)) + data)
+        self._bytes += len(data) + _RECORD_HEADER.size
+        self._spilled += 1
+
+    def popleft(self) -> Any:
+        if not self._memory:
+            self._refill()
+        if self._read_offsets and len(self._memory) == len(self._read_offsets):
+            self._read_offsets.popleft()
+        item = self._memory.popleft()
+        # Refill in chunks once memory has drained to half
+        if self._spilled and len(self._memory) <= self.memory_limit // 2:
+            self._refill()
+        return item
+
+    def close(self) -> None:
+        if not self._writer.closed:
+            self._save_offset()
+        self._writer.close()
+        self._reader.close()
+
+    def _refill(self) -> None:
+        self._writer.flush()
+        while self._spilled and len(self._memory) < self.memory_limit:
+            self._read_offsets.append(self._reader.tell())
+            length = _RECORD_HEADER.unpack(self._reader.read(_RECORD_HEADER.size))[0]
+            self._memory.append(pickle.loads(self._reader.read(length)))
+            self._spilled -= 1
+        if not self._spilled:
+            self._writer.truncate(0)
+            self._reader.seek(0)
+            self._read_offsets.clear()
+            self._bytes = 0
+        self._save_offset()
+
+    def _save_offset(self) -> None:
+        """Persist the offset of the oldest spilled record not yet consumed."""
+        offset = self._read_offsets[0] if self._read_offsets else self._reader.tell()
+        tmp_path = self.offset_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(offset))
+        os.replace(tmp_path, self.offset_path)
+
+    def _load_offset(self) -> int:
+        """Return the saved read offset, or 0 if missing or beyond the file."""
+        try:
+            with open(self.offset_path) as f:
+                offset = int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+        return offset if 0 <= offset <= self._writer.tell() else 0
+
+    def _count_records(self) -> int:
+        start = self._reader.tell()
+        count = 0
+        while True:
+            header = self._reader.read(_RECORD_HEADER.size)
+            if len(header) < _RECORD_HEADER.size:
+                break
+            length = _RECORD_HEADER.unpack(header)[0]
+            if len(self._reader.read(length)) < length:
+                break
+            count += 1
+        self._reader.seek(start)
+        return count
+
+
+class BoundedMessageQueue(asyncio.Queue):
+    """
+    asyncio.Queue with a hard size bound and an overflow policy.
+
+    put_nowait() applies the overflow policy when full; put() waits for room
+    like a regular bounded queue. For spill_to_disk, max_size bounds the
+    messages held in memory, qsize() also counts spilled messages, and the
+    queue is only full once the spill file has reached spill_max_bytes.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        policy: OverflowPolicy = OverflowPolicy.DROP_NEWEST,
+        high_watermark: float = 0.8,
+        low_watermark: float = 0.5,
+        spill_path: Optional[str] = None,
+        spill_max_bytes: int = 500 * 1024 * 1024
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            max_size: Maximum messages held in memory
+            policy: Overflow policy applied by put_nowait() when full
+            high_watermark: Fraction of max_size at which backpressure starts
+            low_watermark: Fraction of max_size at which backpressure ends
+            spill_path: Spill file, required for OverflowPolicy.SPILL_TO_DISK
+            spill_max_bytes: Spill file size beyond which new messages are dropped
+
+        Raises:
+            ValueError: If spill_to_disk is selected without a spill_path
+        """
+        if policy == OverflowPolicy.SPILL_TO_DISK and not spill_path:
+            raise ValueError("spill_to_disk requires a spill_path")
+        self.max_size = max(1, max_size)
+        self.policy = policy
+        self.spill_path = spill_path
+        self.spill_max_bytes = spill_max_bytes
+        self.high_mark = max(1, int(self.max_size * high_watermark))
+        self.low_mark = min(self.high_mark - 1, int(self.max_size * low_watermark))
+        self._above_high = False
+        self._watermark_callbacks: List[Callable[[bool, int], None]] = []
+        self.stats: Dict[str, int] = {
+            "enqueued": 0,
+            "dropped_newest": 0,
+            "dropped_oldest": 0,
+            "dropped_lowest_severity": 0,
+            "spilled": 0,
+            "spill_overflow": 0,
+            "high_watermark_events": 0,
+        }
+        # Unbounded underneath; the bound is enforced by full()
+        super().__init__()
+        # Messages resumed from a spill file still need a task_done() each
+        resumed = len(self._queue)
+        if resumed:
+            self._unfinished_tasks += resumed
+            self._finished.clear()
+
+    # asyncio.Queue storage hooks
+
+    def _init(self, maxsize):
+        if self.policy == OverflowPolicy.SPILL_TO_DISK:
+            self._queue = _SpillDeque(self.max_size, self.spill_path, self.spill_max_bytes)
+        elif self.policy == OverflowPolicy.DROP_LOWEST_SEVERITY:
+            self._queue = _SeverityDeque()
+        else:
+            self._queue = deque()
+
+    def _get(self):
+        item = self._queue.popleft()
+        if self._above_high and len(self._queue) <= self.low_mark:
+            self._above_high = False
+            self._notify(False)
+        return item
+
+    def full(self) -> bool:
+        """Return True if no more messages can be accepted without the overflow policy."""
+        if isinstance(self._queue, _SpillDeque):
+            return self._queue.memory_len >= self.max_size and not self._queue.can_spill()
+        return len(self._queue) >= self.max_size
+
+    def put_nowait(self, item: Any) -> bool:
+        """
+        Put a message without blocking, applying the overflow policy if full.
+
+        Args:
+            item: Message to enqueue
+
+        Returns:
+            True if the message was queued, False if the overflow policy
+            dropped it
+        """
+        if self.full():
+            if self.policy == OverflowPolicy.SPILL_TO_DISK:
+                self.stats["spill_overflow"] += 1
+                return False
+            if self.policy == OverflowPolicy.DROP_NEWEST:
+                self.stats["dropped_newest"] += 1
+                return False
+            if self.policy == OverflowPolicy.DROP_OLDEST:
+                self._queue.popleft()
+                self.stats["dropped_oldest"] += 1
+                self.task_done()
+            elif self.policy == OverflowPolicy.DROP_LOWEST_SEVERITY:
+                if _rank(item) >= self._queue.lowest_rank():
+                    self.stats["dropped_lowest_severity"] += 1
+                    return False
+                self._queue.remove_lowest()
+                self.stats["dropped_lowest_severity"] += 1
+                self.task_done()
+        elif self.policy == OverflowPolicy.SPILL_TO_DISK:
+            if self._queue.spilled or self._queue.memory_len >= self.max_size:
+                self.stats["spilled"] += 1
+
+        super().put_nowait(item)
+        self.stats["enqueued"] += 1
+        self._check_high()
+        return True
+
+    def put_batch(self, items: List[Any]) -> int:
+        """
+        Put several messages without blocking, applying the overflow policy.
+
+        Args:
+            items: Messages to enqueue, in order
+
+        Returns:
+            Number of messages queued
+        """
+        accepted = 0
+        for item in items:
+            if self.put_nowait(item):
+                accepted += 1
+        return accepted
+
+    def add_watermark_callback(self, callback: Callable[[bool, int], None]) -> None:
+        """
+        Register a callback for watermark crossings.
+
+        The callback receives (True, depth) when the queue rises to the high
+        watermark and (False, depth) when it falls back to the low watermark.
+
+        Args:
+            callback: Function taking (backpressure_active, queue_depth)
+        """
+        self._watermark_callbacks.append(callback)
+
+    @property
+    def backpressure(self) -> bool:
+        """True between a high watermark crossing and the next low watermark crossing."""
+        return self._above_high
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return queue statistics.
+
+        Returns:
+            Dictionary with depth, max_size, policy, backpressure, per-policy
+            drop counters and, for spill_to_disk, spilled_pending
+        """
+        stats: Dict[str, Any] = dict(self.stats)
+        stats["depth"] = self.qsize()
+        stats["max_size"] = self.max_size
+        stats["policy"] = self.policy.value
+        stats["backpressure"] = self._above_high
+        stats["dropped"] = (
+            stats["dropped_newest"] + stats["dropped_oldest"]
+            + stats["dropped_lowest_severity"] + stats["spill_overflow"]
+        )
+        if isinstance(self._queue, _SpillDeque):
+            stats["spilled_pending"] = self._queue.spilled
+        return stats
+
+    def close(self) -> None:
+        """Release the spill file, if any. Spilled messages are kept for the next run."""
+        if isinstance(self._queue, _SpillDeque):
+            self._queue.close()
+
+    def _check_high(self) -> None:
+        if not self._above_high and len(self._queue) >= self.high_mark:
+            self._above_high = True
+            self.stats["high_watermark_events"] += 1
+            self._notify(True)
+
+    def _notify(self, active: bool) -> None:
+        depth = len(self._queue)
+        if active:
+            logger.warning(f"[BoundedMessageQueue] High watermark reached ({depth}/{self.max_size})")
+        else:
+            logger.info(f"[BoundedMessageQueue] Back below low watermark ({depth}/{self.max_size})")
+        for callback in self._watermark_callbacks:
+            try:
+                callback(active, depth)
+            except Exception as e:
+                logger.error(f"[BoundedMessageQueue] Watermark callback failed: {e}")
@@ -61,13 +61,18 @@ class SyslogMessage(Message):
         priority: Syslog priority value
         hostname: Hostname parsed from syslog header
         process_name: Name of the process that generated the message
+            (TAG in RFC 3164, APP-NAME in RFC 5424)
         process_id: PID of the process that generated the message
+        msg_id: RFC 5424 MSGID identifying the type of message
+        structured_data: RFC 5424 STRUCTURED-DATA as {SD-ID: {param: value}}
     """
     facility: int = 0
     priority: int = 0
     hostname: str = ""
     process_name: Optional[str] = None
     process_id: Optional[int] = None
+    msg_id: Optional[str] = None
+    structured_data: Dict[str, Dict[str, str]] = field(default_factory=dict)
 
 
 @dataclass
@@ -79,7 +84,11 @@ class SNMPTrap(Message):
         oid: Trap Object Identifier
         varbinds: Key-value pairs of trap data
         version: SNMP version (e.g., 'v2c', 'v3')
+        trap_name: Symbolic name of the trap OID, if MIB resolution is enabled
+        varbind_names: Symbolic names of the varbind OIDs that resolved
     """
     oid: str = ""
     varbinds: Dict[str, Any] = field(default_factory=dict)
-    version: str = "v2c"
\ No newline at end of file
+    version: str = "v2c"
+    trap_name: Optional[str] = None
+    varbind_names: Dict[str, str] = field(default_factory=dict)
\ No newline at end of file
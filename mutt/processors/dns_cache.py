@@ -0,0 +1,170 @@
+"""
+Reverse DNS cache for the enrichment stage.
+
+Caches IP -> hostname results with separate TTLs for positive and negative
+answers, bounds the cache size with LRU eviction and coalesces concurrent
+lookups for the same IP into a single resolver call.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Resolver callable: returns a hostname, or None when the IP has no PTR record
+Resolver = Callable[[str], Awaitable[Optional[str]]]
+
+
+@dataclass
+class DNSCacheEntry:
+    """
+    Cached reverse DNS result.
+
+    Attributes:
+        hostname: Resolved hostname, or None for a negative result
+        expires_at: Monotonic time after which the entry is stale
+    """
+    hostname: Optional[str]
+    expires_at: float
+
+
+class DNSCache:
+    """
+    Bounded LRU/TTL cache of reverse DNS results with single-flight lookups.
+
+    A fresh entry is returned without awaiting anything. A stale entry is
+    still returned immediately while a refresh runs in the background, so
+    only the first sighting of an IP waits for the resolver.
+    """
+
+    def __init__(
+        self,
+        resolver: Resolver,
+        max_size: int = 10000,
+        ttl: float = 3600.0,
+        negative_ttl: float = 300.0
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            resolver: Async callable performing the actual lookup
+            max_size: Maximum number of cached IPs
+            ttl: Seconds a resolved hostname stays fresh
+            negative_ttl: Seconds a failed lookup stays fresh
+        """
+        self.resolver = resolver
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: "OrderedDict[str, DNSCacheEntry]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        self.stats: Dict[str, Any] = {
+            "hits": 0,
+            "negative_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "lookups": 0,
+            "failed_lookups": 0,
+            "evictions": 0,
+            "total_lookup_ms": 0.0,
+            "max_lookup_ms": 0.0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def lookup(self, ip_address: str) -> Optional[str]:
+        """
+        Return the hostname for an IP, resolving it only on a cache miss.
+
+        Args:
+            ip_address: IP address to look up
+
+        Returns:
+            Hostname if known, None otherwise
+        """
+        entry = self._entries.get(ip_address)
+        if entry is not None:
+            self._entries.move_to_end(ip_address)
+            if entry.expires_at > time.monotonic():
+                self.stats["hits"] += 1
+                if entry.hostname is None:
+                    self.stats["negative_hits"] += 1
+                return entry.hostname
+
+            # Serve the stale value and refresh off the critical path
+            self.stats["stale_hits"] += 1
+            self._start_lookup(ip_address)
+            return entry.hostname
+
+        self.stats["misses"] += 1
+        task = self._start_lookup(ip_address)
+        # Shield so a cancelled waiter does not cancel the shared lookup
+        return await asyncio.shield(task)
+
+    def invalidate(self, ip_address: str) -> None:
+        """Drop a cached entry so the next lookup resolves again."""
+        self._entries.pop(ip_address, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return cache statistics.
+
+        Returns:
+            Dictionary of counters plus size, hit ratio and mean lookup latency
+        """
+        stats = dict(self.stats)
+        answered = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["size"] = len(self._entries)
+        stats["inflight"] = len(self._inflight)
+        stats["hit_ratio"] = (
+            (stats["hits"] + stats["stale_hits"]) / answered if answered else 0.0
+        )
+        stats["avg_lookup_ms"] = (
+            stats["total_lookup_ms"] / stats["lookups"] if stats["lookups"] else 0.0
+        )
+        return stats
+
+    def _start_lookup(self, ip_address: str) -> asyncio.Task:
+        """Return the in-flight lookup for an IP, starting one if needed."""
+        task = self._inflight.get(ip_address)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            return task
+
+        task = asyncio.create_task(self._resolve_and_store(ip_address))
+        self._inflight[ip_address] = task
+        task.add_done_callback(lambda _: self._inflight.pop(ip_address, None))
+        return task
+
+    async def _resolve_and_store(self, ip_address: str) -> Optional[str]:
+        """Run the resolver once and cache its result."""
+        start = time.perf_counter()
+        try:
+            hostname = await self.resolver(ip_address)
+        except Exception as e:
+            logger.debug(f"Reverse DNS lookup failed for {ip_address}: {e}")
+            hostname = None
+
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        self.stats["lookups"] += 1
+        self.stats["total_lookup_ms"] += elapsed_ms
+        self.stats["max_lookup_ms"] = max(self.stats["max_lookup_ms"], elapsed_ms)
+        if hostname is None:
+            self.stats["failed_lookups"] += 1
+
+        ttl = self.ttl if hostname else self.negative_ttl
+        self._entries[ip_address] = DNSCacheEntry(hostname, time.monotonic() + ttl)
+        self._entries.move_to_end(ip_address)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+        return hostname
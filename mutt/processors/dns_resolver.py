@@ -0,0 +1,417 @@
+"""
+Reverse DNS resolver backends for the enrichment stage.
+
+AsyncDNSResolver sends PTR queries directly over asyncio UDP, so thousands
+of lookups can be in flight without occupying worker threads.
+ThreadedResolver wraps socket.gethostbyaddr and serves as the fallback
+when no nameserver answers.
+"""
+
+import asyncio
+import ipaddress
+import logging
+import random
+import socket
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DNS_PORT = 53
+TYPE_PTR = 12
+CLASS_IN = 1
+RCODE_NXDOMAIN = 3
+
+_HEADER = struct.Struct("!HHHHHH")
+_RR_FIXED = struct.Struct("!HHIH")
+
+
+class DNSError(Exception):
+    """Raised for malformed, truncated or failed DNS responses."""
+
+
+def reverse_name(ip_address: str) -> str:
+    """Return the in-addr.arpa / ip6.arpa name for an IP address."""
+    return ipaddress.ip_address(ip_address).reverse_pointer
+
+
+def build_ptr_query(query_id: int, name: str) -> bytes:
+    """
+    Build a recursive PTR query packet.
+
+    Args:
+        query_id: 16-bit DNS message ID
+        name: Reverse lookup name (e.g. "1.0.0.10.in-addr.arpa")
+
+    Returns:
+        Wire-format DNS query
+    """
+    header = _HEADER.pack(query_id, 0x0100, 1, 0, 0, 0)  # RD=1, one question
+    qname = b"".join(
+        bytes((len(label),)) + label
+        for label in (part.encode("ascii") for part in name.rstrip(".").split("."))
+    ) + b"\x00"
+    return header + qname + struct.pack("!HH", TYPE_PTR, CLASS_IN)
+
+
+def _read_name(data: bytes, offset: int) -> Tuple[str, int]:
+    """
+    Read a possibly compressed domain name.
+
+    Returns:
+        Tuple of (name, offset just past the name at its original position)
+    """
+    labels: List[str] = []
+    end_offset = None
+    jumps = 0
+
+    while True:
+        if offset >= len(data):
+            raise DNSError("Name extends past end of message")
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if offset + 1 >= len(data):
+                raise DNSError("Truncated compression pointer")
+            if end_offset is None:
+                end_offset = offset + 2
+            jumps += 1
+            if jumps > 64:
+                raise DNSError("Compression loop")
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            continue
+        if length == 0:
+            offset += 1
+            break
+        labels.append(data[offset + 1:offset + 1 + length].decode("ascii", errors="replace"))
+        offset += 1 + length
+
+    return ".".join(labels), (end_offset if end_offset is not None else offset)
+
+
+def parse_ptr_response(data: bytes, query_id: int, name: str) -> Optional[str]:
+    """
+    Extract the PTR target from a DNS response.
+
+    Args:
+        data: Wire-format DNS response
+        query_id: ID of the query being answered
+        name: Reverse lookup name that was queried
+
+    Returns:
+        Hostname, or None if the name does not exist or has no PTR record
+
+    Raises:
+        DNSError: If the response does not match the query, is truncated
+            or reports a server failure
+    """
+    if len(data) < _HEADER.size:
+        raise DNSError("Short response")
+    resp_id, flags, qdcount, ancount, _, _ = _HEADER.unpack_from(data)
+    if resp_id != query_id or not flags & 0x8000:
+        raise DNSError("Response does not match query")
+    if flags & 0x0200:
+        raise DNSError("Truncated response")
+
+    offset = _HEADER.size
+    for _ in range(qdcount):
+        qname, offset = _read_name(data, offset)
+        if qname.lower() != name.rstrip(".").lower():
+            raise DNSError("Response question does not match query")
+        offset += 4
+
+    rcode = flags & 0x000F
+    if rcode == RCODE_NXDOMAIN:
+        return None
+    if rcode != 0:
+        raise DNSError(f"Server returned rcode {rcode}")
+
+    for _ in range(ancount):
+        _, offset = _read_name(data, offset)
+        if offset + _RR_FIXED.size > len(data):
+            raise DNSError("Truncated resource record")
+        rtype, _, _, rdlength = _RR_FIXED.unpack_from(data, offset)
+        offset += _RR_FIXED.size
+        if rtype == TYPE_PTR:
+            target, _ = _read_name(data, offset)
+            return target or None
+        offset += rdlength
+
+    return None
+
+
+def parse_nameserver(entry: Any) -> Tuple[str, int]:
+    """
+    Parse a nameserver entry into an (address, port) tuple.
+
+    Accepts "10.0.0.53", "10.0.0.53:5353", "[::1]:5353", "::1" or a tuple.
+    """
+    if isinstance(entry, (tuple, list)):
+        return str(entry[0]), int(entry[1])
+    entry = str(entry).strip()
+    if entry.startswith("["):
+        host, _, port = entry[1:].partition("]:")
+        return host.rstrip("]"), int(port) if port else DNS_PORT
+    if entry.count(":") == 1:
+        host, port = entry.split(":")
+        return host, int(port)
+    return entry, DNS_PORT
+
+
+def system_nameservers(path: str = "/etc/resolv.conf") -> List[Tuple[str, int]]:
+    """Read nameserver addresses from resolv.conf, if present."""
+    servers = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] == "nameserver":
+                    servers.append((parts[1], DNS_PORT))
+    except OSError:
+        pass
+    return servers
+
+
+class ThreadedResolver:
+    """Resolver backed by socket.gethostbyaddr in the default thread pool."""
+
+    def __init__(self, concurrency: int = 32):
+        """
+        Initialize the resolver.
+
+        Args:
+            concurrency: Maximum lookups occupying worker threads at once
+        """
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def resolve(self, ip_address: str) -> Optional[str]:
+        """
+        Resolve an IP address with the system resolver.
+
+        Args:
+            ip_address: IP address to look up
+
+        Returns:
+            Hostname if found, None otherwise
+        """
+        try:
+            async with self._semaphore:
+                # Run reverse DNS lookup in thread pool to avoid blocking
+                hostname, _, _ = await asyncio.to_thread(socket.gethostbyaddr, ip_address)
+            logger.debug(f"Reverse DNS lookup successful for {ip_address}: {hostname}")
+            return hostname
+        except (socket.herror, socket.gaierror, Exception) as e:
+            logger.debug(f"Reverse DNS lookup failed for {ip_address}: {e}")
+            return None
+
+    async def close(self) -> None:
+        """Nothing to release for the threaded resolver."""
+
+
+class _DNSClientProtocol(asyncio.DatagramProtocol):
+    """Dispatches DNS responses to the futures of pending queries."""
+
+    def __init__(self, resolver: "AsyncDNSResolver"):
+        self.resolver = resolver
+
+    def datagram_received(self, data: bytes, addr: Tuple) -> None:
+        if len(data) < 2:
+            return
+        query_id = struct.unpack_from("!H", data)[0]
+        future = self.resolver._pending.get((query_id, addr[0], addr[1]))
+        if future is not None and not future.done():
+            future.set_result(data)
+
+    def error_received(self, exc: Exception) -> None:
+        logger.debug(f"DNS socket error: {exc}")
+
+
+class AsyncDNSResolver:
+    """
+    Non-blocking PTR resolver speaking DNS over asyncio UDP.
+
+    Queries go to each configured nameserver in turn until one answers.
+    If none does, the lookup is handed to the fallback resolver (normally
+    a ThreadedResolver). An authoritative "no such name" is a final answer
+    and is not retried through the fallback.
+    """
+
+    def __init__(
+        self,
+        nameservers: Optional[List[Any]] = None,
+        timeout: float = 1.0,
+        attempts: int = 2,
+        concurrency: int = 256,
+        fallback: Optional[ThreadedResolver] = None
+    ):
+        """
+        Initialize the resolver.
+
+        Args:
+            nameservers: Nameserver addresses ("host" or "host:port");
+                defaults to the entries in /etc/resolv.conf
+            timeout: Seconds to wait for each query
+            attempts: Passes over the nameserver list before falling back
+            concurrency: Maximum lookups in flight at once
+            fallback: Resolver used when no nameserver answers
+        """
+        if nameservers:
+            self.nameservers = [parse_nameserver(ns) for ns in nameservers]
+        else:
+            self.nameservers = system_nameservers()
+        self.timeout = timeout
+        self.attempts = max(1, attempts)
+        self.fallback = fallback
+        self.concurrency = max(1, concurrency)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._pending: Dict[Tuple[int, str, int], asyncio.Future] = {}
+        self._transports: Dict[int, asyncio.DatagramTransport] = {}
+        self._endpoint_lock = asyncio.Lock()
+
+        self.stats: Dict[str, int] = {
+            "queries": 0,
+            "answers": 0,
+            "nxdomain": 0,
+            "timeouts": 0,
+            "errors": 0,
+            "fallbacks": 0,
+        }
+
+    async def resolve(self, ip_address: str) -> Optional[str]:
+        """
+        Resolve an IP address to a hostname.
+
+        Args:
+            ip_address: IP address to look up
+
+        Returns:
+            Hostname if found, None otherwise
+        """
+        try:
+            name = reverse_name(ip_address)
+        except ValueError:
+            return None
+
+        async with self._semaphore:
+            for _ in range(self.attempts):
+                for server in self.nameservers:
+                    try:
+                        hostname = await self._query(server, name)
+                    except asyncio.TimeoutError:
+                        self.stats["timeouts"] += 1
+                        continue
+                    except (DNSError, OSError) as e:
+                        self.stats["errors"] += 1
+                        logger.debug(f"DNS query to {server[0]} for {ip_address} failed: {e}")
+                        continue
+
+                    if hostname is None:
+                        self.stats["nxdomain"] += 1
+                    else:
+                        self.stats["answers"] += 1
+                    return hostname
+
+        if self.fallback is not None:
+            self.stats["fallbacks"] += 1
+            return await self.fallback.resolve(ip_address)
+        return None
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return query counters."""
+        stats = dict(self.stats)
+        stats["inflight"] = len(self._pending)
+        return stats
+
+    async def close(self) -> None:
+        """Close the UDP sockets and cancel pending queries."""
+        for transport in self._transports.values():
+            transport.close()
+        self._transports.clear()
+        for future in self._pending.values():
+            if not future.done():
+                future.cancel()
+        self._pending.clear()
+        if self.fallback is not None:
+            await self.fallback.close()
+
+    async def _get_transport(self, family: int) -> asyncio.DatagramTransport:
+        """Return the shared UDP socket for an address family, creating it once."""
+        transport = self._transports.get(family)
+        if transport is not None:
+            return transport
+
+        async with self._endpoint_lock:
+            transport = self._transports.get(family)
+            if transport is None:
+                loop = asyncio.get_running_loop()
+                local_addr = ("::", 0) if family == socket.AF_INET6 else ("0.0.0.0", 0)
+                transport, _ = await loop.create_datagram_endpoint(
+                    lambda: _DNSClientProtocol(self),
+                    local_addr=local_addr,
+                    family=family
+                )
+                self._size_receive_buffer(transport)
+                self._transports[family] = transport
+        return transport
+
+    def _size_receive_buffer(self, transport: asyncio.DatagramTransport) -> None:
+        """Make room for a full burst of responses so the kernel does not drop them."""
+        sock = transport.get_extra_info("socket")
+        if sock is None:
+            return
+        # Each queued datagram costs roughly 2 KiB of buffer in the kernel
+        wanted = self.concurrency * 2048
+        try:
+            if sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF) < wanted:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, wanted)
+        except OSError as e:
+            logger.debug(f"Could not resize DNS socket receive buffer: {e}")
+
+    async def _query(self, server: Tuple[str, int], name: str) -> Optional[str]:
+        """Send one PTR query to one server and wait for its answer."""
+        host, port = server
+        family = socket.AF_INET6 if ":" in host else socket.AF_INET
+        transport = await self._get_transport(family)
+
+        # Pick an ID not already pending against this server
+        query_id = random.getrandbits(16)
+        while (query_id, host, port) in self._pending:
+            query_id = random.getrandbits(16)
+        key = (query_id, host, port)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            transport.sendto(build_ptr_query(query_id, name), (host, port))
+            self.stats["queries"] += 1
+            data = await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(key, None)
+
+        return parse_ptr_response(data, query_id, name)
+
+
+def create_resolver(dns_config: Dict[str, Any]):
+    """
+    Create the resolver selected by the enrichment.dns configuration.
+
+    Args:
+        dns_config: The enrichment.dns configuration section
+
+    Returns:
+        AsyncDNSResolver with a ThreadedResolver fallback for backend "async"
+        (the default), or a ThreadedResolver for backend "thread"
+    """
+    backend = dns_config.get('backend', 'async')
+    threaded = ThreadedResolver(concurrency=dns_config.get('thread_concurrency', 32))
+    if backend == 'thread':
+        return threaded
+    if backend != 'async':
+        raise ValueError(f"Unknown DNS backend: {backend}")
+
+    return AsyncDNSResolver(
+        nameservers=dns_config.get('nameservers'),
+        timeout=dns_config.get('timeout', 1.0),
+        attempts=dns_config.get('attempts', 2),
+        concurrency=dns_config.get('concurrency', 256),
+        fallback=threaded
+    )
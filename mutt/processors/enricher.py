@@ -3,12 +3,13 @@ Message enrichment processor.
 Handles reverse DNS lookups, device registry updates, and severity normalization.
 """
 
-import socket
-import logging
 import asyncio
-from typing import Optional
+import logging
+from typing import Any, Dict, List, Optional
 
 from mutt.models.message import Message, Severity
+from mutt.processors.dns_cache import DNSCache
+from mutt.processors.dns_resolver import ThreadedResolver
 from mutt.storage.device_registry import DeviceRegistry
 
 logger = logging.getLogger(__name__)
@@ -17,14 +18,19 @@ logger = logging.getLogger(__name__)
 class Enricher:
     """Enriches messages with additional metadata and normalizes fields."""
     
-    def __init__(self, registry: DeviceRegistry):
+    def __init__(self, registry: DeviceRegistry, dns_cache: Optional[DNSCache] = None):
         """
         Initialize the Enricher.
         
         Args:
             registry: Device registry for tracking devices
+            dns_cache: Reverse DNS cache; a default one backed by a
+                ThreadedResolver is created if not given
         """
         self.registry = registry
+        if dns_cache is None:
+            dns_cache = DNSCache(ThreadedResolver().resolve)
+        self.dns_cache = dns_cache
     
     async def enrich(self, msg: Message) -> None:
         """
@@ -38,22 +44,51 @@ class Enricher:
         Args:
             msg: Message to enrich
         """
-        # Perform reverse DNS lookup
-        hostname = await self._reverse_dns_lookup(msg.source_ip)
+        await self.enrich_batch([msg])
+    
+    async def enrich_batch(self, msgs: List[Message]) -> None:
+        """
+        Enrich a batch of messages.
         
-        # Update metadata if hostname found
-        if hostname:
-            msg.metadata["hostname"] = hostname
+        Each distinct source IP in the batch is looked up and updated in the
+        device registry once; lookups for different IPs run concurrently.
+        
+        Args:
+            msgs: Messages to enrich
+        """
+        # Distinct source IPs in order of first appearance
+        ips = list(dict.fromkeys(msg.source_ip for msg in msgs))
+        
+        # Perform reverse DNS lookups
+        hostnames = dict(zip(ips, await asyncio.gather(*(
+            self._reverse_dns_lookup(ip) for ip in ips
+        ))))
         
         # Update device registry
-        await self._update_device_registry(msg.source_ip, hostname)
+        for ip in ips:
+            await self._update_device_registry(ip, hostnames[ip])
+        
+        for msg in msgs:
+            # Update metadata if hostname found
+            hostname = hostnames[msg.source_ip]
+            if hostname:
+                msg.metadata["hostname"] = hostname
+            
+            # Normalize severity
+            self._normalize_severity(msg)
+    
+    def get_dns_stats(self) -> Dict[str, Any]:
+        """
+        Return reverse DNS cache statistics.
         
-        # Normalize severity
-        self._normalize_severity(msg)
+        Returns:
+            Dictionary of hit/miss counters and lookup latency
+        """
+        return self.dns_cache.get_stats()
     
     async def _reverse_dns_lookup(self, ip_address: str) -> Optional[str]:
         """
-        Perform reverse DNS lookup for an IP address.
+        Perform a cached reverse DNS lookup for an IP address.
         
         Args:
             ip_address: IP address to look up
@@ -63,15 +98,8 @@ class Enricher:
         """
         if not ip_address:
             return None
-            
-        try:
-            # Run reverse DNS lookup in thread pool to avoid blocking
-            hostname, _, _ = await asyncio.to_thread(socket.gethostbyaddr, ip_address)
-            logger.debug(f"Reverse DNS lookup successful for {ip_address}: {hostname}")
-            return hostname
-        except (socket.herror, socket.gaierror, Exception) as e:
-            logger.debug(f"Reverse DNS lookup failed for {ip_address}: {e}")
-            return None
+        
+        return await self.dns_cache.lookup(ip_address)
     
     async def _update_device_registry(self, ip_address: str, hostname: Optional[str]) -> None:
         """
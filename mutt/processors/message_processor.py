@@ -12,10 +12,14 @@ import logging
 from mutt.storage.database import Database
 from mutt.storage.device_registry import DeviceRegistry
 from mutt.storage.auth_failure_tracker import AuthFailureTracker
+from mutt.storage.writer import StorageWriter
 from mutt.processors.validator import Validator
 from mutt.processors.pattern_matcher import PatternMatcher
 from mutt.processors.enricher import Enricher
+from mutt.processors.dns_cache import DNSCache
+from mutt.processors.dns_resolver import create_resolver
 from mutt.processors.message_router import MessageRouter
+from mutt.processors.worker_pool import WorkerPool
 from mutt.storage.buffer import FileBuffer
 from mutt.storage.archive_manager import ArchiveManager
 from mutt.logger import get_logger
@@ -46,30 +50,81 @@ class MessageProcessor:
     def _initialize_components(self):
         """Initialize all processing components."""
         # Database
-        db_path = self.config['storage']['db_path']
-        self.database = Database(db_path)
+        storage_config = self.config['storage']
+        self.database = Database(
+            storage_config['db_path'],
+            profile=storage_config.get('profile', 'throughput'),
+            pragmas=storage_config.get('pragmas')
+        )
+        
+        # Single writer that owns all database writes
+        writer_config = storage_config.get('writer', {})
+        self.writer = StorageWriter(
+            self.database,
+            max_queue_size=writer_config.get('queue_size', 10000),
+            max_batch_intents=writer_config.get('max_batch', 500),
+            max_batch_delay=writer_config.get('max_delay_ms', 50) / 1000.0
+        )
         
         # Other components
-        self.device_registry = DeviceRegistry(self.database)
-        self.auth_failure_tracker = AuthFailureTracker(self.database)
+        registry_config = storage_config.get('device_registry', {})
+        self.device_registry = DeviceRegistry(
+            self.database,
+            writer=self.writer,
+            write_behind=registry_config.get('write_behind', True),
+            last_seen_granularity=registry_config.get('last_seen_granularity', 60)
+        )
+        self.auth_failure_tracker = AuthFailureTracker(
+            self.database,
+            writer=self.writer,
+            rate_window=storage_config.get('auth_failures', {}).get('rate_window', 60)
+        )
         
         # FileBuffer
         buffer_dir = self.config['storage'].get('buffer_dir', 'buffer')
-        self.file_buffer = FileBuffer(buffer_dir)
+        buffer_config = storage_config.get('buffer', {})
+        self.file_buffer = FileBuffer(
+            buffer_dir,
+            flush_threshold=buffer_config.get('flush_threshold', 100),
+            segment_max_bytes=buffer_config.get('segment_max_mb', 64) * 1024 * 1024,
+            fsync=buffer_config.get('fsync', False)
+        )
         
         # Other components
         self.validator = Validator()
         
         # Load rules if rules_file exists in config
         rules = self._load_rules()
-        self.pattern_matcher = PatternMatcher(rules)
+        profiling_config = self.config.get('rules_profiling', {})
+        self.pattern_matcher = PatternMatcher(
+            rules,
+            profile_sample_every=profiling_config.get('sample_every', 100)
+        )
         
-        self.enricher = Enricher(self.device_registry)
+        dns_config = self.config.get('enrichment', {}).get('dns', {})
+        self.dns_resolver = create_resolver(dns_config)
+        dns_cache = DNSCache(
+            self.dns_resolver.resolve,
+            max_size=dns_config.get('cache_size', 10000),
+            ttl=dns_config.get('ttl', 3600),
+            negative_ttl=dns_config.get('negative_ttl', 300)
+        )
+        self.enricher = Enricher(self.device_registry, dns_cache=dns_cache)
         self.message_router = MessageRouter()
         
+        # Pipeline workers, sharded by source IP
+        processor_config = self.config.get('processor', {})
+        self.worker_pool = WorkerPool(
+            self._handle_queued_batch,
+            workers=processor_config.get('workers', 4),
+            queue_size=processor_config.get('worker_queue_size', 1000),
+            batch_size=processor_config.get('batch_size', 64),
+            max_wait=processor_config.get('batch_max_wait_ms', 5) / 1000.0
+        )
+        
         # ArchiveManager
         archive_dir = self.config['storage'].get('archive_dir', 'archives')
-        self.archive_manager = ArchiveManager(self.database, archive_dir)
+        self.archive_manager = ArchiveManager(self.database, archive_dir, writer=self.writer)
         
         logger.info("MessageProcessor components initialized")
         
@@ -119,17 +174,37 @@ class MessageProcessor:
             
         self.running = True
         
-        # Initialize database connection
+        # Initialize database connection and the writer that owns it
         await self.database.initialize()
+        await self.writer.start()
+        await self.worker_pool.start()
+        
+        # Replay messages the buffer WAL holds from a previous run
+        try:
+            await self.file_buffer.replay(
+                self.writer.store_messages,
+                chunk_size=self.config['storage'].get('buffer', {}).get('replay_chunk_size', 1000)
+            )
+        except Exception as e:
+            logger.error(f"Error replaying buffer WAL, will retry on next start: {e}")
         
         # Start background tasks
         self.tasks = [
             asyncio.create_task(self.process_loop(), name="process_loop"),
             asyncio.create_task(self.batch_write_loop(), name="batch_write_loop"),
-            asyncio.create_task(self.archive_loop(), name="archive_loop")
+            asyncio.create_task(self.archive_loop(), name="archive_loop"),
+            asyncio.create_task(self.auth_failure_flush_loop(), name="auth_failure_flush_loop")
         ]
+        if self.device_registry.write_behind:
+            self.tasks.append(
+                asyncio.create_task(self.device_flush_loop(), name="device_flush_loop")
+            )
+        if self.config.get('rules_profiling', {}).get('log_interval', 300):
+            self.tasks.append(
+                asyncio.create_task(self.rule_stats_loop(), name="rule_stats_loop")
+            )
         
-        logger.info("MessageProcessor started with 3 background tasks")
+        logger.info(f"MessageProcessor started with {len(self.tasks)} background tasks")
         
     async def stop(self):
         """
@@ -148,8 +223,19 @@ class MessageProcessor:
         if self.tasks:
             await asyncio.gather(*self.tasks, return_exceptions=True)
             
+        # Let workers finish messages already dispatched to them
+        await self.worker_pool.stop()
+        
         # Perform one final flush
         await self._final_flush()
+        await self.device_registry.flush()
+        await self.auth_failure_tracker.flush()
+        
+        # Release resolver sockets
+        await self.dns_resolver.close()
+        
+        # Drain pending writes before closing the connection
+        await self.writer.stop()
         
         # Close database connection
         if self.database.connection:
@@ -161,19 +247,41 @@ class MessageProcessor:
         """Perform final flush of file buffer to database."""
         try:
             logger.info("Performing final flush before shutdown")
-            messages = await self.file_buffer.flush()
-            if messages:
-                for msg in messages:
-                    await self.database.store_message(msg)
-                logger.info(f"Flushed {len(messages)} messages to database")
+            stored = await self._store_buffered()
+            if stored:
+                logger.info(f"Flushed {stored} messages to database")
         except Exception as e:
             logger.error(f"Error during final flush: {e}")
     
+    async def _store_buffered(self) -> int:
+        """
+        Store buffered messages, then checkpoint the buffer WAL.
+        
+        On failure the messages go back to the buffer for the next attempt,
+        and the WAL keeps them in case the process dies first.
+        
+        Returns:
+            Number of messages stored
+        """
+        messages = await self.file_buffer.flush()
+        if not messages:
+            return 0
+        try:
+            stored = await self.writer.store_messages(messages)
+        except Exception:
+            self.file_buffer.requeue(messages)
+            raise
+        await self.file_buffer.checkpoint()
+        return stored
+    
     async def process_loop(self):
-        """Main message processing loop."""
-        logger.info("Message processing loop started")
+        """Dispatch messages from the queue to the pipeline workers."""
+        logger.info(f"Message processing loop started with {self.worker_pool.workers} workers")
         
+        stats_interval = self.config.get('processor', {}).get('stats_interval', 60)
+        batch_size = self.worker_pool.batch_size
         last_log_time = 0
+        last_stats_time = asyncio.get_running_loop().time()
         
         while self.running:
             try:
@@ -183,18 +291,27 @@ class MessageProcessor:
                     qsize = self.queue.qsize()
                     current_time = asyncio.get_running_loop().time()
                     if qsize > 100 and (current_time - last_log_time) > 5.0:
-                        logger.warning(f"Message queue depth high: {qsize} messages pending")
+                        logger.warning(
+                            f"Message queue depth high: {qsize} messages pending "
+                            f"({self.worker_pool.pending()} queued on workers)"
+                        )
                         last_log_time = current_time
+                    if stats_interval and (current_time - last_stats_time) >= stats_interval:
+                        self.worker_pool.log_stats()
+                        self._log_queue_stats()
+                        last_stats_time = current_time
                         
                     msg = await asyncio.wait_for(self.queue.get(), timeout=1.0)
                 except asyncio.TimeoutError:
                     continue
                     
-                # Process the message
-                await self._process_message(msg)
-                
-                # Mark task as done
-                self.queue.task_done()
+                # Hand off to the worker owning this source; it marks the task done.
+                # Whatever else is already queued goes along without another wait.
+                await self.worker_pool.submit(msg)
+                for _ in range(batch_size - 1):
+                    if self.queue.empty():
+                        break
+                    await self.worker_pool.submit(self.queue.get_nowait())
                 
             except asyncio.CancelledError:
                 logger.info("Message processing loop cancelled")
@@ -205,31 +322,110 @@ class MessageProcessor:
                 
         logger.info("Message processing loop stopped")
         
+    def _log_queue_stats(self):
+        """Log overflow counters if the queue is a BoundedMessageQueue."""
+        get_stats = getattr(self.queue, 'get_stats', None)
+        if get_stats is None:
+            return
+        stats = get_stats()
+        if stats['dropped'] or stats['spilled']:
+            logger.warning(
+                f"Message queue overflow ({stats['policy']}): depth {stats['depth']}/{stats['max_size']}, "
+                f"dropped newest={stats['dropped_newest']} oldest={stats['dropped_oldest']} "
+                f"lowest_severity={stats['dropped_lowest_severity']} "
+                f"spill_overflow={stats['spill_overflow']}, spilled={stats['spilled']}"
+            )
+        
+    async def _handle_queued_batch(self, msgs):
+        """Process a batch of messages taken from the queue and mark them done."""
+        try:
+            await self._process_batch(msgs)
+        finally:
+            for _ in msgs:
+                self.queue.task_done()
+        
+    def get_worker_stats(self) -> List[Dict[str, Any]]:
+        """
+        Get per-worker pipeline statistics.
+        
+        Returns:
+            One dict per worker with throughput, latency and queue depth
+        """
+        return self.worker_pool.get_stats()
+        
     async def _process_message(self, msg):
         """Process a single message through the pipeline."""
+        await self._process_batch([msg])
+        
+    async def _process_batch(self, msgs):
+        """
+        Process a batch of messages through the pipeline, one stage at a time.
+
+        If validation, matching or enrichment raises for the batch, it is
+        processed again one message at a time so only the bad message is
+        lost. Routing runs handlers with side effects, so it is never
+        repeated; a message that cannot be buffered after routing is dropped
+        on its own.
+        """
         try:
             # 1. Validate
-            if not self.validator.validate(msg):
-                logger.warning(f"Message validation failed: {msg.id}")
+            valid = []
+            for msg, ok in zip(msgs, self.validator.validate_batch(msgs)):
+                if ok:
+                    valid.append(msg)
+                else:
+                    logger.warning(f"Message validation failed: {msg.id}")
+            if not valid:
                 return
                 
             # 2. Match patterns
-            matching_rules = self.pattern_matcher.match(msg)
+            matching_rules = self.pattern_matcher.match_batch(valid)
             
             # 3. Enrich
-            await self.enricher.enrich(msg)
+            await self.enricher.enrich_batch(valid)
             
-            # 4. Route
-            await self.message_router.route(msg, matching_rules)
+        except Exception as e:
+            if len(msgs) == 1:
+                logger.error(f"Error processing message {msgs[0].id}: {e}")
+                return
+            logger.warning(f"Error processing batch of {len(msgs)} messages, retrying one at a time: {e}")
+            for msg in msgs:
+                await self._process_batch([msg])
+            return
+            
+        try:
+            # 4. Route; a message whose handlers failed is not stored
+            routed = []
+            errors = await self.message_router.route_batch(valid, matching_rules)
+            for msg, error in zip(valid, errors):
+                if error is None:
+                    routed.append(msg)
+                else:
+                    logger.error(f"Error processing message {msg.id}: {error}")
             
             # 5. Buffer for batch writing
-            # Note: file_buffer now implements memory buffering to reduce I/O
-            await self.file_buffer.write(msg)
+            await self._buffer_batch(routed)
             
-            logger.debug(f"Processed message: {msg.id}")
+            logger.debug(f"Processed batch of {len(msgs)} messages")
+            
+        except Exception as e:
+            logger.error(f"Error processing batch of {len(msgs)} messages: {e}")
             
+    async def _buffer_batch(self, msgs):
+        """Buffer routed messages, one at a time if the batch cannot be encoded."""
+        try:
+            await self.file_buffer.write_batch(msgs)
+            return
         except Exception as e:
-            logger.error(f"Error processing message {getattr(msg, 'id', 'unknown')}: {e}")
+            if len(msgs) == 1:
+                logger.error(f"Error buffering message {msgs[0].id}: {e}")
+                return
+            logger.warning(f"Error buffering batch of {len(msgs)} messages, retrying one at a time: {e}")
+        for msg in msgs:
+            try:
+                await self.file_buffer.write_batch([msg])
+            except Exception as e:
+                logger.error(f"Error buffering message {msg.id}: {e}")
             
     async def batch_write_loop(self):
         """Batch write loop for periodically flushing buffered messages to database."""
@@ -241,15 +437,16 @@ class MessageProcessor:
             try:
                 await asyncio.sleep(flush_interval)
                 
-                # Flush messages from buffer
-                messages = await self.file_buffer.flush()
+                # Store the whole buffer through the writer and wait for the commit
+                stored = await self._store_buffered()
                 
-                if messages:
-                    # Store each message in database
-                    for msg in messages:
-                        await self.database.store_message(msg)
-                        
-                    logger.info(f"Batch write: flushed {len(messages)} messages to database")
+                if stored:
+                    stats = self.writer.get_stats()
+                    logger.info(
+                        f"Batch write: flushed {stored} messages to database in "
+                        f"{stats['last_group_ms']:.1f} ms "
+                        f"(write amplification {stats['write_amplification']:.3f})"
+                    )
                     
             except asyncio.CancelledError:
                 logger.info("Batch write loop cancelled")
@@ -259,6 +456,72 @@ class MessageProcessor:
                 
         logger.info("Batch write loop stopped")
         
+    async def device_flush_loop(self):
+        """Write-behind loop for periodically flushing dirty devices to the database."""
+        flush_interval = self.config['storage'].get('device_registry', {}).get('flush_interval', 5)
+        logger.info(f"Device flush loop started with {flush_interval}s interval")
+        
+        while self.running:
+            try:
+                await asyncio.sleep(flush_interval)
+                
+                flushed = await self.device_registry.flush()
+                if flushed:
+                    logger.debug(f"Device flush: wrote {flushed} devices to database")
+                    
+            except asyncio.CancelledError:
+                logger.info("Device flush loop cancelled")
+                break
+            except Exception as e:
+                logger.error(f"Error in device_flush_loop: {e}")
+                
+        logger.info("Device flush loop stopped")
+        
+    async def auth_failure_flush_loop(self):
+        """Periodically write SNMPv3 auth failures counted in memory to the database."""
+        flush_interval = self.config['storage'].get('auth_failures', {}).get('flush_interval', 10)
+        logger.info(f"Auth failure flush loop started with {flush_interval}s interval")
+        
+        while self.running:
+            try:
+                await asyncio.sleep(flush_interval)
+                
+                flushed = await self.auth_failure_tracker.flush()
+                if flushed:
+                    logger.debug(f"Auth failure flush: wrote {flushed} failures to database")
+                    
+            except asyncio.CancelledError:
+                logger.info("Auth failure flush loop cancelled")
+                break
+            except Exception as e:
+                logger.error(f"Error in auth_failure_flush_loop: {e}")
+                
+        logger.info("Auth failure flush loop stopped")
+        
+    async def rule_stats_loop(self):
+        """Periodically log per-rule statistics and optionally dump them to a file."""
+        profiling_config = self.config.get('rules_profiling', {})
+        log_interval = profiling_config.get('log_interval', 300)
+        top = profiling_config.get('top', 5)
+        dump_file = profiling_config.get('dump_file')
+        logger.info(f"Rule stats loop started with {log_interval}s interval")
+        
+        while self.running:
+            try:
+                await asyncio.sleep(log_interval)
+                
+                self.pattern_matcher.log_rule_summary(top)
+                if dump_file:
+                    self.pattern_matcher.dump_rule_stats(dump_file)
+                    
+            except asyncio.CancelledError:
+                logger.info("Rule stats loop cancelled")
+                break
+            except Exception as e:
+                logger.error(f"Error in rule_stats_loop: {e}")
+                
+        logger.info("Rule stats loop stopped")
+        
     async def archive_loop(self):
         """Archive cleanup loop for daily cleanup of old messages."""
         archive_interval = 24 * 60 * 60  # 24 hours in seconds
@@ -1,5 +1,5 @@
 import asyncio
-from typing import Callable, Dict, List, Set
+from typing import Callable, Dict, List, Optional, Set
 from collections import defaultdict
 
 from mutt.models.message import Message
@@ -30,25 +30,58 @@ class MessageRouter:
         Args:
             msg: The message to route
             rules: List of alert rules that matched the message
+        
+        Raises:
+            Exception: The first exception raised by a handler
+        """
+        error = (await self.route_batch([msg], [rules]))[0]
+        if error is not None:
+            raise error
+    
+    async def route_batch(
+        self,
+        msgs: List[Message],
+        rules_per_message: List[List[AlertRule]]
+    ) -> List[Optional[BaseException]]:
         """
-        if not rules:
-            return
+        Route a batch of messages, running all their handlers concurrently.
         
-        # Group rules by their action types
-        # A single rule can have multiple actions
-        rules_by_action = defaultdict(list)
-        for rule in rules:
-            for action in rule.actions:
-                rules_by_action[action].append(rule)
+        Args:
+            msgs: Messages to route
+            rules_per_message: Matching rules for each message, in order
+            
+        Returns:
+            One entry per message: None if all its handlers succeeded,
+            otherwise the first exception one of them raised
+        """
+        errors: List[Optional[BaseException]] = [None] * len(msgs)
         
-        # Prepare handler calls for each unique action type
+        # Prepare handler calls for each message and unique action type
         tasks = []
-        for action_type, action_rules in rules_by_action.items():
-            handler = self._handlers.get(action_type)
-            if handler:
-                # Call handler with message and rules for this specific action
-                tasks.append(handler(msg, action_rules))
+        owners = []
+        for index, (msg, rules) in enumerate(zip(msgs, rules_per_message)):
+            if not rules:
+                continue
+            
+            # Group rules by their action types
+            # A single rule can have multiple actions
+            rules_by_action = defaultdict(list)
+            for rule in rules:
+                for action in rule.actions:
+                    rules_by_action[action].append(rule)
+            
+            for action_type, action_rules in rules_by_action.items():
+                handler = self._handlers.get(action_type)
+                if handler:
+                    # Call handler with message and rules for this specific action
+                    tasks.append(handler(msg, action_rules))
+                    owners.append(index)
         
         # Execute all handlers concurrently
         if tasks:
-            await asyncio.gather(*tasks)
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for index, result in zip(owners, results):
+                if isinstance(result, BaseException) and errors[index] is None:
+                    errors[index] = result
+        
+        return errors
@@ -1,22 +1,45 @@
-import re
-from typing import List
+from typing import Any, Dict, List
 
 from mutt.models.message import Message
-from mutt.models.rules import AlertRule, PatternType
+from mutt.models.rules import AlertRule
+from mutt.processors.rule_engine import RuleEngine
+from mutt.processors.rule_profiler import RuleProfiler
 
 
 class PatternMatcher:
     """
     Matches messages against alert rules based on different pattern types.
+    
+    Rules are compiled into a RuleEngine once, so per-message cost does not
+    grow with the number of KEYWORD and EXACT rules. Per-rule match counts
+    are kept for every message; per-rule timings are sampled.
     """
     
-    def __init__(self, rules: List[AlertRule]):
+    def __init__(self, rules: List[AlertRule], profile_sample_every: int = 0):
         """
         Initialize the PatternMatcher with a list of alert rules.
         
         Args:
             rules: List of AlertRule objects to match against
+            profile_sample_every: Time every rule individually on one message
+                out of this many (0 disables timing)
+        """
+        self.profile_sample_every = profile_sample_every
+        self.rules = rules
+        self.engine = RuleEngine(rules)
+        self.profiler = RuleProfiler(rules, profile_sample_every, self.engine.compiled_indices)
+    
+    def set_rules(self, rules: List[AlertRule]) -> None:
+        """
+        Replace the rule set and recompile the engine.
+        
+        Rule statistics are reset.
+        
+        Args:
+            rules: New list of AlertRule objects
         """
+        self.engine = RuleEngine(rules)
+        self.profiler = RuleProfiler(rules, self.profile_sample_every, self.engine.compiled_indices)
         self.rules = rules
     
     def match(self, msg: Message) -> List[AlertRule]:
@@ -29,32 +52,71 @@ class PatternMatcher:
         Returns:
             List of AlertRule objects that match the message
         """
-        matching_rules = []
+        return self.match_batch([msg])[0]
+    
+    def match_batch(self, msgs: List[Message]) -> List[List[AlertRule]]:
+        """
+        Match a batch of messages against all enabled rules.
         
-        for rule in self.rules:
-            # Skip disabled rules
-            if not rule.enabled:
-                continue
+        Args:
+            msgs: Messages to match
             
-            # Skip rules without a pattern
-            if not rule.pattern:
-                continue
+        Returns:
+            One list of matching AlertRule objects per message, in order
+        """
+        engine = self.engine
+        profiler = self.profiler
+        rules = self.rules
+        results: List[List[AlertRule]] = []
+        for msg in msgs:
+            indices = engine.match_indices(msg.payload)
+            profiler.record_matches(indices)
+            if profiler.should_sample():
+                profiler.record_evaluations(engine.evaluate_each(msg.payload))
+            results.append([rules[index] for index in sorted(indices)] if indices else [])
+        return results
+    
+    def get_rule_stats(self) -> List[Dict[str, Any]]:
+        """
+        Get per-rule statistics.
+        
+        Returns:
+            List of dicts with rule_id, name, pattern_type, evaluations,
+            matches, total_ms, mean_us and p99_us, in rule order
+        """
+        return self.profiler.get_stats()
+    
+    def slowest_rules(self, count: int = 10, key: str = "p99_us") -> List[Dict[str, Any]]:
+        """
+        Get the most expensive rules by sampled evaluation time.
+        
+        Args:
+            count: Number of rules to return
+            key: Sort key: "p99_us", "mean_us" or "total_ms"
             
-            # Match based on pattern type
-            if rule.pattern_type == PatternType.REGEX:
-                if re.search(rule.pattern, msg.payload, re.IGNORECASE):
-                    matching_rules.append(rule)
-                    
-            elif rule.pattern_type == PatternType.KEYWORD:
-                if rule.pattern.lower() in msg.payload.lower():
-                    matching_rules.append(rule)
-                    
-            elif rule.pattern_type == PatternType.EXACT:
-                if rule.pattern == msg.payload:
-                    matching_rules.append(rule)
-                    
-            # Handle unknown pattern types
-            else:
-                continue
-        
-        return matching_rules
+        Returns:
+            Rule statistics sorted from most to least expensive
+        """
+        return self.profiler.slowest(count, key)
+    
+    def never_matched(self) -> List[str]:
+        """Get the ids of evaluated rules that have not matched any message."""
+        return self.profiler.never_matched()
+    
+    def log_rule_summary(self, top: int = 5) -> None:
+        """Log the slowest rules, the rules that never matched and the skipped ones."""
+        self.profiler.log_summary(top)
+    
+    def dump_rule_stats(self, path: str, key: str = "p99_us") -> None:
+        """
+        Write per-rule statistics, slowest first, to a JSON file.
+        
+        Args:
+            path: Output file path
+            key: Sort key, as for slowest_rules()
+        """
+        self.profiler.dump(path, key)
+    
+    def reset_rule_stats(self) -> None:
+        """Clear per-rule statistics."""
+        self.profiler.reset()
@@ -0,0 +1,238 @@
+"""
+Precompiled rule engine for PatternMatcher.
+
+Rules are compiled once when loaded:
+- KEYWORD rules into a single Aho-Corasick automaton, so one pass over the
+  lowercased payload finds every keyword regardless of how many there are
+- EXACT rules into a hash map keyed by payload
+- REGEX rules into compiled patterns, fronted by one combined alternation
+  that rejects most non-matching payloads with a single search
+"""
+
+import logging
+import re
+import time
+from collections import deque
+from typing import Dict, List, Optional, Pattern, Set, Tuple
+
+from mutt.models.rules import AlertRule, PatternType
+
+logger = logging.getLogger(__name__)
+
+# Backreferences and conditional groups cannot be renumbered safely inside
+# a combined alternation
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over lowercased keywords.
+
+    The goto and failure functions are folded into a full transition table
+    at build time, so search() does one dict lookup per input character.
+    """
+
+    def __init__(self, keywords: List[Tuple[str, int]]):
+        """
+        Build the automaton.
+
+        Args:
+            keywords: (keyword, value) pairs; search() reports the values of
+                every keyword found. Keywords must already be lowercased.
+        """
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[Set[int]] = [set()]
+
+        for keyword, value in keywords:
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append(set())
+                state = nxt
+            outputs[state].add(value)
+
+        # Breadth-first: compute failure links, merge outputs along them and
+        # build the full transition table from the parent's failure state.
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [None] * (len(goto) - 1)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            outputs[state] |= outputs[fail[state]]
+            delta[state] = dict(delta[fail[state]])
+            delta[state].update(goto[state])
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0)
+                queue.append(nxt)
+
+        self._delta = delta
+        self._outputs = [tuple(sorted(out)) for out in outputs]
+        self.state_count = len(goto)
+
+    def search(self, text: str) -> Set[int]:
+        """
+        Find every keyword occurring in text.
+
+        Args:
+            text: Lowercased text to scan
+
+        Returns:
+            Set of values for the keywords found
+        """
+        delta = self._delta
+        outputs = self._outputs
+        found: Set[int] = set()
+        state = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+
+
+class RuleEngine:
+    """Evaluates a fixed list of alert rules against message payloads."""
+
+    def __init__(self, rules: List[AlertRule]):
+        """
+        Compile the enabled rules.
+
+        Rules that are disabled, have an empty pattern, or whose regex does
+        not compile are skipped (the latter with an error logged).
+
+        Args:
+            rules: Alert rules in priority order
+        """
+        self.rules = list(rules)
+        self._exact: Dict[str, List[int]] = {}
+        self._regexes: List[Tuple[int, Pattern]] = []
+        self._unfiltered: List[Tuple[int, Pattern]] = []
+        self._prefilter: Optional[Pattern] = None
+        # Every compiled rule as (index, pattern_type, matcher), for profiling
+        self._compiled: List[Tuple[int, PatternType, object]] = []
+        keywords: List[Tuple[str, int]] = []
+
+        for index, rule in enumerate(self.rules):
+            if not rule.enabled or not rule.pattern:
+                continue
+
+            if rule.pattern_type == PatternType.KEYWORD:
+                keywords.append((rule.pattern.lower(), index))
+                self._compiled.append((index, PatternType.KEYWORD, rule.pattern.lower()))
+            elif rule.pattern_type == PatternType.EXACT:
+                self._exact.setdefault(rule.pattern, []).append(index)
+                self._compiled.append((index, PatternType.EXACT, rule.pattern))
+            elif rule.pattern_type == PatternType.REGEX:
+                try:
+                    compiled = re.compile(rule.pattern, re.IGNORECASE)
+                except re.error as e:
+                    logger.error(f"Invalid regex in rule {rule.id}: {e}")
+                    continue
+                self._regexes.append((index, compiled))
+                self._compiled.append((index, PatternType.REGEX, compiled))
+
+        self._keywords = KeywordAutomaton(keywords) if keywords else None
+        self._build_prefilter()
+
+    @property
+    def compiled_indices(self) -> List[int]:
+        """Indices of the rules that are evaluated (enabled and valid)."""
+        return [index for index, _, _ in self._compiled]
+
+    @property
+    def regex_count(self) -> int:
+        """Number of compiled regex rules."""
+        return len(self._regexes)
+
+    def _build_prefilter(self) -> None:
+        """Combine eligible regexes into one alternation used as a reject filter."""
+        safe = [
+            (index, pattern) for index, pattern in self._regexes
+            if not _BACKREFERENCE.search(pattern.pattern)
+        ]
+        if len(safe) < 2:
+            return
+
+        combined = "|".join(f"(?:{pattern.pattern})" for _, pattern in safe)
+        try:
+            self._prefilter = re.compile(combined, re.IGNORECASE)
+        except re.error as e:
+            # e.g. the same named group in two rules; evaluate individually
+            logger.debug(f"Regex rules cannot be combined, evaluating individually: {e}")
+            return
+        self._unfiltered = [r for r in self._regexes if r not in safe]
+
+    def match_indices(self, payload: str) -> Set[int]:
+        """
+        Return the indices of all rules matching a payload.
+
+        Args:
+            payload: Message payload
+
+        Returns:
+            Set of indices into self.rules
+        """
+        matched: Set[int] = set()
+
+        if self._keywords is not None:
+            matched |= self._keywords.search(payload.lower())
+
+        exact = self._exact.get(payload)
+        if exact:
+            matched.update(exact)
+
+        if self._regexes:
+            # Only regexes outside the alternation need checking when it misses
+            if self._prefilter is not None and self._prefilter.search(payload) is None:
+                candidates = self._unfiltered
+            else:
+                candidates = self._regexes
+            for index, pattern in candidates:
+                if pattern.search(payload):
+                    matched.add(index)
+
+        return matched
+
+    def match(self, payload: str) -> List[AlertRule]:
+        """
+        Return all rules matching a payload, in rule order.
+
+        Args:
+            payload: Message payload
+
+        Returns:
+            List of matching AlertRule objects
+        """
+        return [self.rules[index] for index in sorted(self.match_indices(payload))]
+
+    def evaluate_each(self, payload: str) -> List[Tuple[int, bool, float]]:
+        """
+        Evaluate every compiled rule on its own and time it.
+
+        This bypasses the automaton and the combined alternation, so the
+        timings reflect each rule's standalone cost. Used for profiling;
+        the result agrees with match_indices().
+
+        Args:
+            payload: Message payload
+
+        Returns:
+            List of (rule index, matched, elapsed seconds) tuples
+        """
+        results = []
+        lowered = payload.lower()
+        clock = time.perf_counter
+        for index, pattern_type, matcher in self._compiled:
+            start = clock()
+            if pattern_type == PatternType.KEYWORD:
+                matched = matcher in lowered
+            elif pattern_type == PatternType.EXACT:
+                matched = matcher == payload
+            else:
+                matched = matcher.search(payload) is not None
+            results.append((index, matched, clock() - start))
+        return results
@@ -0,0 +1,198 @@
+"""
+Per-rule evaluation statistics for PatternMatcher.
+
+Match counts are tracked for every message. Evaluation counts and timings
+come from sampled messages, on which every rule is evaluated and timed on
+its own so that expensive regexes can be told apart.
+"""
+
+import json
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from mutt.models.rules import AlertRule
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RuleStats:
+    """
+    Evaluation statistics for a single rule.
+
+    Attributes:
+        rule_id: Rule identifier
+        name: Rule name
+        pattern_type: Pattern type value ("regex", "keyword", "exact")
+        evaluated: False if the engine skips the rule (disabled or invalid)
+        evaluations: Number of timed (sampled) evaluations
+        matches: Number of messages matched, across all messages
+        total_time: Cumulative seconds spent in timed evaluations
+        samples: Most recent evaluation times in seconds, for percentiles
+    """
+    rule_id: str
+    name: str
+    pattern_type: str
+    evaluated: bool = True
+    evaluations: int = 0
+    matches: int = 0
+    total_time: float = 0.0
+    samples: Deque[float] = field(default_factory=lambda: deque(maxlen=1024))
+
+    @property
+    def mean_us(self) -> float:
+        """Mean evaluation time in microseconds."""
+        return self.total_time / self.evaluations * 1e6 if self.evaluations else 0.0
+
+    @property
+    def p99_us(self) -> float:
+        """99th percentile of recent evaluation times in microseconds."""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the statistics as a plain dictionary."""
+        return {
+            "rule_id": self.rule_id,
+            "name": self.name,
+            "pattern_type": self.pattern_type,
+            "evaluated": self.evaluated,
+            "evaluations": self.evaluations,
+            "matches": self.matches,
+            "total_ms": self.total_time * 1000.0,
+            "mean_us": self.mean_us,
+            "p99_us": self.p99_us,
+        }
+
+
+class RuleProfiler:
+    """Collects RuleStats for a rule list, indexed like RuleEngine.rules."""
+
+    def __init__(
+        self,
+        rules: List[AlertRule],
+        sample_every: int = 100,
+        evaluated: Optional[Iterable[int]] = None
+    ):
+        """
+        Initialize the profiler.
+
+        Args:
+            rules: Rules being matched, in engine order
+            sample_every: Time every rule on one message out of this many
+                (1 = every message, 0 = never)
+            evaluated: Indices of the rules the engine evaluates, such as
+                RuleEngine.compiled_indices; all rules if None
+        """
+        self.sample_every = max(0, sample_every)
+        self.messages = 0
+        self.sampled_messages = 0
+        evaluated = set(range(len(rules)) if evaluated is None else evaluated)
+        self.stats: List[RuleStats] = [
+            RuleStats(rule_id=r.id, name=r.name, pattern_type=r.pattern_type.value,
+                      evaluated=index in evaluated)
+            for index, r in enumerate(rules)
+        ]
+
+    def should_sample(self) -> bool:
+        """Count a message and decide whether it is a timed sample."""
+        self.messages += 1
+        return bool(self.sample_every) and self.messages % self.sample_every == 0
+
+    def record_matches(self, indices) -> None:
+        """Count a match for each rule index."""
+        for index in indices:
+            self.stats[index].matches += 1
+
+    def record_evaluations(self, results) -> None:
+        """
+        Record timed evaluations from RuleEngine.evaluate_each().
+
+        Args:
+            results: (rule index, matched, elapsed seconds) tuples
+        """
+        self.sampled_messages += 1
+        for index, _, elapsed in results:
+            stats = self.stats[index]
+            stats.evaluations += 1
+            stats.total_time += elapsed
+            stats.samples.append(elapsed)
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Return statistics for every rule, in rule order."""
+        return [s.to_dict() for s in self.stats]
+
+    def slowest(self, count: int = 10, key: str = "p99_us") -> List[Dict[str, Any]]:
+        """
+        Return the most expensive rules.
+
+        Args:
+            count: Number of rules to return
+            key: Sort key: "p99_us", "mean_us" or "total_ms"
+
+        Returns:
+            Rule statistics sorted from most to least expensive
+        """
+        timed = [s.to_dict() for s in self.stats if s.evaluations]
+        return sorted(timed, key=lambda s: s[key], reverse=True)[:count]
+
+    def never_matched(self) -> List[str]:
+        """Return the ids of evaluated rules that have not matched any message."""
+        return [s.rule_id for s in self.stats if s.evaluated and s.matches == 0]
+
+    def not_evaluated(self) -> List[str]:
+        """Return the ids of rules the engine skips (disabled or invalid)."""
+        return [s.rule_id for s in self.stats if not s.evaluated]
+
+    def log_summary(self, top: int = 5) -> None:
+        """Log totals, the slowest rules, the rules that never matched and the skipped ones."""
+        total_ms = sum(s.total_time for s in self.stats) * 1000.0
+        logger.info(
+            f"[RuleProfiler] {self.messages} messages, {self.sampled_messages} sampled, "
+            f"{total_ms:.1f} ms in timed rule evaluations"
+        )
+        for s in self.slowest(top):
+            logger.info(
+                f"[RuleProfiler]   {s['rule_id']} ({s['pattern_type']}): "
+                f"p99={s['p99_us']:.1f}us mean={s['mean_us']:.1f}us "
+                f"evals={s['evaluations']} matches={s['matches']}"
+            )
+        unmatched = self.never_matched()
+        if unmatched:
+            logger.info(f"[RuleProfiler] {len(unmatched)} rules never matched: {', '.join(unmatched[:20])}")
+        skipped = self.not_evaluated()
+        if skipped:
+            logger.info(
+                f"[RuleProfiler] {len(skipped)} rules not evaluated (disabled or invalid): "
+                f"{', '.join(skipped[:20])}"
+            )
+
+    def dump(self, path: str, key: str = "p99_us") -> None:
+        """
+        Write statistics for all rules, slowest first, to a JSON file.
+
+        Args:
+            path: Output file path
+            key: Sort key, as for slowest()
+        """
+        stats = sorted(self.get_stats(), key=lambda s: s[key], reverse=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "messages": self.messages,
+                "sampled_messages": self.sampled_messages,
+                "rules": stats,
+            }, f, indent=2)
+
+    def reset(self) -> None:
+        """Clear all counters."""
+        self.messages = 0
+        self.sampled_messages = 0
+        for s in self.stats:
+            s.evaluations = 0
+            s.matches = 0
+            s.total_time = 0.0
+            s.samples.clear()
@@ -33,23 +33,42 @@ class Validator:
             Adds validation errors to msg.metadata["validation_errors"]
             if the message is invalid.
         """
-        # Initialize validation errors list if it doesn't exist
-        if "validation_errors" not in msg.metadata:
-            msg.metadata["validation_errors"] = []
-        
-        errors: List[str] = []
-        
-        # Check if source_ip is present
-        if not msg.source_ip:
-            errors.append("Missing required field: source_ip")
-        
-        # Check if payload is not empty
-        if not msg.payload:
-            errors.append("Payload cannot be empty")
+        return self.validate_batch([msg])[0]
+    
+    def validate_batch(self, msgs: List[Message]) -> List[bool]:
+        """
+        Validate a batch of Message objects.
         
-        # Add errors to metadata if any were found
-        if errors:
-            msg.metadata["validation_errors"].extend(errors)
-            return False
+        Args:
+            msgs: Messages to validate
+            
+        Returns:
+            One flag per message, in order: True if the message is valid
+            
+        Side Effects:
+            Adds validation errors to msg.metadata["validation_errors"]
+            for each invalid message.
+        """
+        results: List[bool] = []
+        for msg in msgs:
+            # Initialize validation errors list if it doesn't exist
+            validation_errors = msg.metadata.setdefault("validation_errors", [])
+            
+            errors: List[str] = []
+            
+            # Check if source_ip is present
+            if not msg.source_ip:
+                errors.append("Missing required field: source_ip")
+            
+            # Check if payload is not empty
+            if not msg.payload:
+                errors.append("Payload cannot be empty")
+            
+            # Add errors to metadata if any were found
+            if errors:
+                validation_errors.extend(errors)
+                results.append(False)
+            else:
+                results.append(True)
         
-        return True
+        return results
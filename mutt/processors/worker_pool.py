@@ -0,0 +1,219 @@
+"""
+Sharded worker pool for the message pipeline.
+
+Messages are assigned to a worker by a hash of their source IP, so messages
+from one device are processed in arrival order while I/O waits for
+different devices (DNS, registry, routing handlers) overlap. Each worker
+hands its handler batches of up to batch_size messages, waiting at most
+max_wait for a batch to fill.
+"""
+
+import asyncio
+import logging
+import time
+import zlib
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from mutt.models.message import Message
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerPool:
+    """Runs a batch handler on N workers, each with its own bounded queue."""
+
+    def __init__(
+        self,
+        handler: Callable[[List[Message]], Awaitable[None]],
+        workers: int = 4,
+        queue_size: int = 1000,
+        batch_size: int = 1,
+        max_wait: float = 0.0
+    ):
+        """
+        Initialize the worker pool.
+
+        Args:
+            handler: Async function processing a batch of messages from one worker
+            workers: Number of concurrent workers
+            queue_size: Maximum pending messages per worker before submit() waits
+            batch_size: Maximum messages per handler call
+            max_wait: Seconds a worker waits for a batch to fill once it has
+                one message; 0 takes only what is already queued
+        """
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max_wait
+        self._queues: List[asyncio.Queue] = [
+            asyncio.Queue(maxsize=queue_size) for _ in range(self.workers)
+        ]
+        self._tasks: List[asyncio.Task] = []
+        self._started_at = 0.0
+        self._stats: List[Dict[str, Any]] = [
+            {"processed": 0, "batches": 0, "max_batch": 0, "errors": 0, "busy_s": 0.0, "max_ms": 0.0}
+            for _ in range(self.workers)
+        ]
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the worker tasks are running."""
+        return any(not task.done() for task in self._tasks)
+
+    def shard_for(self, source_ip: Optional[str]) -> int:
+        """
+        Return the worker index for a source IP.
+
+        Args:
+            source_ip: Message source IP
+
+        Returns:
+            Index of the worker that owns this source
+        """
+        if self.workers == 1 or not source_ip:
+            return 0
+        return zlib.crc32(source_ip.encode()) % self.workers
+
+    async def start(self) -> None:
+        """Start the worker tasks."""
+        if self.is_running:
+            return
+        self._started_at = time.monotonic()
+        self._tasks = [
+            asyncio.create_task(self._run(i), name=f"pipeline_worker_{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(
+            f"[WorkerPool] Started {self.workers} workers (queue size {self.queue_size}, "
+            f"batches of up to {self.batch_size}, max wait {self.max_wait * 1000:.0f} ms)"
+        )
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """
+        Process pending messages, then stop the workers.
+
+        Args:
+            timeout: Seconds to wait for worker queues to drain before cancelling
+        """
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self._queues)), timeout
+            )
+        except asyncio.TimeoutError:
+            pending = sum(queue.qsize() for queue in self._queues)
+            logger.warning(f"[WorkerPool] Stopping with {pending} messages unprocessed")
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("[WorkerPool] Stopped")
+
+    async def submit(self, msg: Message) -> None:
+        """
+        Queue a message on the worker that owns its source IP.
+
+        Waits only if that worker's queue is full.
+
+        Args:
+            msg: Message to process
+        """
+        await self._queues[self.shard_for(msg.source_ip)].put(msg)
+
+    def pending(self) -> int:
+        """Return the number of messages queued across all workers."""
+        return sum(queue.qsize() for queue in self._queues)
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """
+        Return per-worker statistics.
+
+        Returns:
+            One dict per worker with processed, batches, avg_batch,
+            max_batch, errors (failed handler calls), queue_depth,
+            msg_per_sec (since start), utilization (busy fraction),
+            avg_ms (handler time per message) and max_ms (slowest batch)
+        """
+        elapsed = max(time.monotonic() - self._started_at, 1e-9) if self._started_at else 0.0
+        result = []
+        for index, stats in enumerate(self._stats):
+            processed = stats["processed"]
+            batches = stats["batches"]
+            result.append({
+                "worker": index,
+                "processed": processed,
+                "batches": batches,
+                "avg_batch": processed / batches if batches else 0.0,
+                "max_batch": stats["max_batch"],
+                "errors": stats["errors"],
+                "queue_depth": self._queues[index].qsize(),
+                "msg_per_sec": processed / elapsed if elapsed else 0.0,
+                "utilization": stats["busy_s"] / elapsed if elapsed else 0.0,
+                "avg_ms": stats["busy_s"] * 1000.0 / processed if processed else 0.0,
+                "max_ms": stats["max_ms"],
+            })
+        return result
+
+    def log_stats(self) -> None:
+        """Log a one-line throughput summary per worker."""
+        for s in self.get_stats():
+            logger.info(
+                f"[WorkerPool] worker {s['worker']}: {s['processed']} msgs "
+                f"({s['msg_per_sec']:.1f}/s), util {s['utilization']:.0%}, "
+                f"avg batch {s['avg_batch']:.1f}, "
+                f"avg {s['avg_ms']:.2f} ms, max {s['max_ms']:.1f} ms, "
+                f"queue {s['queue_depth']}, errors {s['errors']}"
+            )
+
+    async def _run(self, index: int) -> None:
+        """Process batches from one worker queue until cancelled."""
+        queue = self._queues[index]
+        stats = self._stats[index]
+        while True:
+            batch = await self._next_batch(queue)
+            start = time.perf_counter()
+            try:
+                await self.handler(batch)
+            except asyncio.CancelledError:
+                for _ in batch:
+                    queue.task_done()
+                raise
+            except Exception as e:
+                stats["errors"] += 1
+                logger.error(f"[WorkerPool] Worker {index} failed on a batch of {len(batch)} messages: {e}")
+            elapsed = time.perf_counter() - start
+            stats["processed"] += len(batch)
+            stats["batches"] += 1
+            stats["max_batch"] = max(stats["max_batch"], len(batch))
+            stats["busy_s"] += elapsed
+            stats["max_ms"] = max(stats["max_ms"], elapsed * 1000.0)
+            for _ in batch:
+                queue.task_done()
+
+    async def _next_batch(self, queue: asyncio.Queue) -> List[Message]:
+        """Wait for a message, then collect up to batch_size within max_wait."""
+        batch = [await queue.get()]
+        if self.batch_size == 1:
+            return batch
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        try:
+            while len(batch) < self.batch_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            for _ in batch:
+                queue.task_done()
+            raise
+        return batch
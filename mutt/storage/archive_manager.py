@@ -5,24 +5,27 @@ Archive manager for moving old messages from database to file storage.
 import datetime
 import json
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from mutt.storage.database import Database
+from mutt.storage.writer import StorageWriter
 
 
 class ArchiveManager:
     """Manages archiving of old messages to JSONL files and tracking in database."""
     
-    def __init__(self, db: Database, archive_dir: str):
+    def __init__(self, db: Database, archive_dir: str, writer: Optional[StorageWriter] = None):
         """
         Initialize the ArchiveManager.
         
         Args:
             db: Database instance for message storage
             archive_dir: Directory where archive files will be stored
+            writer: Optional storage writer used for the delete/record transaction
         """
         self.db = db
         self.archive_dir = archive_dir
+        self.writer = writer
         
         # Ensure archive directory exists
         os.makedirs(self.archive_dir, exist_ok=True)
@@ -76,19 +79,24 @@ class ArchiveManager:
         end_date = max(timestamps)
         record_count = len(rows)
         
-        # Delete archived messages from database
+        # Delete archived messages and record the archive in one transaction
         delete_query = "DELETE FROM messages WHERE timestamp < ?"
-        await self.db.execute(delete_query, (cutoff_str,))
-        
-        # Insert archive record into archives table
         archive_query = """
             INSERT INTO archives (filename, start_date, end_date, record_count)
             VALUES (?, ?, ?, ?)
         """
-        await self.db.execute(
-            archive_query,
-            (filename, start_date, end_date, record_count)
-        )
+        archive_params = (filename, start_date, end_date, record_count)
+        
+        if self.writer:
+            future = await self.writer.submit_transaction([
+                (delete_query, (cutoff_str,), False),
+                (archive_query, archive_params, False),
+            ], confirm=True)
+            await future
+            return
+        
+        await self.db.execute(delete_query, (cutoff_str,))
+        await self.db.execute(archive_query, archive_params)
         
         # Commit the transaction
         await self.db.connection.commit()
@@ -2,61 +2,198 @@
 Tracker for SNMPv3 authentication failures.
 """
 
+import time
 import uuid
 import logging
+from collections import deque
+from dataclasses import dataclass, field
 from datetime import datetime, UTC
-from typing import List, Dict, Any
+from typing import Deque, List, Dict, Any, Optional, Tuple
 
 from mutt.storage.database import Database
+from mutt.storage.writer import StorageWriter
 
 logger = logging.getLogger(__name__)
 
+UPSERT_FAILURE_SQL = """
+INSERT INTO snmpv3_auth_failures (id, username, hostname, num_failures, last_failure)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(username) DO UPDATE SET
+    num_failures = num_failures + excluded.num_failures,
+    last_failure = excluded.last_failure,
+    hostname = excluded.hostname
+"""
+
+
+@dataclass
+class FailureCounter:
+    """
+    In-memory failure state of one (username, source) pair.
+
+    Attributes:
+        username: SNMPv3 username that failed
+        hostname: Hostname or IP address the failures came from
+        pending: Failures not yet written to SQLite
+        total: Failures seen since the pair was first tracked
+        last_failure: Wall-clock time of the latest failure
+        buckets: [second, count] pairs covering the rate window
+    """
+    username: str
+    hostname: str
+    pending: int = 0
+    total: int = 0
+    last_failure: float = 0.0
+    buckets: Deque[List[int]] = field(default_factory=deque)
+
 
 class AuthFailureTracker:
-    """Tracks and manages SNMPv3 authentication failure records in the database."""
+    """Tracks and manages SNMPv3 authentication failure records in the database.
+
+    Failures are counted in memory per (username, source) by note_failure(),
+    which is cheap enough to call from the SNMP engine for every rejected
+    message. flush() writes the counts accumulated since the previous flush
+    in a single transaction, so a device failing 100 times a second costs one
+    row per flush instead of 100 commits a second. Each pair also keeps a
+    per-second sliding window for its current failure rate.
+    """
 
-    def __init__(self, database: Database):
+    def __init__(self, database: Database, writer: Optional[StorageWriter] = None, rate_window: float = 60.0):
         """
         Initialize the tracker.
-        
+
         Args:
             database: Database instance for storage operations
+            writer: Optional storage writer; when set, writes are queued to it
+                instead of being committed directly
+            rate_window: Seconds of history behind get_rate()
         """
         self.database = database
+        self.writer = writer
+        self.rate_window = max(1, int(rate_window))
+        self._counters: Dict[Tuple[str, str], FailureCounter] = {}
+
+    def note_failure(self, username: str, hostname: str) -> None:
+        """
+        Count a failed authentication attempt in memory.
+
+        Written to the database by the next flush().
+
+        Args:
+            username: The SNMPv3 username that failed authentication
+            hostname: The hostname or IP address the failure originated from
+        """
+        now = time.time()
+        counter = self._counters.get((username, hostname))
+        if counter is None:
+            counter = self._counters[(username, hostname)] = FailureCounter(username, hostname)
+            logger.warning(f"[AuthFailureTracker] SNMPv3 authentication failing for {username} from {hostname}")
+        counter.pending += 1
+        counter.total += 1
+        counter.last_failure = now
+
+        second = int(now)
+        buckets = counter.buckets
+        if buckets and buckets[-1][0] == second:
+            buckets[-1][1] += 1
+        else:
+            buckets.append([second, 1])
+            while buckets[0][0] <= second - self.rate_window:
+                buckets.popleft()
+
+    def get_rate(self, username: str, hostname: str) -> float:
+        """
+        Return the failure rate of a (username, source) pair.
+
+        Args:
+            username: The SNMPv3 username
+            hostname: The hostname or IP address
+
+        Returns:
+            Failures per second over the last rate_window seconds
+        """
+        counter = self._counters.get((username, hostname))
+        if counter is None:
+            return 0.0
+        oldest = int(time.time()) - self.rate_window
+        return sum(count for second, count in counter.buckets if second > oldest) / self.rate_window
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """
+        Return the in-memory state of every tracked (username, source) pair.
+
+        Returns:
+            List of dictionaries with username, hostname, total, pending and
+            rate (failures per second), highest rate first
+        """
+        stats = [
+            {
+                "username": c.username,
+                "hostname": c.hostname,
+                "total": c.total,
+                "pending": c.pending,
+                "rate": self.get_rate(c.username, c.hostname),
+            }
+            for c in self._counters.values()
+        ]
+        return sorted(stats, key=lambda s: s["rate"], reverse=True)
 
     async def record_failure(self, username: str, hostname: str) -> None:
         """
-        Record a failed authentication attempt.
-        
+        Record a failed authentication attempt and write it immediately.
+
         If a record for the username exists, increments failure count and updates time.
         Otherwise, creates a new record.
-        
+
         Args:
             username: The SNMPv3 username that failed authentication
             hostname: The hostname or IP address the failure originated from
         """
+        self.note_failure(username, hostname)
+        await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Write failures counted since the last flush in a single transaction.
+
+        Pairs are written in the order of their latest failure, so the
+        stored hostname of a username is the one that failed last. Pairs with
+        nothing pending and no failures within the rate window are dropped
+        from memory.
+
+        Returns:
+            Number of failures written
+        """
+        pending = sorted(
+            (c for c in self._counters.values() if c.pending),
+            key=lambda c: c.last_failure
+        )
+        self._expire_idle()
+        if not pending:
+            return 0
+
+        counts = [c.pending for c in pending]
+        rows = [
+            (str(uuid.uuid4()), c.username, c.hostname, c.pending,
+             datetime.fromtimestamp(c.last_failure, UTC).isoformat())
+            for c in pending
+        ]
+        for counter in pending:
+            counter.pending = 0
+
         try:
-            current_time = datetime.now(UTC).isoformat()
-            
-            # Using INSERT OR REPLACE style logic with ON CONFLICT
-            query = """
-            INSERT INTO snmpv3_auth_failures (id, username, hostname, num_failures, last_failure)
-            VALUES (?, ?, ?, 1, ?)
-            ON CONFLICT(username) DO UPDATE SET
-                num_failures = num_failures + 1,
-                last_failure = excluded.last_failure,
-                hostname = excluded.hostname
-            """
-            
-            await self.database.execute(
-                query,
-                (str(uuid.uuid4()), username, hostname, current_time)
-            )
-            await self.database.connection.commit()
-            logger.info(f"[AuthFailureTracker] Recorded failure for {username} from {hostname}")
-            
+            await self._write(UPSERT_FAILURE_SQL, rows, many=True, confirm=True)
         except Exception as e:
-            logger.error(f"Error recording auth failure for {username}: {e}")
+            for counter, count in zip(pending, counts):
+                counter.pending += count
+            logger.error(f"[AuthFailureTracker] Failed to flush {sum(counts)} auth failures: {e}")
+            return 0
+
+        for counter, count in zip(pending, counts):
+            logger.info(
+                f"[AuthFailureTracker] {count} SNMPv3 authentication failures for {counter.username} "
+                f"from {counter.hostname} ({self.get_rate(counter.username, counter.hostname):.2f}/s)"
+            )
+        return sum(counts)
 
     async def clear_failure(self, username: str) -> None:
         """
@@ -66,14 +203,36 @@ class AuthFailureTracker:
             username: The username to clear failures for
         """
         try:
+            for key in [key for key in self._counters if key[0] == username]:
+                del self._counters[key]
             query = "DELETE FROM snmpv3_auth_failures WHERE username = ?"
-            await self.database.execute(query, (username,))
-            await self.database.connection.commit()
+            await self._write(query, (username,))
             logger.info(f"[AuthFailureTracker] Cleared failures for {username}")
             
         except Exception as e:
             logger.error(f"Error clearing auth failures for {username}: {e}")
 
+    def _expire_idle(self) -> None:
+        """Forget pairs with nothing pending and no failures within the rate window."""
+        oldest = time.time() - self.rate_window
+        for key in [k for k, c in self._counters.items() if not c.pending and c.last_failure < oldest]:
+            del self._counters[key]
+
+    async def _write(self, query: str, params: Any, many: bool = False, confirm: bool = False) -> None:
+        """Execute a write through the storage writer, or commit it directly."""
+        if self.writer:
+            # confirm waits for the commit so a failed flush can be retried
+            future = await self.writer.submit(query, params, many=many, confirm=confirm)
+            if future:
+                await future
+            return
+
+        if many:
+            await self.database.connection.executemany(query, params)
+        else:
+            await self.database.execute(query, params)
+        await self.database.connection.commit()
+
     async def get_all_failures(self) -> List[Dict[str, Any]]:
         """
         Retrieve all authentication failure records.
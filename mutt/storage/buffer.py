@@ -1,140 +1,381 @@
 """
-File buffer for persisting messages to disk before batch processing.
+Message buffer between the pipeline and the storage writer.
+
+Messages are kept in memory and handed to the writer as objects by flush(),
+so nothing is parsed back from disk on the normal path. Every message is
+also appended to a write-ahead log (WAL) of numbered segment files, used
+only to recover after a crash. Segments hold CRC-checked binary records
+(see mutt.storage.serialization):
+
+- flush() seals the active segment; messages written afterwards go to a
+  new one
+- checkpoint(), called once the flushed messages are committed, deletes the
+  sealed segments
+- replay(), called at startup, streams any segments left behind by a crash
+  or a failed commit to storage in bounded chunks, recording a committed
+  offset after each chunk so an interrupted replay resumes where it stopped
+
+A message may be stored twice after a crash between commit and checkpoint
+(or between a replay chunk's commit and its offset); storage ignores ids it
+already has.
 """
 
 import asyncio
 import json
+import logging
 import os
-from datetime import datetime
-from typing import List
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from mutt.models.message import Message
+from mutt.storage.serialization import (
+    RECORD_FRAME, CorruptRecordError, decode_message, decode_record, encode_record
+)
+
+logger = logging.getLogger(__name__)
 
-from mutt.models.message import Message, MessageType, Severity
+SEGMENT_PATTERN = re.compile(r"^wal-(\d{8})\.log$")
+
+# Buffer file written by earlier versions; replayed once if present
+LEGACY_BUFFER_FILE = "buffer_active.jsonl"
+
+# Replay progress: last committed position in the segment being replayed
+REPLAY_OFFSET_FILE = "replay.offset"
 
 
 class FileBuffer:
-    """Buffer that persists messages to a JSONL file for durability."""
-    
-    def __init__(self, buffer_dir: str, flush_threshold: int = 100):
+    """In-memory message buffer backed by a segmented write-ahead log."""
+
+    def __init__(
+        self,
+        buffer_dir: str,
+        flush_threshold: int = 100,
+        segment_max_bytes: int = 64 * 1024 * 1024,
+        fsync: bool = False
+    ):
         """
         Initialize the file buffer.
-        
+
         Args:
-            buffer_dir: Directory where buffer files will be stored
-            flush_threshold: Number of messages to buffer in memory before writing to disk
+            buffer_dir: Directory where WAL segments are stored
+            flush_threshold: Number of WAL records to collect in memory before
+                appending them to disk
+            segment_max_bytes: Size at which the active segment is rotated
+            fsync: fsync each append, so records survive a power loss and
+                not only a process crash
         """
         self.buffer_dir = buffer_dir
-        self.buffer_file = os.path.join(buffer_dir, "buffer_active.jsonl")
         self.flush_threshold = flush_threshold
-        self._memory_buffer: List[str] = []
-        
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync = fsync
+
+        # Messages awaiting flush(), and their WAL records not yet on disk
+        self._pending: List[Message] = []
+        self._wal_records: List[bytes] = []
+
+        # Segments whose messages have been flushed but not yet checkpointed
+        self._sealed: List[str] = []
+        # Full segments closed by rotation, sealed by the next flush()
+        self._rotated: List[str] = []
+        self._active_segment: Optional[str] = None
+        self._active_size = 0
+        self._disk_lock = asyncio.Lock()
+        self.stats: Dict[str, int] = {
+            "written": 0,
+            "flushed": 0,
+            "replayed": 0,
+            "segments_checkpointed": 0,
+            "wal_bytes": 0,
+        }
+
         # Create buffer directory if it doesn't exist
         os.makedirs(buffer_dir, exist_ok=True)
-    
+        self._next_sequence = max(self._segment_sequences(), default=0) + 1
+
     async def write(self, msg: Message) -> None:
         """
-        Write a message to the memory buffer, flushing to disk if threshold reached.
-        
+        Buffer a message, appending WAL records to disk if the threshold is reached.
+
         Args:
-            msg: Message object to serialize and write
-        """
-        # Convert message to dict for JSON serialization
-        msg_dict = {
-            "id": msg.id,
-            "timestamp": msg.timestamp.isoformat(),
-            "source_ip": msg.source_ip,
-            "message_type": msg.message_type.value,
-            "severity": msg.severity.value,
-            "payload": msg.payload,
-            "metadata": msg.metadata
-        }
-        
-        # Serialize to JSON
-        json_line = json.dumps(msg_dict)
-        
-        self._memory_buffer.append(json_line)
-        
-        if len(self._memory_buffer) >= self.flush_threshold:
-            await self._flush_memory_to_disk()
-    
-    async def _flush_memory_to_disk(self):
-        """Write current memory buffer to disk."""
-        if not self._memory_buffer:
-            return
+            msg: Message object to buffer
+        """
+        await self.write_batch([msg])
 
-        lines_to_write = list(self._memory_buffer)
-        self._memory_buffer.clear()
-        
-        await asyncio.to_thread(self._write_batch_sync, lines_to_write)
+    async def write_batch(self, msgs: List[Message]) -> None:
+        """
+        Buffer messages, appending WAL records to disk at most once.
+
+        Args:
+            msgs: Message objects to buffer
+
+        Raises:
+            TypeError: If a message cannot be serialized; nothing is buffered
+        """
+        # Encoded first so a failure leaves no message without its WAL record
+        records = [encode_record(msg) for msg in msgs]
+        self._pending.extend(msgs)
+        self._wal_records.extend(records)
+        self.stats["written"] += len(msgs)
+
+        if len(self._wal_records) >= self.flush_threshold:
+            await self._append_records()
 
-    def _write_batch_sync(self, lines: List[str]) -> None:
-        """Synchronous helper for batch file writing."""
-        try:
-            with open(self.buffer_file, "a", encoding="utf-8") as f:
-                f.write("\n".join(lines) + "\n")
-        except IOError as e:
-            print(f"Error writing to buffer file: {e}")
-
-    def _write_sync(self, json_line: str) -> None:
-        """Deprecated: Synchronous helper for file writing."""
-        with open(self.buffer_file, "a", encoding="utf-8") as f:
-            f.write(json_line + "\n")
-    
     async def flush(self) -> List[Message]:
         """
-        Read all messages from buffer (disk + memory) and clear both.
-        
+        Take all buffered messages and seal the WAL segment holding them.
+
+        Call checkpoint() once the returned messages are committed, or
+        requeue() if they could not be.
+
         Returns:
-            List of Message objects read from the buffer
+            Buffered messages, in write order
         """
-        # First ensure everything in memory is on disk
-        await self._flush_memory_to_disk()
-        
-        # Read and clear file asynchronously
-        messages = await asyncio.to_thread(self._flush_sync)
+        # Taken together so the sealed segments hold exactly these messages
+        messages = self._pending
+        self._pending = []
+        records = self._wal_records
+        self._wal_records = []
+
+        async with self._disk_lock:
+            if records:
+                await asyncio.to_thread(self._append_sync, records)
+            self._sealed.extend(self._rotated)
+            self._rotated = []
+            if self._active_segment is not None:
+                self._sealed.append(self._active_segment)
+                self._active_segment = None
+                self._active_size = 0
+
+        self.stats["flushed"] += len(messages)
         return messages
-    
-    def _flush_sync(self) -> List[Message]:
-        """Synchronous helper for reading and clearing buffer."""
-        messages = []
-        
-        # Check if file exists
-        if not os.path.exists(self.buffer_file):
-            return messages
-        
+
+    async def checkpoint(self) -> int:
+        """
+        Delete WAL segments sealed by earlier flushes.
+
+        Only call this after every message returned by those flushes has
+        been committed to the database.
+
+        Returns:
+            Number of segments deleted
+        """
+        async with self._disk_lock:
+            sealed = self._sealed
+            self._sealed = []
+            await asyncio.to_thread(self._remove_sync, sealed)
+        self.stats["segments_checkpointed"] += len(sealed)
+        return len(sealed)
+
+    def requeue(self, messages: List[Message]) -> None:
+        """
+        Put back flushed messages that could not be committed.
+
+        They stay in their sealed segments, so no WAL records are written;
+        they are returned again by the next flush().
+
+        Args:
+            messages: Messages from a flush() whose commit failed
+        """
+        self._pending[:0] = messages
+        self.stats["flushed"] -= len(messages)
+
+    async def replay(
+        self,
+        store: Callable[[List[Message]], Awaitable[Any]],
+        chunk_size: int = 1000
+    ) -> int:
+        """
+        Store the messages in WAL segments left by a previous run.
+
+        Call once at startup, before any write(). Segments are read in chunks
+        of at most chunk_size records. Each chunk is committed by store(),
+        then its end position is saved to the offset file, so a restart
+        resumes after the last committed chunk. Fully replayed segments are
+        deleted. If store() raises, the remaining segments and the offset
+        are kept for the next start.
+
+        Args:
+            store: Coroutine function that commits a list of messages
+            chunk_size: Maximum records held in memory at a time
+
+        Returns:
+            Number of messages replayed
+        """
+        replayed = 0
+        async with self._disk_lock:
+            offset = await asyncio.to_thread(self._read_offset_sync)
+            for path in self._replay_paths():
+                name = os.path.basename(path)
+                position = offset[1] if offset and offset[0] == name else 0
+                while True:
+                    messages, position, done = await asyncio.to_thread(
+                        self._read_chunk_sync, path, position, chunk_size
+                    )
+                    if messages:
+                        await store(messages)
+                        replayed += len(messages)
+                        self.stats["replayed"] += len(messages)
+                    if done:
+                        break
+                    await asyncio.to_thread(self._write_offset_sync, name, position)
+                await asyncio.to_thread(self._remove_sync, [path, self._offset_path()])
+                offset = None
+
+        if replayed:
+            logger.warning(f"[FileBuffer] Replayed {replayed} messages from the WAL")
+        return replayed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return buffer statistics.
+
+        Returns:
+            Dictionary with written, flushed, replayed, segments_checkpointed
+            and wal_bytes counters, plus pending and sealed_segments
+        """
+        stats: Dict[str, Any] = dict(self.stats)
+        stats["pending"] = len(self._pending)
+        stats["sealed_segments"] = len(self._sealed)
+        return stats
+
+    async def _append_records(self) -> None:
+        """Append the collected WAL records to the active segment."""
+        records = self._wal_records
+        self._wal_records = []
+        async with self._disk_lock:
+            await asyncio.to_thread(self._append_sync, records)
+
+    def _append_sync(self, records: List[bytes]) -> None:
+        """Synchronous helper: append records, rotating the segment when full."""
+        if self._active_segment is None:
+            self._active_segment = self._segment_path(self._next_sequence)
+            self._next_sequence += 1
+            self._active_size = 0
+
+        data = b"".join(records)
         try:
-            # Read all lines from file
-            with open(self.buffer_file, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-            
-            # Parse each line as a Message
-            for line in lines:
-                line = line.strip()
+            with open(self._active_segment, "ab") as f:
+                f.write(data)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+        except OSError as e:
+            # Part of the data may have been written; retire the segment so a
+            # torn record can only be the last one in it
+            logger.error(f"[FileBuffer] Error writing WAL segment {self._active_segment}: {e}")
+            self._rotated.append(self._active_segment)
+            self._active_segment = None
+            return
+
+        self._active_size += len(data)
+        self.stats["wal_bytes"] += len(data)
+        if self._active_size >= self.segment_max_bytes:
+            self._rotated.append(self._active_segment)
+            self._active_segment = None
+
+    def _remove_sync(self, paths: List[str]) -> None:
+        """Synchronous helper for deleting checkpointed segments."""
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error(f"[FileBuffer] Error removing WAL segment {path}: {e}")
+
+    def _read_chunk_sync(self, path: str, position: int, limit: int) -> Tuple[List[Message], int, bool]:
+        """
+        Synchronous helper for reading up to limit records from a segment.
+
+        Returns:
+            Tuple of (messages, position after the last record read, end of segment reached)
+        """
+        if os.path.basename(path) == LEGACY_BUFFER_FILE:
+            return self._read_lines_chunk_sync(path, position, limit)
+
+        messages: List[Message] = []
+        with open(path, "rb") as f:
+            f.seek(position)
+            while len(messages) < limit:
+                frame = f.read(RECORD_FRAME.size)
+                if not frame:
+                    return messages, position, True
+                length = RECORD_FRAME.unpack(frame)[0] if len(frame) == RECORD_FRAME.size else 0
+                record = frame + f.read(length)
+                try:
+                    msg, _ = decode_record(record)
+                except CorruptRecordError as e:
+                    # A write torn by a crash; nothing valid can follow it
+                    logger.warning(
+                        f"[FileBuffer] Ignoring the rest of {path} after position {position}: {e}"
+                    )
+                    return messages, position, True
+                messages.append(msg)
+                position += len(record)
+            return messages, position, not f.read(1)
+
+    def _read_lines_chunk_sync(self, path: str, position: int, limit: int) -> Tuple[List[Message], int, bool]:
+        """Synchronous helper for reading up to limit JSON lines from a legacy buffer file."""
+        messages: List[Message] = []
+        read = 0
+        with open(path, "rb") as f:
+            f.seek(position)
+            while read < limit:
+                line = f.readline()
                 if not line:
+                    return messages, f.tell(), True
+                read += 1
+                if not line.strip():
                     continue
-                
                 try:
-                    msg_dict = json.loads(line)
-                    
-                    # Reconstruct Message object
-                    message = Message(
-                        id=msg_dict["id"],
-                        timestamp=datetime.fromisoformat(msg_dict["timestamp"]),
-                        source_ip=msg_dict["source_ip"],
-                        message_type=MessageType(msg_dict["message_type"]),
-                        severity=Severity(msg_dict["severity"]),
-                        payload=msg_dict["payload"],
-                        metadata=msg_dict.get("metadata", {})
-                    )
-                    messages.append(message)
-                except (json.JSONDecodeError, KeyError, ValueError) as e:
-                    # Log error but continue processing other messages
-                    print(f"Error parsing buffer line: {e}, line: {line[:100]}")
-            
-            # Clear the file by truncating
-            with open(self.buffer_file, "w", encoding="utf-8") as f:
-                f.truncate(0)
-                
-        except IOError as e:
-            print(f"Error reading buffer file: {e}")
-        
-        return messages
+                    messages.append(decode_message(line.decode("utf-8")))
+                except (ValueError, KeyError, TypeError) as e:
+                    # A torn last record after a crash ends up here
+                    logger.warning(f"[FileBuffer] Skipping unreadable record in {path}: {e}")
+            position = f.tell()
+            return messages, position, not f.read(1)
+
+    def _read_offset_sync(self) -> Optional[Tuple[str, int]]:
+        """Synchronous helper: return the (segment name, position) committed so far."""
+        try:
+            with open(self._offset_path(), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data["segment"], int(data["offset"])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error(f"[FileBuffer] Ignoring unreadable replay offset: {e}")
+            return None
+
+    def _write_offset_sync(self, segment: str, position: int) -> None:
+        """Synchronous helper: durably record the committed replay position."""
+        path = self._offset_path()
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"segment": segment, "offset": position}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _replay_paths(self) -> List[str]:
+        """Return the files to replay, oldest first."""
+        paths = [self._segment_path(seq) for seq in sorted(self._segment_sequences())]
+        legacy = os.path.join(self.buffer_dir, LEGACY_BUFFER_FILE)
+        if os.path.exists(legacy) and os.path.getsize(legacy):
+            paths.insert(0, legacy)
+        return paths
+
+    def _offset_path(self) -> str:
+        return os.path.join(self.buffer_dir, REPLAY_OFFSET_FILE)
+
+    def _segment_sequences(self) -> List[int]:
+        """Return the sequence numbers of the WAL segments on disk."""
+        sequences = []
+        for name in os.listdir(self.buffer_dir):
+            match = SEGMENT_PATTERN.match(name)
+            if match:
+                sequences.append(int(match.group(1)))
+        return sequences
+
+    def _segment_path(self, sequence: int) -> str:
+        return os.path.join(self.buffer_dir, f"wal-{sequence:08d}.log")
@@ -4,8 +4,9 @@ Database module for Mutt - Async SQLite storage for messages.
 
 import json
 import logging
+import time
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 
 import aiosqlite
 
@@ -14,20 +15,128 @@ from .schema import SCHEMA_SQL
 
 logger = logging.getLogger(__name__)
 
+# OR IGNORE: messages replayed from the buffer WAL may already be stored
+INSERT_MESSAGE_SQL = """
+    INSERT OR IGNORE INTO messages (
+        id, timestamp, source_ip, type, severity, payload, metadata
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Connection-level tuning presets, applied in order at connect time.
+# Both presets use WAL so the web UI can read while the writer commits;
+# they differ in how hard each commit syncs to disk.
+PRAGMA_PROFILES: Dict[str, Dict[str, Any]] = {
+    "throughput": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 268435456,      # 256 MiB
+        "cache_size": -65536,        # 64 MiB (negative = KiB)
+        "temp_store": "MEMORY",
+        "wal_autocheckpoint": 1000,
+    },
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "mmap_size": 0,
+        "cache_size": -16384,        # 16 MiB
+        "temp_store": "DEFAULT",
+        "wal_autocheckpoint": 1000,
+    },
+}
+
+# Allowed values for the non-integer pragmas; PRAGMA statements cannot be
+# parameterized, so everything is validated before being interpolated.
+_PRAGMA_CHOICES: Dict[str, set] = {
+    "journal_mode": {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"},
+    "synchronous": {"OFF", "NORMAL", "FULL", "EXTRA", "0", "1", "2", "3"},
+    "temp_store": {"DEFAULT", "FILE", "MEMORY", "0", "1", "2"},
+}
+_PRAGMA_INTEGERS = ("mmap_size", "cache_size", "wal_autocheckpoint")
+PRAGMA_ORDER = ("journal_mode", "synchronous", "mmap_size", "cache_size",
+                "temp_store", "wal_autocheckpoint")
+
+
+def resolve_pragmas(
+    profile: Optional[str] = None,
+    overrides: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Build a validated pragma mapping from a named profile plus overrides.
+    
+    Args:
+        profile: Name of a preset in PRAGMA_PROFILES, or None for SQLite defaults
+        overrides: Individual pragma values that take precedence over the preset
+        
+    Returns:
+        Ordered dictionary of pragma name to normalized value
+        
+    Raises:
+        ValueError: If the profile, a pragma name or a value is not recognized
+    """
+    pragmas: Dict[str, Any] = {}
+    if profile:
+        if profile not in PRAGMA_PROFILES:
+            raise ValueError(f"Unknown storage profile: {profile}")
+        pragmas.update(PRAGMA_PROFILES[profile])
+    pragmas.update(overrides or {})
+    
+    resolved: Dict[str, Any] = {}
+    for name in PRAGMA_ORDER:
+        if name not in pragmas:
+            continue
+        value = pragmas.pop(name)
+        if name in _PRAGMA_INTEGERS:
+            try:
+                resolved[name] = int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid value for pragma {name}: {value!r}")
+        else:
+            # YAML reads a bare "off" as False
+            if value is False:
+                value = "OFF"
+            value = str(value).upper()
+            if value not in _PRAGMA_CHOICES[name]:
+                raise ValueError(f"Invalid value for pragma {name}: {value!r}")
+            resolved[name] = value
+    
+    if pragmas:
+        raise ValueError(f"Unsupported pragmas: {', '.join(sorted(pragmas))}")
+    
+    return resolved
+
 
 class Database:
     """Async SQLite database for storing and retrieving messages."""
     
-    def __init__(self, db_path: str):
+    def __init__(
+        self,
+        db_path: str,
+        profile: Optional[str] = None,
+        pragmas: Optional[Dict[str, Any]] = None
+    ):
         """
         Initialize the database.
         
         Args:
             db_path: Path to the SQLite database file.
+            profile: Optional storage profile name ("throughput" or "durable")
+            pragmas: Optional per-pragma overrides applied on top of the profile
         """
         self.db_path = db_path
+        self.profile = profile
+        self.pragmas = resolve_pragmas(profile, pragmas)
+        self.effective_pragmas: Dict[str, Any] = {}
         self.connection: Optional[aiosqlite.Connection] = None
         
+        # Cumulative statistics for batch inserts (see store_messages)
+        self.write_stats: Dict[str, Any] = {
+            "batches": 0,
+            "rows": 0,
+            "total_ms": 0.0,
+            "last_batch_rows": 0,
+            "last_batch_ms": 0.0,
+        }
+        
     async def __aenter__(self) -> "Database":
         """Enter async context manager."""
         await self.initialize()
@@ -43,17 +152,32 @@ class Database:
         Initialize the database connection and create tables.
         """
         self.connection = await aiosqlite.connect(self.db_path)
+        await self._apply_pragmas()
         # Create tables
         await self.connection.executescript(SCHEMA_SQL)
         await self.connection.commit()
             
-    async def store_message(self, msg: Message):
+    async def _apply_pragmas(self) -> None:
+        """Apply the configured pragmas and record what SQLite actually uses."""
+        for name, value in self.pragmas.items():
+            await self.connection.execute(f"PRAGMA {name} = {value}")
+        
+        # Read every tunable back: SQLite silently ignores some settings
+        # (e.g. WAL on an in-memory database), so log the effective values.
+        self.effective_pragmas = {}
+        for name in PRAGMA_ORDER:
+            async with self.connection.execute(f"PRAGMA {name}") as cursor:
+                row = await cursor.fetchone()
+            self.effective_pragmas[name] = row[0] if row else None
+        
+        settings = ", ".join(f"{k}={v}" for k, v in self.effective_pragmas.items())
+        logger.info(f"[Database] Storage profile '{self.profile or 'default'}': {settings}")
+    
+    @staticmethod
+    def message_row(msg: Message) -> Tuple:
         """
-        Store a message in the database.
+        Serialize a message into a row tuple for INSERT_MESSAGE_SQL.
         """
-        if not self.connection:
-            raise RuntimeError("Database not initialized. Call initialize() first.")
-            
         # Prepare metadata based on message type
         metadata = dict(msg.metadata)
         
@@ -65,19 +189,22 @@ class Database:
                 "process_name": msg.process_name,
                 "process_id": msg.process_id
             })
+            if msg.msg_id is not None:
+                metadata["msg_id"] = msg.msg_id
+            if msg.structured_data:
+                metadata["structured_data"] = msg.structured_data
         elif isinstance(msg, SNMPTrap):
             metadata.update({
                 "oid": msg.oid,
                 "varbinds": msg.varbinds,
                 "version": msg.version
             })
+            if msg.trap_name is not None:
+                metadata["trap_name"] = msg.trap_name
+            if msg.varbind_names:
+                metadata["varbind_names"] = msg.varbind_names
         
-        # Insert message into database
-        await self.connection.execute("""
-            INSERT INTO messages (
-                id, timestamp, source_ip, type, severity, payload, metadata
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
+        return (
             msg.id,
             msg.timestamp.isoformat(),
             msg.source_ip,
@@ -85,8 +212,59 @@ class Database:
             msg.severity.value,
             msg.payload,
             json.dumps(metadata)
-        ))
+        )
+            
+    async def store_message(self, msg: Message):
+        """
+        Store a message in the database.
+        """
+        if not self.connection:
+            raise RuntimeError("Database not initialized. Call initialize() first.")
+        
+        # Insert message into database
+        await self.connection.execute(INSERT_MESSAGE_SQL, self.message_row(msg))
         await self.connection.commit()
+    
+    async def store_messages(self, messages: List[Message]) -> int:
+        """
+        Store a batch of messages in a single transaction.
+        
+        The batch is serialized once and inserted with one prepared
+        executemany followed by a single commit, so a flush costs one
+        sync instead of one per message. If any row fails, the whole
+        batch is rolled back and the error is re-raised.
+        
+        Args:
+            messages: Messages to store
+            
+        Returns:
+            Number of rows inserted
+        """
+        if not self.connection:
+            raise RuntimeError("Database not initialized. Call initialize() first.")
+        
+        if not messages:
+            return 0
+        
+        start = time.perf_counter()
+        rows = [self.message_row(msg) for msg in messages]
+        
+        try:
+            await self.connection.executemany(INSERT_MESSAGE_SQL, rows)
+            await self.connection.commit()
+        except Exception:
+            await self.connection.rollback()
+            raise
+        
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        self.write_stats["batches"] += 1
+        self.write_stats["rows"] += len(rows)
+        self.write_stats["total_ms"] += elapsed_ms
+        self.write_stats["last_batch_rows"] = len(rows)
+        self.write_stats["last_batch_ms"] = elapsed_ms
+        logger.debug(f"[Database] Stored batch of {len(rows)} messages in {elapsed_ms:.1f} ms")
+        
+        return len(rows)
             
     async def execute(self, query: str, parameters: tuple = ()):
         """
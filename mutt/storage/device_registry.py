@@ -2,53 +2,177 @@
 Device registry for storing and updating device information.
 """
 
-from datetime import datetime, UTC
-from typing import Optional
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, UTC
+from typing import Dict, List, Optional
 
 from mutt.storage.database import Database
+from mutt.storage.writer import StorageWriter
+
+logger = logging.getLogger(__name__)
+
+UPSERT_DEVICE_SQL = """
+INSERT INTO devices (ip, hostname, snmp_version, last_seen)
+VALUES (?, ?, ?, ?)
+ON CONFLICT(ip) DO UPDATE SET
+    hostname = COALESCE(excluded.hostname, devices.hostname),
+    snmp_version = COALESCE(excluded.snmp_version, devices.snmp_version),
+    last_seen = excluded.last_seen
+"""
+
+
+@dataclass
+class DeviceRecord:
+    """
+    In-memory state of a known device.
+
+    Attributes:
+        ip: Device IP address
+        hostname: Last known hostname
+        snmp_version: Last known SNMP version
+        last_seen: Time the device was last seen (always current in memory)
+        persisted_last_seen: last_seen value most recently written to SQLite
+        dirty: Whether the record has changes not yet written to SQLite
+    """
+    ip: str
+    hostname: Optional[str] = None
+    snmp_version: Optional[str] = None
+    last_seen: Optional[datetime] = None
+    persisted_last_seen: Optional[datetime] = None
+    dirty: bool = True
 
 
 class DeviceRegistry:
-    """Registry for managing device information in the database."""
-    
-    def __init__(self, db: Database):
+    """Registry for managing device information in the database.
+
+    Devices are cached in memory by IP. A device is only written when its
+    hostname or SNMP version changes, or when last_seen has advanced by at
+    least last_seen_granularity since the last write. In write-behind mode
+    those writes are deferred until flush(), which writes every dirty device
+    in a single transaction.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        writer: Optional[StorageWriter] = None,
+        write_behind: bool = False,
+        last_seen_granularity: float = 0.0
+    ):
         """Initialize the device registry.
-        
+
         Args:
             db: Database connection instance
+            writer: Optional storage writer; when set, updates are queued to it
+                instead of being committed directly
+            write_behind: Defer writes until flush() instead of writing on update
+            last_seen_granularity: Seconds last_seen may lag in SQLite before an
+                otherwise unchanged device is written again
         """
         self.db = db
-    
+        self.writer = writer
+        self.write_behind = write_behind
+        self.last_seen_granularity = timedelta(seconds=last_seen_granularity)
+        self._devices: Dict[str, DeviceRecord] = {}
+
+    def get_device(self, ip: str) -> Optional[DeviceRecord]:
+        """Return the cached record for a device, if it has been seen.
+
+        Args:
+            ip: Device IP address
+        """
+        return self._devices.get(ip)
+
+    @property
+    def dirty_count(self) -> int:
+        """Number of devices with changes not yet written to SQLite."""
+        return sum(1 for record in self._devices.values() if record.dirty)
+
     async def update_device(
-        self, 
-        ip: str, 
-        hostname: Optional[str] = None, 
+        self,
+        ip: str,
+        hostname: Optional[str] = None,
         snmp_version: Optional[str] = None
     ) -> None:
-        """Update device information in the database.
-        
-        If the device exists, update the provided fields and set last_seen to current UTC time.
-        If it doesn't exist, insert a new record.
-        
+        """Update device information.
+
+        The cached record always reflects the latest values; provided fields
+        overwrite the cached ones and last_seen is set to the current UTC time.
+        In write-through mode a dirty record is written immediately.
+
         Args:
             ip: Device IP address (primary key)
             hostname: Optional hostname of the device
             snmp_version: Optional SNMP version used for communication
         """
-        current_time = datetime.now(UTC).isoformat()
-        
-        # Build the update query with ON CONFLICT clause
-        query = """
-        INSERT INTO devices (ip, hostname, snmp_version, last_seen)
-        VALUES (?, ?, ?, ?)
-        ON CONFLICT(ip) DO UPDATE SET
-            hostname = COALESCE(excluded.hostname, devices.hostname),
-            snmp_version = COALESCE(excluded.snmp_version, devices.snmp_version),
-            last_seen = excluded.last_seen
+        now = datetime.now(UTC)
+        record = self._devices.get(ip)
+
+        if record is None:
+            record = DeviceRecord(ip=ip, hostname=hostname, snmp_version=snmp_version, last_seen=now)
+            self._devices[ip] = record
+        else:
+            if hostname is not None and hostname != record.hostname:
+                record.hostname = hostname
+                record.dirty = True
+            if snmp_version is not None and snmp_version != record.snmp_version:
+                record.snmp_version = snmp_version
+                record.dirty = True
+            record.last_seen = now
+            if (record.persisted_last_seen is None
+                    or now - record.persisted_last_seen >= self.last_seen_granularity):
+                record.dirty = True
+
+        if record.dirty and not self.write_behind:
+            await self._write([record])
+
+    async def flush(self) -> int:
+        """Write all dirty devices to the database in a single transaction.
+
+        Returns:
+            Number of devices written
         """
-        
-        await self.db.execute(
-            query,
-            (ip, hostname, snmp_version, current_time)
-        )
-        await self.db.connection.commit()
+        dirty = [record for record in self._devices.values() if record.dirty]
+        if not dirty:
+            return 0
+
+        try:
+            await self._write(dirty)
+        except Exception as e:
+            logger.error(f"[DeviceRegistry] Failed to flush {len(dirty)} devices: {e}")
+            return 0
+
+        logger.debug(f"[DeviceRegistry] Flushed {len(dirty)} devices")
+        return len(dirty)
+
+    async def _write(self, records: List[DeviceRecord]) -> None:
+        """Upsert records and mark them clean; restore dirtiness on failure."""
+        rows = [
+            (r.ip, r.hostname, r.snmp_version, r.last_seen.isoformat())
+            for r in records
+        ]
+        snapshot = [r.last_seen for r in records]
+        for record in records:
+            record.dirty = False
+
+        try:
+            if self.writer:
+                # Flushes wait for the commit so failures can be retried
+                future = await self.writer.submit(
+                    UPSERT_DEVICE_SQL, rows, many=True, confirm=self.write_behind
+                )
+                if future:
+                    await future
+            else:
+                if not self.db.connection:
+                    raise RuntimeError("Database not initialized. Call initialize() first.")
+                await self.db.connection.executemany(UPSERT_DEVICE_SQL, rows)
+                await self.db.connection.commit()
+        except Exception:
+            for record in records:
+                record.dirty = True
+            raise
+
+        for record, last_seen in zip(records, snapshot):
+            record.persisted_last_seen = last_seen
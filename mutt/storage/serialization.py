@@ -0,0 +1,303 @@
+"""
+Message serialization for the write-ahead buffer.
+
+Two formats are provided, both of which bring a SyslogMessage or SNMPTrap
+back as the same subtype with all of its fields:
+
+- JSON lines (encode_message / decode_message): a dict of every dataclass
+  field plus a "kind" discriminator. Used by the original buffer file.
+- Binary records (encode_record / decode_record), used for WAL segments.
+  Each record is framed as
+
+      length (u32) | crc32 of body (u32) | body
+
+  and the body is a fixed header
+
+      version (u8) | kind (u8) | message type (u8) | severity (u8)
+      | timestamp, microseconds since the epoch (i64)
+      | UTC offset in seconds, or NAIVE_TIMESTAMP (i32)
+      | id format (u8) | address family (u8)
+      | id, source_ip, payload, extras lengths (u16, u16, u32, u32)
+
+  followed by those four fields. A UUID id and an IPv4/IPv6 source_ip are
+  packed as raw bytes (16 and 4/16 bytes); anything else is stored as UTF-8
+  text. Extras is a JSON object holding metadata and the subtype fields that
+  differ from their defaults; it is left empty when there are none.
+
+The CRC detects a torn write at the end of a segment after a crash; the
+version byte lets the body layout change later.
+"""
+
+import json
+import socket
+import struct
+import zlib
+from dataclasses import MISSING, fields
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Any, Dict, List, Tuple, Type
+
+from mutt.models.message import Message, MessageType, Severity, SNMPTrap, SyslogMessage
+
+# Discriminator stored with each record
+MESSAGE_KINDS: Dict[str, Type[Message]] = {
+    "message": Message,
+    "syslog": SyslogMessage,
+    "snmp_trap": SNMPTrap,
+}
+_KIND_BY_CLASS = {cls: kind for kind, cls in MESSAGE_KINDS.items()}
+
+
+def message_to_dict(msg: Message) -> Dict[str, Any]:
+    """
+    Convert a message to a JSON-compatible dict.
+
+    Args:
+        msg: Message or subtype instance
+
+    Returns:
+        Dict with "kind" and one entry per dataclass field
+    """
+    data: Dict[str, Any] = {"kind": _KIND_BY_CLASS.get(type(msg), "message")}
+    for f in fields(msg):
+        value = getattr(msg, f.name)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, Enum):
+            value = value.value
+        data[f.name] = value
+    return data
+
+
+def message_from_dict(data: Dict[str, Any]) -> Message:
+    """
+    Rebuild a message from message_to_dict() output.
+
+    Records without "kind" (the original buffer format) become a Message;
+    unknown keys are ignored.
+
+    Args:
+        data: Serialized message
+
+    Returns:
+        Message of the recorded subtype
+
+    Raises:
+        KeyError, ValueError: If required fields are missing or invalid
+    """
+    cls = MESSAGE_KINDS.get(data.get("kind", "message"), Message)
+    kwargs: Dict[str, Any] = {}
+    for f in fields(cls):
+        if f.name in data:
+            kwargs[f.name] = data[f.name]
+    kwargs["timestamp"] = datetime.fromisoformat(data["timestamp"])
+    kwargs["message_type"] = MessageType(data["message_type"])
+    kwargs["severity"] = Severity(data["severity"])
+    return cls(**kwargs)
+
+
+def encode_message(msg: Message) -> str:
+    """Serialize a message to one JSON line (without the newline)."""
+    return json.dumps(message_to_dict(msg))
+
+
+def decode_message(line: str) -> Message:
+    """Parse a line produced by encode_message()."""
+    return message_from_dict(json.loads(line))
+
+
+RECORD_VERSION = 1
+
+RECORD_FRAME = struct.Struct("<II")
+RECORD_HEADER = struct.Struct("<BBBBqiBBHHII")
+
+NAIVE_TIMESTAMP = -0x80000000
+
+# Codes used in the record header; append only, never reorder
+_KIND_CODES: List[Type[Message]] = [Message, SyslogMessage, SNMPTrap]
+_TYPE_CODES: List[MessageType] = [MessageType.SYSLOG, MessageType.SNMP_TRAP, MessageType.UNKNOWN]
+_SEVERITY_CODES: List[Severity] = [
+    Severity.EMERGENCY, Severity.ALERT, Severity.CRITICAL, Severity.ERROR,
+    Severity.WARNING, Severity.NOTICE, Severity.INFO, Severity.DEBUG,
+]
+_KIND_INDEX = {cls: code for code, cls in enumerate(_KIND_CODES)}
+_TYPE_INDEX = {value: code for code, value in enumerate(_TYPE_CODES)}
+_SEVERITY_INDEX = {value: code for code, value in enumerate(_SEVERITY_CODES)}
+
+_ID_TEXT, _ID_UUID = 0, 1
+_ADDR_TEXT, _ADDR_IPV4, _ADDR_IPV6 = 0, 4, 6
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+_TIMEZONES: Dict[int, timezone] = {0: timezone.utc}
+_dump_extras = json.JSONEncoder(separators=(",", ":"), check_circular=False).encode
+_load_extras = json.JSONDecoder().decode
+_BASE_FIELDS = {f.name for f in fields(Message)} - {"metadata"}
+
+
+def _extra_fields(cls: Type[Message]) -> List[Tuple[str, Any]]:
+    """Return (name, default) for the fields stored in the extras blob."""
+    extras = []
+    for f in fields(cls):
+        if f.name in _BASE_FIELDS:
+            continue
+        if f.default is not MISSING:
+            extras.append((f.name, f.default))
+        elif f.default_factory is not MISSING:
+            extras.append((f.name, f.default_factory()))
+    return extras
+
+
+_EXTRA_FIELDS = {cls: _extra_fields(cls) for cls in _KIND_CODES}
+
+
+def _pack_id(msg_id: str) -> Tuple[bytes, int]:
+    """Pack a UUID id as 16 bytes; other ids (or non-canonical spellings) as text."""
+    if (len(msg_id) == 36 and msg_id[8] == msg_id[13] == msg_id[18] == msg_id[23] == "-"
+            and msg_id == msg_id.lower()):
+        try:
+            packed = bytes.fromhex(msg_id.replace("-", ""))
+        except ValueError:
+            packed = b""
+        if len(packed) == 16:
+            return packed, _ID_UUID
+    return msg_id.encode("utf-8"), _ID_TEXT
+
+
+def _unpack_id(packed: bytes) -> str:
+    """Format 16 id bytes in the canonical lowercase UUID spelling."""
+    h = packed.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def _pack_address(source_ip: str) -> Tuple[bytes, int]:
+    """Pack an IP address as 4 or 16 bytes; anything that would not round-trip as text."""
+    for family, code in ((socket.AF_INET, _ADDR_IPV4), (socket.AF_INET6, _ADDR_IPV6)):
+        try:
+            packed = socket.inet_pton(family, source_ip)
+        except (OSError, TypeError):
+            continue
+        if socket.inet_ntop(family, packed) == source_ip:
+            return packed, code
+        break
+    return source_ip.encode("utf-8"), _ADDR_TEXT
+
+
+class CorruptRecordError(ValueError):
+    """Raised when a binary record is truncated or fails its CRC check."""
+
+
+def encode_record(msg: Message) -> bytes:
+    """
+    Serialize a message to one framed binary record.
+
+    Args:
+        msg: Message or subtype instance
+
+    Returns:
+        Record bytes, including the length and CRC frame
+    """
+    cls = type(msg) if type(msg) in _KIND_INDEX else Message
+
+    id_bytes, id_format = _pack_id(msg.id)
+    ip_bytes, family = _pack_address(msg.source_ip)
+
+    ts = msg.timestamp
+    offset = ts.utcoffset()
+    if offset is None:
+        micros = (ts - _EPOCH) // _MICROSECOND
+        offset_seconds = NAIVE_TIMESTAMP
+    else:
+        micros = (ts - _EPOCH_UTC) // _MICROSECOND
+        offset_seconds = offset.days * 86400 + offset.seconds
+
+    extras: Dict[str, Any] = {}
+    for name, default in _EXTRA_FIELDS[cls]:
+        value = getattr(msg, name)
+        if value != default:
+            extras[name] = value
+    extras_bytes = _dump_extras(extras).encode("utf-8") if extras else b""
+    payload_bytes = msg.payload.encode("utf-8", "surrogatepass")
+
+    body = b"".join((
+        RECORD_HEADER.pack(
+            RECORD_VERSION, _KIND_INDEX[cls], _TYPE_INDEX[msg.message_type],
+            _SEVERITY_INDEX[msg.severity], micros, offset_seconds, id_format, family,
+            len(id_bytes), len(ip_bytes), len(payload_bytes), len(extras_bytes)
+        ),
+        id_bytes, ip_bytes, payload_bytes, extras_bytes
+    ))
+    return RECORD_FRAME.pack(len(body), zlib.crc32(body)) + body
+
+
+def decode_record(data: bytes, offset: int = 0) -> Tuple[Message, int]:
+    """
+    Parse one record produced by encode_record().
+
+    Args:
+        data: Buffer holding the record
+        offset: Position of the record's frame in data
+
+    Returns:
+        Tuple of (message, position after the record)
+
+    Raises:
+        CorruptRecordError: If the record is truncated, fails its CRC check
+            or has an unknown version
+    """
+    if len(data) - offset < RECORD_FRAME.size:
+        raise CorruptRecordError("truncated record frame")
+    length, crc = RECORD_FRAME.unpack_from(data, offset)
+    start = offset + RECORD_FRAME.size
+    end = start + length
+    if len(data) < end:
+        raise CorruptRecordError("truncated record body")
+    if zlib.crc32(memoryview(data)[start:end]) != crc:
+        raise CorruptRecordError("record CRC mismatch")
+    if length < RECORD_HEADER.size or data[start] != RECORD_VERSION:
+        raise CorruptRecordError(f"unsupported record version {data[start] if length else None}")
+
+    (_, kind, type_code, severity_code, micros, offset_seconds, id_format, family,
+     id_len, ip_len, payload_len, extras_len) = RECORD_HEADER.unpack_from(data, start)
+    pos = start + RECORD_HEADER.size
+    id_bytes = data[pos:pos + id_len]
+    pos += id_len
+    ip_bytes = data[pos:pos + ip_len]
+    pos += ip_len
+    payload = data[pos:pos + payload_len].decode("utf-8", "surrogatepass")
+    pos += payload_len
+    extras = _load_extras(data[pos:end].decode("utf-8")) if extras_len else {}
+
+    msg_id = _unpack_id(id_bytes) if id_format == _ID_UUID else id_bytes.decode("utf-8")
+    if family == _ADDR_IPV4:
+        source_ip = socket.inet_ntop(socket.AF_INET, ip_bytes)
+    elif family == _ADDR_IPV6:
+        source_ip = socket.inet_ntop(socket.AF_INET6, ip_bytes)
+    else:
+        source_ip = ip_bytes.decode("utf-8")
+
+    if offset_seconds == NAIVE_TIMESTAMP:
+        timestamp = _EPOCH + timedelta(microseconds=micros)
+    else:
+        timestamp = _EPOCH_UTC + timedelta(microseconds=micros)
+        if offset_seconds:
+            tz = _TIMEZONES.get(offset_seconds)
+            if tz is None:
+                tz = _TIMEZONES[offset_seconds] = timezone(timedelta(seconds=offset_seconds))
+            timestamp = timestamp.astimezone(tz)
+
+    try:
+        cls = _KIND_CODES[kind]
+        msg = cls(
+            source_ip=source_ip,
+            message_type=_TYPE_CODES[type_code],
+            severity=_SEVERITY_CODES[severity_code],
+            payload=payload,
+            id=msg_id,
+            timestamp=timestamp,
+            **extras
+        )
+    except (IndexError, TypeError) as e:
+        raise CorruptRecordError(f"invalid record: {e}") from e
+    return msg, end
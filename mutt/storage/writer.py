@@ -0,0 +1,283 @@
+"""
+Single-writer storage subsystem for Mutt.
+
+Components submit write intents to a bounded queue instead of executing and
+committing on the shared connection themselves. One writer task owns the
+write side of the connection and applies queued intents in grouped
+transactions, bounded by a size and a time budget.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from mutt.models.message import Message
+from mutt.storage.database import Database, INSERT_MESSAGE_SQL
+
+logger = logging.getLogger(__name__)
+
+# (sql, parameters, many) - "many" selects executemany over a parameter list
+Statement = Tuple[str, Any, bool]
+
+
+@dataclass
+class WriteIntent:
+    """
+    A unit of work for the storage writer.
+
+    All statements of an intent are applied in the same transaction.
+
+    Attributes:
+        statements: Statements to execute, in order
+        future: Resolved once the intent is committed, if the caller asked for it
+    """
+    statements: List[Statement]
+    future: Optional[asyncio.Future] = None
+
+
+class StorageWriter:
+    """Owns all writes to the database and groups them into transactions."""
+
+    def __init__(
+        self,
+        database: Database,
+        max_queue_size: int = 10000,
+        max_batch_intents: int = 500,
+        max_batch_delay: float = 0.05
+    ):
+        """
+        Initialize the storage writer.
+
+        Args:
+            database: Initialized database whose connection the writer owns
+            max_queue_size: Maximum number of pending intents before submit() waits
+            max_batch_intents: Maximum number of intents grouped into one transaction
+            max_batch_delay: Seconds to wait for more intents after the first of a group
+        """
+        self.database = database
+        self.max_batch_intents = max(1, max_batch_intents)
+        self.max_batch_delay = max(0.0, max_batch_delay)
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+
+        self.stats: Dict[str, Any] = {
+            "intents": 0,
+            "statements": 0,
+            "rows": 0,
+            "transactions": 0,
+            "failed_intents": 0,
+            "total_commit_ms": 0.0,
+            "last_group_intents": 0,
+            "last_group_rows": 0,
+            "last_group_ms": 0.0,
+        }
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the writer task is running."""
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Start the writer task."""
+        if self.is_running:
+            return
+        self._task = asyncio.create_task(self._run(), name="storage_writer")
+        logger.info(
+            f"[StorageWriter] Started (batch={self.max_batch_intents} intents, "
+            f"delay={self.max_batch_delay * 1000:.0f} ms)"
+        )
+
+    async def stop(self) -> None:
+        """Apply all pending intents, then stop the writer task."""
+        if not self.is_running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        logger.info("[StorageWriter] Stopped")
+
+    async def submit(
+        self,
+        sql: str,
+        parameters: Any = (),
+        many: bool = False,
+        confirm: bool = False
+    ) -> Optional[asyncio.Future]:
+        """
+        Submit a single statement for writing.
+
+        Waits only if the intent queue is full.
+
+        Args:
+            sql: SQL statement
+            parameters: Statement parameters, or a list of them when many is True
+            many: Use executemany with a parameter list
+            confirm: Return a future that resolves once the statement is committed
+
+        Returns:
+            Commit future if confirm is True, None otherwise
+
+        Raises:
+            RuntimeError: If the writer task is not running
+        """
+        return await self.submit_transaction([(sql, parameters, many)], confirm=confirm)
+
+    async def submit_transaction(
+        self,
+        statements: Sequence[Statement],
+        confirm: bool = False
+    ) -> Optional[asyncio.Future]:
+        """
+        Submit several statements that must be committed together.
+
+        Args:
+            statements: (sql, parameters, many) tuples, applied in order
+            confirm: Return a future that resolves once the statements are committed
+
+        Returns:
+            Commit future if confirm is True, None otherwise
+
+        Raises:
+            RuntimeError: If the writer task is not running, since nothing
+                would ever apply the statements
+        """
+        if not self.is_running:
+            raise RuntimeError("StorageWriter is not running")
+        future = asyncio.get_running_loop().create_future() if confirm else None
+        await self._queue.put(WriteIntent(statements=list(statements), future=future))
+        return future
+
+    async def store_messages(self, messages: List[Message]) -> int:
+        """
+        Store a batch of messages and wait for the commit.
+
+        Args:
+            messages: Messages to store
+
+        Returns:
+            Number of rows inserted
+
+        Raises:
+            RuntimeError: If the writer task is not running
+        """
+        if not messages:
+            return 0
+        rows = [Database.message_row(msg) for msg in messages]
+        future = await self.submit(INSERT_MESSAGE_SQL, rows, many=True, confirm=True)
+        await future
+        return len(rows)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return writer statistics.
+
+        Returns:
+            Dictionary of counters, including queue depth and write
+            amplification (transactions per intent).
+        """
+        stats = dict(self.stats)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["write_amplification"] = (
+            stats["transactions"] / stats["intents"] if stats["intents"] else 0.0
+        )
+        return stats
+
+    async def _run(self) -> None:
+        """Writer loop: collect a group of intents and apply it."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            intent = await self._queue.get()
+            if intent is None:
+                break
+
+            group = [intent]
+            deadline = loop.time() + self.max_batch_delay
+            while len(group) < self.max_batch_intents:
+                try:
+                    intent = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        intent = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if intent is None:
+                    stopping = True
+                    break
+                group.append(intent)
+
+            await self._apply_group(group)
+
+    async def _apply_group(self, group: List[WriteIntent]) -> None:
+        """
+        Apply a group of intents in one transaction.
+
+        If the transaction fails, each intent is retried in its own
+        transaction so one bad intent does not discard the others.
+        """
+        start = time.perf_counter()
+        try:
+            rows = await self._execute(group)
+        except Exception as e:
+            await self._rollback()
+            if len(group) == 1:
+                self._fail(group[0], e)
+                return
+            logger.warning(f"[StorageWriter] Group of {len(group)} intents failed ({e}), retrying individually")
+            for intent in group:
+                await self._apply_group([intent])
+            return
+
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        self.stats["intents"] += len(group)
+        self.stats["transactions"] += 1
+        self.stats["statements"] += sum(len(intent.statements) for intent in group)
+        self.stats["rows"] += rows
+        self.stats["total_commit_ms"] += elapsed_ms
+        self.stats["last_group_intents"] = len(group)
+        self.stats["last_group_rows"] = rows
+        self.stats["last_group_ms"] = elapsed_ms
+
+        for intent in group:
+            if intent.future and not intent.future.done():
+                intent.future.set_result(None)
+
+    async def _execute(self, group: List[WriteIntent]) -> int:
+        """Execute and commit all statements of a group; return rows written."""
+        connection = self.database.connection
+        if not connection:
+            raise RuntimeError("Database not initialized. Call initialize() first.")
+
+        rows = 0
+        for intent in group:
+            for sql, parameters, many in intent.statements:
+                if many:
+                    await connection.executemany(sql, parameters)
+                    rows += len(parameters)
+                else:
+                    await connection.execute(sql, parameters)
+                    rows += 1
+        await connection.commit()
+        return rows
+
+    async def _rollback(self) -> None:
+        """Roll back the current transaction, ignoring secondary errors."""
+        try:
+            await self.database.connection.rollback()
+        except Exception as e:
+            logger.error(f"[StorageWriter] Rollback failed: {e}")
+
+    def _fail(self, intent: WriteIntent, error: Exception) -> None:
+        """Report a failed intent to its caller, or log it."""
+        self.stats["intents"] += 1
+        self.stats["failed_intents"] += 1
+        if intent.future and not intent.future.done():
+            intent.future.set_exception(error)
+        else:
+            logger.error(f"[StorageWriter] Write failed: {error}")
@@ -3,8 +3,10 @@ import asyncio
 import tempfile
 import os
 import aiosqlite
+from unittest.mock import patch
 from mutt.storage.database import Database
 from mutt.storage.auth_failure_tracker import AuthFailureTracker
+from mutt.storage.writer import StorageWriter
 
 
 class TestAuthFailureTracker(unittest.IsolatedAsyncioTestCase):
@@ -214,6 +216,71 @@ class TestAuthFailureTracker(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(failures[0]['num_failures'], 1)
         self.assertEqual(failures[0]['hostname'], 'host2')
 
+    async def test_note_failure_is_written_by_flush(self):
+        """Test that failures counted in memory are written in one transaction."""
+        writer = StorageWriter(self.database)
+        await writer.start()
+        self.addAsyncCleanup(writer.stop)
+        tracker = AuthFailureTracker(self.database, writer=writer)
+
+        for _ in range(100):
+            tracker.note_failure('user1', '10.0.0.1')
+        tracker.note_failure('user2', '10.0.0.2')
+        tracker.note_failure('user1', '10.0.0.3')
+        self.assertEqual(await tracker.get_all_failures(), [])
+
+        self.assertEqual(await tracker.flush(), 102)
+        self.assertEqual(writer.stats["transactions"], 1)
+        failures = {f['username']: f for f in await tracker.get_all_failures()}
+        self.assertEqual(failures['user1']['num_failures'], 101)
+        self.assertEqual(failures['user1']['hostname'], '10.0.0.3')
+        self.assertEqual(failures['user2']['num_failures'], 1)
+
+        # Nothing new to write
+        self.assertEqual(await tracker.flush(), 0)
+        self.assertEqual(writer.stats["transactions"], 1)
+
+    async def test_failure_rate_window(self):
+        """Test the per (username, source) sliding-window rate."""
+        tracker = AuthFailureTracker(self.database, rate_window=10)
+        with patch('mutt.storage.auth_failure_tracker.time.time', return_value=1000.5):
+            for _ in range(50):
+                tracker.note_failure('user1', '10.0.0.1')
+            self.assertEqual(tracker.get_rate('user1', '10.0.0.1'), 5.0)
+            self.assertEqual(tracker.get_rate('user1', '10.0.0.2'), 0.0)
+        with patch('mutt.storage.auth_failure_tracker.time.time', return_value=1009.5):
+            tracker.note_failure('user1', '10.0.0.1')
+            self.assertEqual(tracker.get_rate('user1', '10.0.0.1'), 5.1)
+        with patch('mutt.storage.auth_failure_tracker.time.time', return_value=1010.5):
+            self.assertEqual(tracker.get_rate('user1', '10.0.0.1'), 0.1)
+            stats = tracker.get_stats()
+        self.assertEqual(stats[0]['total'], 51)
+        self.assertEqual(stats[0]['pending'], 51)
+
+    async def test_failed_flush_keeps_counts(self):
+        """Test that failures are kept in memory when a flush fails."""
+        tracker = AuthFailureTracker(self.database)
+        tracker.note_failure('user1', '10.0.0.1')
+        tracker.note_failure('user1', '10.0.0.1')
+
+        with patch.object(tracker, '_write', side_effect=aiosqlite.OperationalError('locked')):
+            self.assertEqual(await tracker.flush(), 0)
+        self.assertEqual(await tracker.flush(), 2)
+        failures = await tracker.get_all_failures()
+        self.assertEqual(failures[0]['num_failures'], 2)
+
+    async def test_idle_pairs_are_forgotten(self):
+        """Test that flushed pairs without recent failures are dropped from memory."""
+        tracker = AuthFailureTracker(self.database, rate_window=10)
+        with patch('mutt.storage.auth_failure_tracker.time.time', return_value=1000.0):
+            tracker.note_failure('user1', '10.0.0.1')
+            await tracker.flush()
+            await tracker.flush()
+        self.assertEqual(len(tracker.get_stats()), 1)
+        with patch('mutt.storage.auth_failure_tracker.time.time', return_value=1011.0):
+            await tracker.flush()
+        self.assertEqual(tracker.get_stats(), [])
+
 
 if __name__ == '__main__':
     unittest.main()
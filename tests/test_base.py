@@ -20,6 +20,39 @@ class TestBaseListener(unittest.TestCase):
         listener = ConcreteListener(queue)
         self.assertEqual(listener.queue, queue)
         self.assertFalse(listener.is_running)
+        
+        self.assertFalse(listener.backpressure)
+        listener.on_backpressure(True, 800)
+        self.assertTrue(listener.backpressure)
+        listener.on_backpressure(False, 500)
+        self.assertFalse(listener.backpressure)
+
+    def test_ingest_stats_loss_rate(self):
+        class DroppingListener(BaseListener):
+            drops = 0
+            async def start(self):
+                pass
+            async def stop(self):
+                pass
+            def process_data(self, data, addr):
+                self.ingest_stats["received"] += 1
+            def kernel_drops(self):
+                return self.drops
+        
+        listener = DroppingListener(asyncio.Queue())
+        for _ in range(75):
+            listener.process_data(b"", ("127.0.0.1", 514))
+        listener.drops = 25
+        stats = listener.get_ingest_stats()
+        self.assertEqual(stats["kernel_dropped"], 25)
+        self.assertAlmostEqual(stats["loss_rate"], 0.25)
+        
+        # New drops are logged as a warning, unchanged counts as info
+        with self.assertLogs("mutt.listeners.base", level="INFO") as logs:
+            listener.log_ingest_stats()
+            listener.log_ingest_stats()
+        self.assertEqual([r.levelname for r in logs.records], ["WARNING", "INFO"])
+        self.assertIn("kernel_dropped=25 loss=25.00%", logs.output[0])
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,316 @@
+import unittest
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from unittest.mock import patch
+from mutt.models.message import Message, MessageType, Severity, SNMPTrap, SyslogMessage
+from mutt.storage.buffer import FileBuffer
+from mutt.storage.database import Database
+from mutt.storage.serialization import (
+    CorruptRecordError, decode_message, decode_record, encode_message, encode_record
+)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Replays the WAL into a database and is killed right after its third commit
+REPLAY_AND_DIE = """
+import asyncio, os, signal, sys
+from mutt.storage.buffer import FileBuffer
+from mutt.storage.database import Database
+
+async def main(buffer_dir, db_path):
+    database = Database(db_path)
+    await database.initialize()
+    commits = 0
+
+    async def store(messages):
+        nonlocal commits
+        await database.store_messages(messages)
+        commits += 1
+        if commits == 3:
+            os.kill(os.getpid(), signal.SIGKILL)
+
+    await FileBuffer(buffer_dir).replay(store, chunk_size=3)
+
+asyncio.run(main(sys.argv[1], sys.argv[2]))
+"""
+
+
+def make_syslog(payload):
+    return SyslogMessage(
+        source_ip="10.0.0.1",
+        message_type=MessageType.SYSLOG,
+        severity=Severity.WARNING,
+        payload=payload,
+        hostname="sw1",
+        process_name="sshd",
+        process_id=42,
+        facility=4,
+        msg_id="ID7",
+        structured_data={"origin": {"ip": "10.0.0.1"}},
+        metadata={"hostname": "sw1.example.net"}
+    )
+
+
+class TestSerialization(unittest.TestCase):
+    """Test WAL record encoding."""
+
+    def test_round_trip_preserves_subtypes(self):
+        trap = SNMPTrap(
+            source_ip="10.0.0.2",
+            message_type=MessageType.SNMP_TRAP,
+            severity=Severity.CRITICAL,
+            payload="linkDown",
+            oid="1.3.6.1.6.3.1.1.5.3",
+            varbinds={"1.3.6.1.2.1.2.2.1.1": "3"},
+            version="v2c"
+        )
+        plain = Message(
+            source_ip="FE80::1", message_type=MessageType.UNKNOWN, severity=Severity.DEBUG,
+            payload="caf\u00e9", id="not-a-uuid", timestamp=datetime(2024, 1, 2, 3, 4, 5)
+        )
+        for msg in (make_syslog("hello"), trap, plain):
+            for decoded in (decode_message(encode_message(msg)), decode_record(encode_record(msg))[0]):
+                self.assertIs(type(decoded), type(msg))
+                self.assertEqual(decoded, msg)
+
+    def test_binary_records_are_compact(self):
+        msg = SyslogMessage(
+            source_ip="10.0.0.1", message_type=MessageType.SYSLOG, severity=Severity.INFO,
+            payload="link down", facility=4
+        )
+        self.assertLess(len(encode_record(msg)), len(encode_message(msg)) // 2)
+
+    def test_decode_record_detects_corruption(self):
+        first, second = encode_record(make_syslog("a")), encode_record(make_syslog("b"))
+        msg, end = decode_record(first + second)
+        self.assertEqual(msg.payload, "a")
+        self.assertEqual(decode_record(first + second, end)[0].payload, "b")
+
+        flipped = bytearray(first)
+        flipped[-1] ^= 0xFF
+        for damaged in (first[:5], first[:-1], bytes(flipped)):
+            with self.assertRaises(CorruptRecordError):
+                decode_record(damaged)
+
+    def test_decodes_legacy_records(self):
+        line = json.dumps({
+            "id": "abc", "timestamp": datetime(2024, 1, 2, 3, 4, 5).isoformat(),
+            "source_ip": "10.0.0.3", "message_type": "SYSLOG", "severity": "INFO",
+            "payload": "old", "metadata": {}
+        })
+        decoded = decode_message(line)
+        self.assertIs(type(decoded), Message)
+        self.assertEqual(decoded.id, "abc")
+        self.assertEqual(decoded.severity, Severity.INFO)
+
+
+class TestFileBuffer(unittest.IsolatedAsyncioTestCase):
+    """Test the in-memory buffer and its write-ahead log."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def segments(self):
+        return sorted(name for name in os.listdir(self.dir) if name.startswith("wal-"))
+
+    async def test_flush_returns_the_written_objects(self):
+        buffer = FileBuffer(self.dir, flush_threshold=2)
+        msgs = [make_syslog(str(n)) for n in range(3)]
+        await buffer.write_batch(msgs)
+        flushed = await buffer.flush()
+        self.assertEqual(len(flushed), 3)
+        self.assertTrue(all(a is b for a, b in zip(flushed, msgs)))
+        self.assertEqual(await buffer.flush(), [])
+
+    async def test_unencodable_batch_buffers_nothing(self):
+        buffer = FileBuffer(self.dir, flush_threshold=10)
+        msgs = [make_syslog(str(n)) for n in range(3)]
+        msgs[1].metadata["bad"] = object()
+        with self.assertRaises(TypeError):
+            await buffer.write_batch(msgs)
+        self.assertEqual(buffer.get_stats()["pending"], 0)
+        self.assertEqual(buffer._wal_records, [])
+
+    async def test_checkpoint_deletes_only_flushed_segments(self):
+        buffer = FileBuffer(self.dir, flush_threshold=1)
+        await buffer.write(make_syslog("a"))
+        await buffer.flush()
+        await buffer.write(make_syslog("b"))
+        self.assertEqual(self.segments(), ["wal-00000001.log", "wal-00000002.log"])
+
+        self.assertEqual(await buffer.checkpoint(), 1)
+        self.assertEqual(self.segments(), ["wal-00000002.log"])
+
+    async def test_rotated_segment_survives_checkpoint_until_flushed(self):
+        buffer = FileBuffer(self.dir, flush_threshold=1, segment_max_bytes=1)
+        await buffer.write(make_syslog("a"))
+        await buffer.checkpoint()
+        self.assertEqual(self.segments(), ["wal-00000001.log"])
+        await buffer.flush()
+        await buffer.checkpoint()
+        self.assertEqual(self.segments(), [])
+
+    async def replay(self, buffer, chunk_size=1000):
+        chunks = []
+
+        async def store(messages):
+            chunks.append(messages)
+
+        await buffer.replay(store, chunk_size=chunk_size)
+        return chunks
+
+    async def test_replay_stores_uncheckpointed_messages(self):
+        buffer = FileBuffer(self.dir, flush_threshold=1)
+        await buffer.write_batch([make_syslog("lost 1"), make_syslog("lost 2")])
+        await buffer.flush()
+        await buffer.write(make_syslog("lost 3"))
+        # Crash before commit: neither checkpoint nor anything else runs
+
+        restarted = FileBuffer(self.dir)
+        chunks = await self.replay(restarted, chunk_size=2)
+        self.assertEqual([[m.payload for m in chunk] for chunk in chunks],
+                         [["lost 1", "lost 2"], ["lost 3"]])
+        self.assertIsInstance(chunks[0][0], SyslogMessage)
+        self.assertEqual(chunks[0][0].structured_data, {"origin": {"ip": "10.0.0.1"}})
+        self.assertEqual(os.listdir(self.dir), [])
+        self.assertEqual(await self.replay(FileBuffer(self.dir)), [])
+
+    async def test_replay_resumes_from_committed_offset(self):
+        buffer = FileBuffer(self.dir, flush_threshold=1)
+        await buffer.write_batch([make_syslog(str(n)) for n in range(5)])
+
+        async def failing_store(messages):
+            if messages[0].payload == "2":
+                raise RuntimeError("database unavailable")
+
+        with self.assertRaises(RuntimeError):
+            await FileBuffer(self.dir).replay(failing_store, chunk_size=2)
+        self.assertIn("replay.offset", os.listdir(self.dir))
+
+        chunks = await self.replay(FileBuffer(self.dir), chunk_size=2)
+        self.assertEqual([m.payload for chunk in chunks for m in chunk], ["2", "3", "4"])
+
+    async def test_replay_skips_torn_record(self):
+        buffer = FileBuffer(self.dir, flush_threshold=1)
+        await buffer.write(make_syslog("whole"))
+        with open(os.path.join(self.dir, self.segments()[0]), "ab") as f:
+            f.write(encode_record(make_syslog("torn"))[:-3])
+
+        chunks = await self.replay(FileBuffer(self.dir))
+        self.assertEqual([m.payload for m in chunks[0]], ["whole"])
+
+    async def test_records_after_failed_append_are_replayed(self):
+        buffer = FileBuffer(self.dir, flush_threshold=1)
+        await buffer.write(make_syslog("before"))
+
+        real_open = open
+
+        class TornFile:
+            def __init__(self, f):
+                self.f = f
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                self.f.close()
+
+            def write(self, data):
+                self.f.write(data[:len(data) // 2])
+                raise OSError(28, "No space left on device")
+
+        with patch("mutt.storage.buffer.open", lambda *a, **kw: TornFile(real_open(*a, **kw)), create=True):
+            await buffer.write(make_syslog("torn"))
+        await buffer.write(make_syslog("after"))
+        self.assertEqual(len(self.segments()), 2)
+        # Crash before flush
+
+        chunks = await self.replay(FileBuffer(self.dir))
+        self.assertEqual([m.payload for chunk in chunks for m in chunk], ["before", "after"])
+
+    async def test_replay_legacy_buffer_file(self):
+        with open(os.path.join(self.dir, "buffer_active.jsonl"), "w") as f:
+            f.write(json.dumps({
+                "id": "abc", "timestamp": datetime(2024, 1, 2).isoformat(),
+                "source_ip": "10.0.0.3", "message_type": "SYSLOG", "severity": "INFO",
+                "payload": "old", "metadata": {}
+            }) + "\n")
+        chunks = await self.replay(FileBuffer(self.dir))
+        self.assertEqual([m.id for m in chunks[0]], ["abc"])
+        self.assertEqual(os.listdir(self.dir), [])
+
+    async def test_new_segments_continue_the_sequence(self):
+        buffer = FileBuffer(self.dir, flush_threshold=1)
+        await buffer.write(make_syslog("a"))
+
+        restarted = FileBuffer(self.dir, flush_threshold=1)
+        await restarted.write(make_syslog("b"))
+        self.assertEqual(self.segments(), ["wal-00000001.log", "wal-00000002.log"])
+
+    async def test_requeue_returns_messages_to_next_flush(self):
+        buffer = FileBuffer(self.dir)
+        await buffer.write(make_syslog("a"))
+        flushed = await buffer.flush()
+        await buffer.write(make_syslog("b"))
+        buffer.requeue(flushed)
+        self.assertEqual([m.payload for m in await buffer.flush()], ["a", "b"])
+
+    async def test_replayed_messages_are_stored_once(self):
+        database = Database(os.path.join(self.dir, "test.db"))
+        await database.initialize()
+        self.addAsyncCleanup(database.connection.close)
+
+        buffer = FileBuffer(os.path.join(self.dir, "buffer"), flush_threshold=1)
+        await buffer.write_batch([make_syslog("a"), make_syslog("b")])
+        await database.store_messages(await buffer.flush())
+        # Crash after commit, before checkpoint
+
+        await FileBuffer(os.path.join(self.dir, "buffer")).replay(database.store_messages)
+        async with database.connection.execute("SELECT COUNT(*) FROM messages") as cursor:
+            self.assertEqual((await cursor.fetchone())[0], 2)
+
+
+    @unittest.skipUnless(hasattr(signal, "SIGKILL"), "needs SIGKILL")
+    async def test_replay_resumes_after_kill(self):
+        buffer_dir = os.path.join(self.dir, "buffer")
+        db_path = os.path.join(self.dir, "test.db")
+        buffer = FileBuffer(buffer_dir, flush_threshold=1)
+        await buffer.write_batch([make_syslog(str(n)) for n in range(10)])
+
+        result = subprocess.run(
+            [sys.executable, "-c", REPLAY_AND_DIE, buffer_dir, db_path],
+            env={**os.environ, "PYTHONPATH": REPO_ROOT}, capture_output=True
+        )
+        self.assertEqual(result.returncode, -signal.SIGKILL, result.stderr)
+
+        database = Database(db_path)
+        await database.initialize()
+        self.addAsyncCleanup(database.connection.close)
+
+        async def count():
+            async with database.connection.execute("SELECT COUNT(*) FROM messages") as cursor:
+                return (await cursor.fetchone())[0]
+
+        # Three chunks committed, the offset only records the first two
+        self.assertEqual(await count(), 9)
+        stored = []
+
+        async def store(messages):
+            stored.extend(m.payload for m in messages)
+            await database.store_messages(messages)
+
+        await FileBuffer(buffer_dir).replay(store, chunk_size=3)
+        self.assertEqual(stored, ["6", "7", "8", "9"])
+        self.assertEqual(await count(), 10)
+        self.assertEqual(os.listdir(buffer_dir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
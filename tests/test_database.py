@@ -0,0 +1,175 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+from mutt.storage.database import Database, resolve_pragmas
+from mutt.models.message import Message, SyslogMessage, SNMPTrap, MessageType, Severity
+
+
+class TestDatabase(unittest.IsolatedAsyncioTestCase):
+    """Test Database storage operations."""
+
+    async def asyncSetUp(self):
+        """Set up a temporary database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'test.db')
+        self.database = Database(self.db_path)
+        await self.database.initialize()
+
+    async def asyncTearDown(self):
+        """Close the database and remove the temporary directory."""
+        if self.database.connection:
+            await self.database.connection.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _make_messages(self, count):
+        return [
+            Message(
+                source_ip="10.0.0.1",
+                message_type=MessageType.SYSLOG,
+                severity=Severity.INFO,
+                payload=f"message {i}"
+            )
+            for i in range(count)
+        ]
+
+    async def _count_rows(self):
+        cursor = await self.database.execute("SELECT COUNT(*) FROM messages")
+        row = await cursor.fetchone()
+        return row[0]
+
+    async def test_store_message_single(self):
+        """Test storing a single message."""
+        await self.database.store_message(self._make_messages(1)[0])
+        self.assertEqual(await self._count_rows(), 1)
+
+    async def test_store_messages_batch(self):
+        """Test storing a batch of messages in one call."""
+        stored = await self.database.store_messages(self._make_messages(250))
+
+        self.assertEqual(stored, 250)
+        self.assertEqual(await self._count_rows(), 250)
+        self.assertEqual(self.database.write_stats["batches"], 1)
+        self.assertEqual(self.database.write_stats["rows"], 250)
+        self.assertEqual(self.database.write_stats["last_batch_rows"], 250)
+        self.assertGreaterEqual(self.database.write_stats["last_batch_ms"], 0.0)
+
+    async def test_store_messages_empty(self):
+        """Test that an empty batch is a no-op."""
+        stored = await self.database.store_messages([])
+
+        self.assertEqual(stored, 0)
+        self.assertEqual(self.database.write_stats["batches"], 0)
+
+    async def test_store_messages_subtype_metadata(self):
+        """Test that subtype fields are folded into metadata."""
+        syslog = SyslogMessage(
+            source_ip="10.0.0.2",
+            message_type=MessageType.SYSLOG,
+            severity=Severity.ERROR,
+            payload="link down",
+            facility=4,
+            priority=35,
+            hostname="router1",
+            process_name="ifmgr"
+        )
+        trap = SNMPTrap(
+            source_ip="10.0.0.3",
+            message_type=MessageType.SNMP_TRAP,
+            severity=Severity.INFO,
+            payload="trap",
+            oid="1.3.6.1.6.3.1.1.5.3",
+            varbinds={"1.3.6.1.2.1.2.2.1.1.1": "1"}
+        )
+
+        await self.database.store_messages([syslog, trap])
+
+        cursor = await self.database.execute(
+            "SELECT source_ip, metadata FROM messages ORDER BY source_ip"
+        )
+        rows = await cursor.fetchall()
+        self.assertEqual(json.loads(rows[0][1])["hostname"], "router1")
+        self.assertEqual(json.loads(rows[1][1])["oid"], "1.3.6.1.6.3.1.1.5.3")
+
+    async def test_store_messages_is_atomic(self):
+        """Test that a failing row rolls back the whole batch."""
+        messages = self._make_messages(3)
+        await self.database.store_messages(messages[:1])
+
+        # The driver cannot bind an arbitrary object, so the last row fails
+        messages[2].payload = object()
+        with self.assertRaises(Exception):
+            await self.database.store_messages(messages)
+
+        self.assertEqual(await self._count_rows(), 1)
+        self.assertEqual(self.database.write_stats["batches"], 1)
+
+    async def test_store_messages_ignores_stored_ids(self):
+        """Test that replaying a stored message does not duplicate it."""
+        messages = self._make_messages(3)
+        await self.database.store_messages(messages[:2])
+        await self.database.store_messages(messages)
+        self.assertEqual(await self._count_rows(), 3)
+
+
+class TestDatabaseProfiles(unittest.IsolatedAsyncioTestCase):
+    """Test storage performance profiles."""
+
+    async def asyncSetUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'test.db')
+
+    async def asyncTearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_resolve_profile_with_overrides(self):
+        """Test that overrides take precedence over the preset."""
+        pragmas = resolve_pragmas("throughput", {"synchronous": "full"})
+        self.assertEqual(pragmas["journal_mode"], "WAL")
+        self.assertEqual(pragmas["synchronous"], "FULL")
+        self.assertEqual(list(pragmas)[0], "journal_mode")
+
+    def test_resolve_no_profile(self):
+        """Test that no profile means SQLite defaults."""
+        self.assertEqual(resolve_pragmas(None, None), {})
+
+    def test_resolve_yaml_off(self):
+        """Test that YAML's boolean off is accepted."""
+        self.assertEqual(resolve_pragmas(None, {"synchronous": False}), {"synchronous": "OFF"})
+
+    def test_resolve_rejects_invalid(self):
+        """Test rejection of unknown profiles, pragmas and values."""
+        with self.assertRaises(ValueError):
+            resolve_pragmas("fastest")
+        with self.assertRaises(ValueError):
+            resolve_pragmas(None, {"page_size": 4096})
+        with self.assertRaises(ValueError):
+            resolve_pragmas(None, {"journal_mode": "wal; DROP TABLE messages"})
+        with self.assertRaises(ValueError):
+            resolve_pragmas(None, {"mmap_size": "lots"})
+
+    async def test_throughput_profile_applied(self):
+        """Test that the throughput preset is applied at connect time."""
+        database = Database(self.db_path, profile="throughput")
+        await database.initialize()
+        try:
+            self.assertEqual(database.effective_pragmas["journal_mode"], "wal")
+            self.assertEqual(database.effective_pragmas["synchronous"], 1)
+            self.assertEqual(database.effective_pragmas["temp_store"], 2)
+        finally:
+            await database.connection.close()
+
+    async def test_durable_profile_applied(self):
+        """Test that the durable preset uses full sync."""
+        database = Database(self.db_path, profile="durable")
+        await database.initialize()
+        try:
+            self.assertEqual(database.effective_pragmas["journal_mode"], "wal")
+            self.assertEqual(database.effective_pragmas["synchronous"], 2)
+        finally:
+            await database.connection.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import os
+import shutil
+import tempfile
+from mutt.storage.database import Database
+from mutt.storage.device_registry import DeviceRegistry
+
+
+class TestDeviceRegistry(unittest.IsolatedAsyncioTestCase):
+    """Test DeviceRegistry caching and write-behind behaviour."""
+
+    async def asyncSetUp(self):
+        """Set up a temporary database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.database = Database(os.path.join(self.temp_dir, 'test.db'))
+        await self.database.initialize()
+
+    async def asyncTearDown(self):
+        """Close the database and clean up."""
+        if self.database.connection:
+            await self.database.connection.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    async def _devices(self):
+        cursor = await self.database.execute(
+            "SELECT ip, hostname, snmp_version, last_seen FROM devices ORDER BY ip"
+        )
+        return await cursor.fetchall()
+
+    async def test_write_through_default(self):
+        """Test that updates are written immediately by default."""
+        registry = DeviceRegistry(self.database)
+        await registry.update_device("10.0.0.1", hostname="router1")
+
+        rows = await self._devices()
+        self.assertEqual(rows[0][:2], ("10.0.0.1", "router1"))
+        self.assertEqual(registry.dirty_count, 0)
+
+    async def test_write_behind_defers_until_flush(self):
+        """Test that write-behind keeps updates in memory until flush()."""
+        registry = DeviceRegistry(self.database, write_behind=True, last_seen_granularity=60)
+        for _ in range(1000):
+            await registry.update_device("10.0.0.1", hostname="router1")
+        await registry.update_device("10.0.0.2")
+
+        self.assertEqual(await self._devices(), [])
+        self.assertEqual(registry.dirty_count, 2)
+
+        flushed = await registry.flush()
+
+        self.assertEqual(flushed, 2)
+        rows = await self._devices()
+        self.assertEqual([r[0] for r in rows], ["10.0.0.1", "10.0.0.2"])
+        self.assertEqual(registry.dirty_count, 0)
+        self.assertEqual(await registry.flush(), 0)
+
+    async def test_last_seen_granularity(self):
+        """Test that unchanged devices are not rewritten within the granularity."""
+        registry = DeviceRegistry(self.database, last_seen_granularity=60)
+        await registry.update_device("10.0.0.1", hostname="router1")
+        changes = self.database.connection.total_changes
+
+        await registry.update_device("10.0.0.1", hostname="router1")
+        self.assertEqual(self.database.connection.total_changes, changes)
+
+        # A changed hostname is written regardless of granularity
+        await registry.update_device("10.0.0.1", hostname="router1-new")
+        rows = await self._devices()
+        self.assertEqual(rows[0][1], "router1-new")
+
+    async def test_cache_tracks_latest_values(self):
+        """Test that the in-memory record is always current."""
+        registry = DeviceRegistry(self.database, write_behind=True)
+        await registry.update_device("10.0.0.1", hostname="router1")
+        await registry.update_device("10.0.0.1", snmp_version="v3")
+
+        record = registry.get_device("10.0.0.1")
+        self.assertEqual(record.hostname, "router1")
+        self.assertEqual(record.snmp_version, "v3")
+        self.assertIsNone(registry.get_device("10.0.0.2"))
+
+    async def test_missing_fields_do_not_clobber(self):
+        """Test that a flush without hostname keeps the stored hostname."""
+        await DeviceRegistry(self.database).update_device("10.0.0.1", hostname="router1")
+
+        registry = DeviceRegistry(self.database, write_behind=True)
+        await registry.update_device("10.0.0.1")
+        await registry.flush()
+
+        rows = await self._devices()
+        self.assertEqual(rows[0][1], "router1")
+
+    async def test_failed_flush_keeps_devices_dirty(self):
+        """Test that devices stay dirty when the flush fails."""
+        registry = DeviceRegistry(self.database, write_behind=True)
+        await registry.update_device("10.0.0.1")
+        await self.database.connection.close()
+        self.database.connection = None
+
+        self.assertEqual(await registry.flush(), 0)
+        self.assertEqual(registry.dirty_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import asyncio
+from unittest.mock import MagicMock, AsyncMock
+from mutt.processors.dns_cache import DNSCache
+from mutt.processors.enricher import Enricher
+from mutt.models.message import Message, MessageType, Severity
+
+
+class FakeResolver:
+    """Resolver that records calls and answers from a fixed table."""
+
+    def __init__(self, answers, delay=0.0):
+        self.answers = answers
+        self.delay = delay
+        self.calls = []
+
+    async def __call__(self, ip_address):
+        self.calls.append(ip_address)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        answer = self.answers.get(ip_address)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+class TestDNSCache(unittest.IsolatedAsyncioTestCase):
+    """Test DNSCache caching, TTLs and coalescing."""
+
+    async def test_hit_after_miss(self):
+        """Test that a second lookup is served from the cache."""
+        resolver = FakeResolver({"10.0.0.1": "router1"})
+        cache = DNSCache(resolver)
+
+        self.assertEqual(await cache.lookup("10.0.0.1"), "router1")
+        self.assertEqual(await cache.lookup("10.0.0.1"), "router1")
+
+        self.assertEqual(resolver.calls, ["10.0.0.1"])
+        stats = cache.get_stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["hit_ratio"], 0.5)
+
+    async def test_negative_result_cached(self):
+        """Test that missing PTR records and errors are cached as negatives."""
+        resolver = FakeResolver({"10.0.0.2": OSError("timeout")})
+        cache = DNSCache(resolver)
+
+        self.assertIsNone(await cache.lookup("10.0.0.2"))
+        self.assertIsNone(await cache.lookup("10.0.0.2"))
+
+        self.assertEqual(len(resolver.calls), 1)
+        self.assertEqual(cache.get_stats()["negative_hits"], 1)
+        self.assertEqual(cache.get_stats()["failed_lookups"], 1)
+
+    async def test_concurrent_lookups_coalesced(self):
+        """Test that concurrent misses for one IP produce one resolver call."""
+        resolver = FakeResolver({"10.0.0.3": "switch3"}, delay=0.05)
+        cache = DNSCache(resolver)
+
+        results = await asyncio.gather(*(cache.lookup("10.0.0.3") for _ in range(500)))
+
+        self.assertEqual(set(results), {"switch3"})
+        self.assertEqual(len(resolver.calls), 1)
+        self.assertEqual(cache.get_stats()["coalesced"], 499)
+
+    async def test_stale_entry_served_and_refreshed(self):
+        """Test that an expired entry is returned while it refreshes."""
+        resolver = FakeResolver({"10.0.0.4": "old-name"})
+        cache = DNSCache(resolver, ttl=0.0)
+        await cache.lookup("10.0.0.4")
+
+        resolver.answers["10.0.0.4"] = "new-name"
+        self.assertEqual(await cache.lookup("10.0.0.4"), "old-name")
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        self.assertEqual(len(resolver.calls), 2)
+        self.assertEqual(cache._entries["10.0.0.4"].hostname, "new-name")
+        self.assertEqual(cache.get_stats()["stale_hits"], 1)
+
+    async def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted."""
+        resolver = FakeResolver({})
+        cache = DNSCache(resolver, max_size=2)
+
+        await cache.lookup("10.0.0.1")
+        await cache.lookup("10.0.0.2")
+        await cache.lookup("10.0.0.1")
+        await cache.lookup("10.0.0.3")
+
+        self.assertEqual(len(cache), 2)
+        self.assertIn("10.0.0.1", cache._entries)
+        self.assertNotIn("10.0.0.2", cache._entries)
+        self.assertEqual(cache.get_stats()["evictions"], 1)
+
+    async def test_enricher_uses_cache(self):
+        """Test that the enricher resolves each IP once."""
+        reg = MagicMock()
+        reg.update_device = AsyncMock()
+        resolver = FakeResolver({"10.0.0.5": "fw5"})
+        enricher = Enricher(reg, dns_cache=DNSCache(resolver))
+
+        for _ in range(3):
+            msg = Message(
+                source_ip="10.0.0.5",
+                message_type=MessageType.SYSLOG,
+                severity=Severity.INFO,
+                payload="hello"
+            )
+            await enricher.enrich(msg)
+
+        self.assertEqual(msg.metadata["hostname"], "fw5")
+        self.assertEqual(resolver.calls, ["10.0.0.5"])
+        self.assertEqual(enricher.get_dns_stats()["hits"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+import unittest
+import asyncio
+import struct
+from mutt.processors.dns_resolver import (
+    AsyncDNSResolver, DNSError, build_ptr_query, parse_ptr_response,
+    parse_nameserver, reverse_name, create_resolver, ThreadedResolver
+)
+
+
+def encode_name(name):
+    return b"".join(
+        bytes((len(label),)) + label.encode("ascii") for label in name.split(".")
+    ) + b"\x00"
+
+
+class StubDNSServer(asyncio.DatagramProtocol):
+    """Minimal PTR-only DNS server for tests."""
+
+    def __init__(self, records, silent=(), servfail=()):
+        self.records = records
+        self.silent = set(silent)
+        self.servfail = set(servfail)
+        self.queries = []
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        query_id = struct.unpack_from("!H", data)[0]
+        offset = 12
+        labels = []
+        while data[offset]:
+            length = data[offset]
+            labels.append(data[offset + 1:offset + 1 + length].decode())
+            offset += 1 + length
+        question = data[12:offset + 5]
+        name = ".".join(labels)
+        self.queries.append(name)
+
+        if name in self.silent:
+            return
+        if name in self.servfail:
+            flags, answers = 0x8182, b""
+        elif name in self.records:
+            rdata = encode_name(self.records[name])
+            # Answer name is a compression pointer to the question
+            answers = b"\xc0\x0c" + struct.pack("!HHIH", 12, 1, 300, len(rdata)) + rdata
+            flags = 0x8180
+        else:
+            flags, answers = 0x8183, b""
+        header = struct.pack("!HHHHHH", query_id, flags, 1, 1 if answers else 0, 0, 0)
+        self.transport.sendto(header + question + answers, addr)
+
+
+class FakeFallback:
+    def __init__(self):
+        self.calls = []
+
+    async def resolve(self, ip_address):
+        self.calls.append(ip_address)
+        return "fallback-host"
+
+    async def close(self):
+        pass
+
+
+class TestDNSWireFormat(unittest.TestCase):
+    """Test PTR query encoding and response parsing."""
+
+    def test_reverse_name(self):
+        self.assertEqual(reverse_name("10.1.2.3"), "3.2.1.10.in-addr.arpa")
+        self.assertTrue(reverse_name("2001:db8::1").endswith(".ip6.arpa"))
+
+    def test_parse_nameserver(self):
+        self.assertEqual(parse_nameserver("10.0.0.53"), ("10.0.0.53", 53))
+        self.assertEqual(parse_nameserver("127.0.0.1:5353"), ("127.0.0.1", 5353))
+        self.assertEqual(parse_nameserver("[::1]:5353"), ("::1", 5353))
+        self.assertEqual(parse_nameserver("::1"), ("::1", 53))
+
+    def test_query_roundtrip_with_compression(self):
+        name = "1.0.0.10.in-addr.arpa"
+        query = build_ptr_query(0x1234, name)
+        rdata = encode_name("router1.example.net")
+        response = (
+            struct.pack("!HHHHHH", 0x1234, 0x8180, 1, 1, 0, 0)
+            + query[12:]
+            + b"\xc0\x0c" + struct.pack("!HHIH", 12, 1, 60, len(rdata)) + rdata
+        )
+        self.assertEqual(parse_ptr_response(response, 0x1234, name), "router1.example.net")
+
+    def test_parse_rejects_mismatched_id(self):
+        name = "1.0.0.10.in-addr.arpa"
+        response = struct.pack("!HHHHHH", 1, 0x8183, 1, 0, 0, 0) + build_ptr_query(1, name)[12:]
+        with self.assertRaises(DNSError):
+            parse_ptr_response(response, 2, name)
+        self.assertIsNone(parse_ptr_response(response, 1, name))
+
+    def test_create_resolver_backends(self):
+        self.assertIsInstance(create_resolver({"backend": "thread"}), ThreadedResolver)
+        resolver = create_resolver({"nameservers": ["127.0.0.1:5353"]})
+        self.assertIsInstance(resolver, AsyncDNSResolver)
+        self.assertIsInstance(resolver.fallback, ThreadedResolver)
+        with self.assertRaises(ValueError):
+            create_resolver({"backend": "carrier-pigeon"})
+
+
+class TestAsyncDNSResolver(unittest.IsolatedAsyncioTestCase):
+    """Test AsyncDNSResolver against a local stub server."""
+
+    async def asyncSetUp(self):
+        self.server = StubDNSServer(
+            records={"1.0.0.10.in-addr.arpa": "router1.example.net"},
+            silent={"2.0.0.10.in-addr.arpa"},
+            servfail={"3.0.0.10.in-addr.arpa"},
+        )
+        loop = asyncio.get_running_loop()
+        self.server_transport, _ = await loop.create_datagram_endpoint(
+            lambda: self.server, local_addr=("127.0.0.1", 0)
+        )
+        port = self.server_transport.get_extra_info("sockname")[1]
+        self.fallback = FakeFallback()
+        self.resolver = AsyncDNSResolver(
+            nameservers=[f"127.0.0.1:{port}"],
+            timeout=0.2,
+            attempts=1,
+            fallback=self.fallback
+        )
+
+    async def asyncTearDown(self):
+        await self.resolver.close()
+        self.server_transport.close()
+
+    async def test_resolves_ptr(self):
+        self.assertEqual(await self.resolver.resolve("10.0.0.1"), "router1.example.net")
+        self.assertEqual(self.resolver.get_stats()["answers"], 1)
+        self.assertEqual(self.fallback.calls, [])
+
+    async def test_nxdomain_is_final(self):
+        self.assertIsNone(await self.resolver.resolve("10.0.0.99"))
+        self.assertEqual(self.resolver.get_stats()["nxdomain"], 1)
+        self.assertEqual(self.fallback.calls, [])
+
+    async def test_timeout_falls_back(self):
+        self.assertEqual(await self.resolver.resolve("10.0.0.2"), "fallback-host")
+        self.assertEqual(self.resolver.get_stats()["timeouts"], 1)
+        self.assertEqual(self.fallback.calls, ["10.0.0.2"])
+
+    async def test_server_failure_falls_back(self):
+        self.assertEqual(await self.resolver.resolve("10.0.0.3"), "fallback-host")
+        self.assertEqual(self.resolver.get_stats()["errors"], 1)
+
+    async def test_many_concurrent_lookups(self):
+        results = await asyncio.gather(*(self.resolver.resolve("10.0.0.1") for _ in range(200)))
+        self.assertEqual(set(results), {"router1.example.net"})
+        self.assertEqual(len(self.server.queries), 200)
+        self.assertEqual(self.resolver.get_stats()["inflight"], 0)
+
+    async def test_invalid_ip(self):
+        self.assertIsNone(await self.resolver.resolve("not-an-ip"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+import unittest
+import asyncio
+import os
+import tempfile
+import tracemalloc
+from mutt.message_queue import BoundedMessageQueue, OverflowPolicy
+from mutt.models.message import Message, MessageType, Severity, SyslogMessage
+
+
+def make_msg(payload, severity=Severity.INFO):
+    return Message(source_ip="10.0.0.1", message_type=MessageType.SYSLOG,
+                   severity=severity, payload=payload)
+
+
+def drain(queue):
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+        queue.task_done()
+    return items
+
+
+class TestBoundedMessageQueue(unittest.IsolatedAsyncioTestCase):
+    """Test overflow policies and watermark events."""
+
+    async def test_drop_newest(self):
+        queue = BoundedMessageQueue(max_size=3, policy=OverflowPolicy.DROP_NEWEST)
+        accepted = [queue.put_nowait(make_msg(str(n))) for n in range(4)]
+        self.assertEqual(accepted, [True, True, True, False])
+        self.assertEqual(queue.put_batch([make_msg("4")]), 0)
+
+        self.assertEqual(queue.qsize(), 3)
+        self.assertTrue(queue.full())
+        self.assertEqual([m.payload for m in drain(queue)], ["0", "1", "2"])
+        self.assertEqual(queue.get_stats()["dropped_newest"], 2)
+
+    async def test_drop_oldest(self):
+        queue = BoundedMessageQueue(max_size=3, policy=OverflowPolicy.DROP_OLDEST)
+        for n in range(5):
+            queue.put_nowait(make_msg(str(n)))
+
+        self.assertEqual([m.payload for m in drain(queue)], ["2", "3", "4"])
+        self.assertEqual(queue.get_stats()["dropped_oldest"], 2)
+        # Dropped messages do not hold up join()
+        await asyncio.wait_for(queue.join(), timeout=1)
+
+    async def test_drop_lowest_severity(self):
+        queue = BoundedMessageQueue(max_size=3, policy=OverflowPolicy.DROP_LOWEST_SEVERITY)
+        queue.put_nowait(make_msg("debug1", Severity.DEBUG))
+        queue.put_nowait(make_msg("info1", Severity.INFO))
+        queue.put_nowait(make_msg("debug2", Severity.DEBUG))
+        queue.put_nowait(make_msg("crit1", Severity.CRITICAL))   # evicts debug1
+        queue.put_nowait(make_msg("debug3", Severity.DEBUG))     # nothing lower queued: dropped
+        queue.put_nowait(make_msg("error1", Severity.ERROR))     # evicts debug2
+
+        self.assertEqual([m.payload for m in drain(queue)], ["info1", "crit1", "error1"])
+        self.assertEqual(queue.get_stats()["dropped_lowest_severity"], 3)
+        await asyncio.wait_for(queue.join(), timeout=1)
+
+    async def test_drop_lowest_severity_storm_stays_bounded(self):
+        queue = BoundedMessageQueue(max_size=100, policy=OverflowPolicy.DROP_LOWEST_SEVERITY)
+        for n in range(5000):
+            severity = Severity.CRITICAL if n % 50 == 0 else Severity.DEBUG
+            queue.put_nowait(make_msg(str(n), severity))
+
+        items = drain(queue)
+        self.assertEqual(len(items), 100)
+        self.assertEqual(sum(1 for m in items if m.severity == Severity.CRITICAL), 100)
+        self.assertLess(len(queue._queue._order), 2000)
+
+    async def test_spill_to_disk_preserves_order_and_types(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "spill.bin")
+            queue = BoundedMessageQueue(max_size=10, policy=OverflowPolicy.SPILL_TO_DISK,
+                                        spill_path=path)
+            for n in range(35):
+                queue.put_nowait(SyslogMessage(source_ip="10.0.0.1", message_type=MessageType.SYSLOG,
+                                               severity=Severity.INFO, payload=str(n), hostname="h"))
+            self.assertEqual(queue.qsize(), 35)
+            self.assertEqual(queue._queue.memory_len, 10)
+            self.assertEqual(queue.get_stats()["spilled"], 25)
+
+            first = [queue.get_nowait() for _ in range(12)]
+            for n in range(35, 40):
+                queue.put_nowait(make_msg(str(n)))
+            items = first + [await queue.get() for _ in range(queue.qsize())]
+
+            self.assertEqual([m.payload for m in items], [str(n) for n in range(40)])
+            self.assertIsInstance(items[20], SyslogMessage)
+            self.assertEqual(items[20].hostname, "h")
+            self.assertEqual(os.path.getsize(path), 0)
+            queue.close()
+
+    async def test_spill_file_resumed_and_capped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "spill.bin")
+            queue = BoundedMessageQueue(max_size=2, policy=OverflowPolicy.SPILL_TO_DISK,
+                                        spill_path=path, spill_max_bytes=1)
+            for n in range(4):
+                queue.put_nowait(make_msg(str(n)))
+            # One record fits before the cap is reached
+            self.assertEqual(queue.qsize(), 3)
+            self.assertEqual(queue.get_stats()["spill_overflow"], 1)
+            queue.close()
+
+            resumed = BoundedMessageQueue(max_size=2, policy=OverflowPolicy.SPILL_TO_DISK,
+                                          spill_path=path)
+            self.assertEqual(resumed.qsize(), 1)
+            self.assertEqual(resumed.get_nowait().payload, "2")
+            resumed.close()
+
+    async def test_consumed_spill_records_not_replayed_after_restart(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "spill.bin")
+            queue = BoundedMessageQueue(max_size=2, policy=OverflowPolicy.SPILL_TO_DISK,
+                                        spill_path=path)
+            for n in range(6):
+                queue.put_nowait(make_msg(str(n)))
+            consumed = [queue.get_nowait().payload for _ in range(3)]
+            queue.close()
+
+            resumed = BoundedMessageQueue(max_size=2, policy=OverflowPolicy.SPILL_TO_DISK,
+                                          spill_path=path)
+            self.assertEqual(consumed, ["0", "1", "2"])
+            self.assertEqual([m.payload for m in drain(resumed)], ["3", "4", "5"])
+            resumed.close()
+
+    async def test_resumed_messages_can_be_marked_done(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "spill.bin")
+            queue = BoundedMessageQueue(max_size=2, policy=OverflowPolicy.SPILL_TO_DISK,
+                                        spill_path=path)
+            for n in range(6):
+                queue.put_nowait(make_msg(str(n)))
+            queue.close()
+
+            resumed = BoundedMessageQueue(max_size=2, policy=OverflowPolicy.SPILL_TO_DISK,
+                                          spill_path=path)
+            self.assertEqual(resumed.qsize(), 4)
+            for _ in range(4):
+                await resumed.get()
+                resumed.task_done()
+            await asyncio.wait_for(resumed.join(), timeout=1)
+            resumed.close()
+
+    async def test_watermark_callbacks(self):
+        events = []
+        queue = BoundedMessageQueue(max_size=10, high_watermark=0.8, low_watermark=0.3)
+        queue.add_watermark_callback(lambda active, depth: events.append((active, depth)))
+
+        for n in range(10):
+            queue.put_nowait(make_msg(str(n)))
+        self.assertEqual(events, [(True, 8)])
+        self.assertTrue(queue.backpressure)
+
+        for _ in range(7):
+            queue.get_nowait()
+        self.assertEqual(events, [(True, 8), (False, 3)])
+        self.assertFalse(queue.backpressure)
+        self.assertEqual(queue.get_stats()["high_watermark_events"], 1)
+
+    async def test_put_waits_for_room(self):
+        queue = BoundedMessageQueue(max_size=1)
+        await queue.put(make_msg("a"))
+        waiter = asyncio.create_task(queue.put(make_msg("b")))
+        await asyncio.sleep(0.01)
+        self.assertFalse(waiter.done())
+        queue.get_nowait()
+        await asyncio.wait_for(waiter, timeout=1)
+        self.assertEqual(queue.get_nowait().payload, "b")
+
+    async def test_memory_flat_under_burst(self):
+        def burst_growth(queue):
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+            for n in range(10000):
+                queue.put_nowait(make_msg(str(n)))
+            grown = tracemalloc.get_traced_memory()[0] - baseline
+            tracemalloc.stop()
+            return grown
+
+        unbounded = asyncio.Queue()
+        bounded = BoundedMessageQueue(max_size=1000, policy=OverflowPolicy.DROP_OLDEST)
+        for n in range(1000):
+            unbounded.put_nowait(make_msg(str(n)))
+            bounded.put_nowait(make_msg(str(n)))
+
+        # A 10x burst is retained in full by an unbounded queue, not by ours
+        unbounded_growth = burst_growth(unbounded)
+        bounded_growth = burst_growth(bounded)
+        self.assertEqual(bounded.qsize(), 1000)
+        self.assertLess(bounded_growth, unbounded_growth * 0.1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import asyncio
+import json
+import os
+import tempfile
+from unittest.mock import patch
+from pysnmp.proto import rfc1902
+from mutt.listeners.mib_resolver import MibResolver
+from mutt.listeners.snmp_listener import SNMPListener
+from mutt.models.message import MessageType, Severity, SNMPTrap
+from mutt.storage.database import Database
+
+
+TEST_MIB = '''
+(NotificationType, MibScalar) = mibBuilder.import_symbols("SNMPv2-SMI", "NotificationType", "MibScalar")
+(Integer32,) = mibBuilder.import_symbols("SNMPv2-SMI", "Integer32")
+muttTestTrap = NotificationType((1, 3, 6, 1, 4, 1, 99999, 0, 1))
+muttTestValue = MibScalar((1, 3, 6, 1, 4, 1, 99999, 1, 1), Integer32())
+mibBuilder.export_symbols("MUTT-TEST-MIB", muttTestTrap=muttTestTrap, muttTestValue=muttTestValue)
+'''
+
+
+class TestMibResolver(unittest.TestCase):
+    """Test OID index building, caching and lookups."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.cache_file = os.path.join(self.dir, "cache", "mib_index.json")
+
+    def make_resolver(self, modules=("SNMPv2-MIB",), **kwargs):
+        resolver = MibResolver(list(modules), cache_file=self.cache_file, **kwargs)
+        resolver.load()
+        return resolver
+
+    def test_resolves_names_and_instance_suffixes(self):
+        resolver = self.make_resolver()
+        self.assertEqual(resolver.resolve("1.3.6.1.6.3.1.1.5.1"), "SNMPv2-MIB::coldStart")
+        self.assertEqual(resolver.resolve("1.3.6.1.2.1.1.3.0"), "SNMPv2-MIB::sysUpTime.0")
+        self.assertEqual(resolver.resolve("1.3.6.1.6.3.1.1.4.1.0"), "SNMPv2-MIB::snmpTrapOID.0")
+        self.assertIsNone(resolver.resolve("SNMPv2-MIB::sysUpTime.0"))
+        self.assertIsNone(resolver.resolve("unknown"))
+
+    def test_first_configured_module_wins(self):
+        # mib-2 is defined by both modules
+        self.assertEqual(self.make_resolver(["RFC1213-MIB"]).resolve("1.3.6.1.2.1"), "RFC1213-MIB::mib-2")
+        resolver = self.make_resolver(["SNMPv2-SMI", "RFC1213-MIB"])
+        self.assertEqual(resolver.resolve("1.3.6.1.2.1"), "SNMPv2-SMI::mib-2")
+        self.assertEqual(resolver.resolve("1.3.6.1.2.1.4.3.0"), "RFC1213-MIB::ipInReceives.0")
+
+    def test_index_is_loaded_from_cache(self):
+        first = self.make_resolver()
+        self.assertFalse(first.stats["from_cache"])
+        self.assertTrue(os.path.exists(self.cache_file))
+
+        with patch.object(MibResolver, "_build_index", side_effect=AssertionError("MIBs reparsed")):
+            second = self.make_resolver()
+        self.assertTrue(second.stats["from_cache"])
+        self.assertEqual(second.stats["index_size"], first.stats["index_size"])
+        self.assertEqual(second.resolve("1.3.6.1.6.3.1.1.5.1"), "SNMPv2-MIB::coldStart")
+
+    def test_cache_is_rebuilt_when_inputs_change(self):
+        self.make_resolver()
+        resolver = self.make_resolver(["RFC1213-MIB", "SNMPv2-MIB"])
+        self.assertFalse(resolver.stats["from_cache"])
+        with open(self.cache_file) as f:
+            self.assertEqual(json.load(f)["key"]["modules"], ["RFC1213-MIB", "SNMPv2-MIB"])
+
+    def test_custom_mib_source(self):
+        source = os.path.join(self.dir, "mibs")
+        os.makedirs(source)
+        with open(os.path.join(source, "MUTT-TEST-MIB.py"), "w") as f:
+            f.write(TEST_MIB)
+        resolver = MibResolver(["MUTT-TEST-MIB"], sources=[source], cache_file=self.cache_file)
+        resolver.load()
+        self.assertEqual(resolver.resolve("1.3.6.1.4.1.99999.0.1"), "MUTT-TEST-MIB::muttTestTrap")
+        self.assertEqual(resolver.resolve("1.3.6.1.4.1.99999.1.1.0"), "MUTT-TEST-MIB::muttTestValue.0")
+
+    def test_lru(self):
+        resolver = self.make_resolver(lru_size=2)
+        for oid in ("1.3.6.1.2.1.1.3.0", "1.3.6.1.2.1.1.3.0", "1.3.6.1.2.1.1.5.0", "1.3.6.1.2.1.1.6.0"):
+            resolver.resolve(oid)
+        self.assertEqual(resolver.stats["hits"], 1)
+        self.assertEqual(resolver.stats["misses"], 3)
+        self.assertEqual(resolver.stats["evictions"], 1)
+
+    def test_annotate_trap(self):
+        resolver = self.make_resolver()
+        trap = SNMPTrap(
+            source_ip="10.0.0.1", message_type=MessageType.SNMP_TRAP, severity=Severity.INFO,
+            payload="trap", oid="1.3.6.1.6.3.1.1.5.1",
+            varbinds={"1.3.6.1.2.1.1.3.0": "42", "1.3.6.1.4.1.99999.5": "x"}
+        )
+        resolver.annotate(trap)
+        self.assertEqual(trap.trap_name, "SNMPv2-MIB::coldStart")
+        self.assertEqual(trap.varbind_names["1.3.6.1.2.1.1.3.0"], "SNMPv2-MIB::sysUpTime.0")
+
+        metadata = json.loads(Database.message_row(trap)[-1])
+        self.assertEqual(metadata["trap_name"], "SNMPv2-MIB::coldStart")
+        self.assertIn("1.3.6.1.2.1.1.3.0", metadata["varbind_names"])
+
+    def test_listener_annotates_decoded_traps(self):
+        listener = SNMPListener(asyncio.Queue(), mib_resolver=self.make_resolver())
+        trap = listener._decode_trap([
+            (rfc1902.ObjectName("1.3.6.1.2.1.1.3.0"), rfc1902.TimeTicks(42)),
+            (rfc1902.ObjectName("1.3.6.1.6.3.1.1.4.1.0"), rfc1902.ObjectIdentifier("1.3.6.1.6.3.1.1.5.1")),
+        ], "10.0.0.1")
+        self.assertEqual(trap.trap_name, "SNMPv2-MIB::coldStart")
+        self.assertEqual(trap.varbind_names["1.3.6.1.6.3.1.1.4.1.0"], "SNMPv2-MIB::snmpTrapOID.0")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import asyncio
+import socket
+from mutt.listeners.multiprocess_listener import MultiProcessSyslogListener
+from mutt.listeners.syslog_listener import SyslogListener
+from mutt.models.message import SyslogMessage
+
+
+def free_udp_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@unittest.skipUnless(hasattr(socket, "SO_REUSEPORT"), "SO_REUSEPORT not available")
+class TestMultiProcessSyslogListener(unittest.IsolatedAsyncioTestCase):
+    """Test syslog ingestion across several SO_REUSEPORT processes."""
+
+    async def test_reuse_port_listeners_share_port(self):
+        port = free_udp_port()
+        first = SyslogListener(asyncio.Queue(), port=port, host="127.0.0.1", reuse_port=True)
+        second = SyslogListener(asyncio.Queue(), port=port, host="127.0.0.1", reuse_port=True)
+        await first.start()
+        try:
+            await second.start()
+            self.assertTrue(second.is_running)
+        finally:
+            await second.stop()
+            await first.stop()
+
+    async def test_messages_from_all_processes_reach_queue(self):
+        queue = asyncio.Queue()
+        port = free_udp_port()
+        listener = MultiProcessSyslogListener(queue, port=port, host="127.0.0.1", processes=2)
+        await listener.start()
+        try:
+            self.assertEqual(listener.get_stats()["processes_alive"], 2)
+
+            # Separate sockets give distinct flows, spread across processes
+            expected = set()
+            for s in range(20):
+                with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                    for n in range(5):
+                        text = f"sender {s} line {n}"
+                        expected.add(text)
+                        sock.sendto(f"<134>Jan 09 20:30:00 myhost myproc: {text}".encode(),
+                                    ("127.0.0.1", port))
+
+            received = []
+            for _ in range(100):
+                msg = await asyncio.wait_for(queue.get(), timeout=5)
+                received.append(msg)
+        finally:
+            await listener.stop()
+
+        self.assertTrue(all(isinstance(m, SyslogMessage) for m in received))
+        self.assertEqual({m.payload for m in received}, expected)
+        self.assertEqual(received[0].process_name, "myproc")
+        self.assertEqual(listener.get_stats()["messages"], 100)
+        ingest = listener.get_ingest_stats()
+        self.assertEqual((ingest["received"], ingest["parsed"], ingest["enqueued"]), (100, 100, 100))
+        self.assertFalse(listener.is_running)
+
+
+if __name__ == '__main__':
+    unittest.main()
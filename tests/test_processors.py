@@ -1,4 +1,5 @@
 import asyncio
+import tempfile
 import unittest
 from unittest.mock import MagicMock, AsyncMock
 from mutt.models.message import Message, MessageType, Severity
@@ -7,6 +8,8 @@ from mutt.processors.validator import Validator
 from mutt.processors.pattern_matcher import PatternMatcher
 from mutt.processors.enricher import Enricher
 from mutt.processors.message_router import MessageRouter
+from mutt.processors.message_processor import MessageProcessor
+from mutt.storage.buffer import FileBuffer
 
 class TestProcessors(unittest.IsolatedAsyncioTestCase):
     def setUp(self):
@@ -107,5 +110,103 @@ class TestProcessors(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(len(args[1]), 1)
         self.assertEqual(args[1][0], rule2)
 
+    def make_msgs(self, specs):
+        return [
+            Message(source_ip=ip, message_type=MessageType.SYSLOG,
+                    severity=Severity.INFO, payload=payload, metadata={})
+            for ip, payload in specs
+        ]
+
+    def test_validator_batch(self):
+        msgs = self.make_msgs([("10.0.0.1", "ok"), ("", "no source"), ("10.0.0.2", "")])
+        self.assertEqual(Validator().validate_batch(msgs), [True, False, False])
+        self.assertEqual(msgs[0].metadata["validation_errors"], [])
+        self.assertEqual(msgs[1].metadata["validation_errors"], ["Missing required field: source_ip"])
+
+    def test_pattern_matcher_batch(self):
+        rule = AlertRule(id="r1", name="Auth Fail", pattern_type=PatternType.KEYWORD,
+                         pattern="authentication failure", actions=[ActionType.STORE])
+        matcher = PatternMatcher([rule])
+        msgs = self.make_msgs([("10.0.0.1", "authentication failure"), ("10.0.0.1", "fine")])
+        self.assertEqual(matcher.match_batch(msgs), [[rule], []])
+        self.assertEqual(matcher.get_rule_stats()[0]["matches"], 1)
+
+    async def test_enricher_batch_resolves_each_source_once(self):
+        reg = MagicMock()
+        reg.update_device = AsyncMock()
+        dns_cache = MagicMock()
+        dns_cache.lookup = AsyncMock(side_effect=lambda ip: {"10.0.0.1": "sw1"}.get(ip))
+
+        enricher = Enricher(reg, dns_cache=dns_cache)
+        msgs = self.make_msgs([("10.0.0.1", "a"), ("10.0.0.2", "b"), ("10.0.0.1", "c")])
+        msgs[1].severity = "warning"
+        await enricher.enrich_batch(msgs)
+
+        self.assertEqual(dns_cache.lookup.await_count, 2)
+        self.assertEqual(reg.update_device.await_count, 2)
+        reg.update_device.assert_any_await("10.0.0.1", hostname="sw1")
+        self.assertEqual([m.metadata.get("hostname") for m in msgs], ["sw1", None, "sw1"])
+        self.assertEqual(msgs[1].severity, Severity.WARNING)
+
+    async def test_message_router_batch_reports_errors_per_message(self):
+        router = MessageRouter()
+        calls = []
+
+        async def handler(msg, rules):
+            calls.append(msg.payload)
+            if msg.payload == "bad":
+                raise RuntimeError("handler failed")
+
+        router.register_handler(ActionType.STORE, handler)
+        rule = AlertRule(id="r1", name="r1", pattern_type=PatternType.KEYWORD, pattern="p", actions=[ActionType.STORE])
+        msgs = self.make_msgs([("10.0.0.1", "good"), ("10.0.0.1", "bad"), ("10.0.0.1", "unmatched")])
+
+        errors = await router.route_batch(msgs, [[rule], [rule], []])
+        self.assertEqual(calls, ["good", "bad"])
+        self.assertIsNone(errors[0])
+        self.assertIsInstance(errors[1], RuntimeError)
+        self.assertIsNone(errors[2])
+        with self.assertRaises(RuntimeError):
+            await router.route(msgs[1], [rule])
+
+    async def test_file_buffer_write_batch(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            buffer = FileBuffer(tmp, flush_threshold=3)
+            await buffer.write_batch(self.make_msgs([("10.0.0.1", str(n)) for n in range(5)]))
+            self.assertEqual(buffer._wal_records, [])
+            flushed = await buffer.flush()
+        self.assertEqual([m.payload for m in flushed], ["0", "1", "2", "3", "4"])
+
+    def make_processor(self, tmp):
+        processor = MessageProcessor(
+            {"storage": {"db_path": f"{tmp}/mutt.db", "buffer_dir": tmp}}, asyncio.Queue()
+        )
+        processor.enricher.enrich_batch = AsyncMock()
+        return processor
+
+    async def test_failed_batch_stage_loses_only_the_bad_message(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            processor = self.make_processor(tmp)
+            match_batch = processor.pattern_matcher.match_batch
+
+            def failing_match_batch(batch):
+                if any(m.payload == "1" for m in batch):
+                    raise RuntimeError("match failed")
+                return match_batch(batch)
+
+            processor.pattern_matcher.match_batch = failing_match_batch
+            await processor._process_batch(self.make_msgs([("10.0.0.1", str(n)) for n in range(3)]))
+            flushed = await processor.file_buffer.flush()
+        self.assertEqual([m.payload for m in flushed], ["0", "2"])
+
+    async def test_unencodable_message_loses_only_itself(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            processor = self.make_processor(tmp)
+            msgs = self.make_msgs([("10.0.0.1", str(n)) for n in range(4)])
+            msgs[1].metadata["bad"] = object()
+            await processor._process_batch(msgs)
+            flushed = await processor.file_buffer.flush()
+        self.assertEqual([m.payload for m in flushed], ["0", "2", "3"])
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,230 @@
+import json
+import os
+import tempfile
+import unittest
+import random
+import re
+from mutt.models.message import Message, MessageType, Severity
+from mutt.models.rules import AlertRule, PatternType, ActionType
+from mutt.processors.pattern_matcher import PatternMatcher
+from mutt.processors.rule_engine import KeywordAutomaton, RuleEngine
+
+
+def naive_match(rules, payload):
+    """Reference implementation: the original per-rule loop."""
+    matches = []
+    for rule in rules:
+        if not rule.enabled or not rule.pattern:
+            continue
+        if rule.pattern_type == PatternType.REGEX:
+            if re.search(rule.pattern, payload, re.IGNORECASE):
+                matches.append(rule)
+        elif rule.pattern_type == PatternType.KEYWORD:
+            if rule.pattern.lower() in payload.lower():
+                matches.append(rule)
+        elif rule.pattern_type == PatternType.EXACT:
+            if rule.pattern == payload:
+                matches.append(rule)
+    return matches
+
+
+def make_rule(rule_id, pattern_type, pattern, enabled=True):
+    return AlertRule(
+        id=rule_id, name=rule_id, pattern_type=pattern_type,
+        pattern=pattern, actions=[ActionType.STORE], enabled=enabled
+    )
+
+
+class TestKeywordAutomaton(unittest.TestCase):
+    """Test the Aho-Corasick keyword automaton."""
+
+    def test_overlapping_keywords(self):
+        automaton = KeywordAutomaton([("he", 0), ("she", 1), ("his", 2), ("hers", 3)])
+        self.assertEqual(automaton.search("ushers"), {0, 1, 3})
+        self.assertEqual(automaton.search("this"), {2})
+        self.assertEqual(automaton.search("nothing"), set())
+
+    def test_duplicate_keywords(self):
+        automaton = KeywordAutomaton([("down", 0), ("down", 1)])
+        self.assertEqual(automaton.search("link down"), {0, 1})
+
+
+class TestRuleEngine(unittest.TestCase):
+    """Test RuleEngine against the reference matcher."""
+
+    def test_mixed_rules(self):
+        rules = [
+            make_rule("k1", PatternType.KEYWORD, "Authentication Failure"),
+            make_rule("e1", PatternType.EXACT, "authentication failure for admin"),
+            make_rule("r1", PatternType.REGEX, r"auth.*failure"),
+            make_rule("k2", PatternType.KEYWORD, "success"),
+            make_rule("r2", PatternType.REGEX, r"^link (up|down)$"),
+        ]
+        engine = RuleEngine(rules)
+
+        self.assertEqual(
+            [r.id for r in engine.match("authentication failure for admin")],
+            ["k1", "e1", "r1"]
+        )
+        self.assertEqual([r.id for r in engine.match("LINK DOWN")], ["r2"])
+        self.assertEqual(engine.match("nothing here"), [])
+
+    def test_disabled_empty_and_invalid_rules_skipped(self):
+        rules = [
+            make_rule("d1", PatternType.KEYWORD, "error", enabled=False),
+            make_rule("e1", PatternType.KEYWORD, ""),
+            make_rule("bad", PatternType.REGEX, r"(unclosed"),
+            make_rule("ok", PatternType.REGEX, r"err(or)?"),
+        ]
+        engine = RuleEngine(rules)
+
+        self.assertEqual([r.id for r in engine.match("error")], ["ok"])
+        self.assertEqual(engine.regex_count, 1)
+
+    def test_backreference_rules_evaluated_individually(self):
+        rules = [
+            make_rule("r1", PatternType.REGEX, r"(\w+) \1"),
+            make_rule("r2", PatternType.REGEX, r"(fan) fail"),
+            make_rule("r3", PatternType.REGEX, r"psu"),
+        ]
+        engine = RuleEngine(rules)
+
+        self.assertEqual([r.id for r in engine.match("down down")], ["r1"])
+        self.assertEqual([r.id for r in engine.match("fan fail")], ["r2"])
+
+    def test_conditional_group_rules_evaluated_individually(self):
+        rules = [
+            make_rule("r1", PatternType.REGEX, r"(fan) fail"),
+            make_rule("r2", PatternType.REGEX, r"(<)?x(?(1)>|$)"),
+        ]
+        engine = RuleEngine(rules)
+
+        self.assertEqual([r.id for r in engine.match("<x> y")], ["r2"])
+        self.assertEqual([r.id for r in engine.match("fan fail")], ["r1"])
+
+    def test_conflicting_named_groups(self):
+        rules = [
+            make_rule("r1", PatternType.REGEX, r"(?P<iface>eth\d+) down"),
+            make_rule("r2", PatternType.REGEX, r"(?P<iface>ge\d+) up"),
+        ]
+        engine = RuleEngine(rules)
+
+        self.assertEqual([r.id for r in engine.match("ge0 up")], ["r2"])
+
+    def test_equivalence_on_random_corpus(self):
+        rng = random.Random(1234)
+        words = ["link", "down", "up", "error", "fan", "psu", "temp", "critical",
+                 "auth", "failure", "ospf", "bgp", "neighbor", "reset", "Gi0/1", "vlan"]
+
+        rules = []
+        for i in range(300):
+            kind = rng.choice([PatternType.KEYWORD, PatternType.EXACT, PatternType.REGEX])
+            phrase = " ".join(rng.sample(words, rng.randint(1, 2)))
+            if kind == PatternType.REGEX:
+                pattern = phrase.replace(" ", r"\s+.*") if rng.random() < 0.5 else f"^{re.escape(phrase)}"
+            elif kind == PatternType.KEYWORD:
+                pattern = phrase.upper() if rng.random() < 0.3 else phrase
+            else:
+                pattern = phrase
+            rules.append(make_rule(f"rule{i}", kind, pattern, enabled=rng.random() > 0.1))
+
+        engine = RuleEngine(rules)
+        for _ in range(2000):
+            payload = " ".join(rng.choice(words) for _ in range(rng.randint(1, 6)))
+            self.assertEqual(engine.match(payload), naive_match(rules, payload), payload)
+
+    def test_evaluate_each_agrees_with_match(self):
+        rules = [
+            make_rule("k1", PatternType.KEYWORD, "Down"),
+            make_rule("e1", PatternType.EXACT, "link down"),
+            make_rule("r1", PatternType.REGEX, r"^link"),
+            make_rule("d1", PatternType.KEYWORD, "link", enabled=False),
+        ]
+        engine = RuleEngine(rules)
+
+        for payload in ["link down", "LINK up", "nothing"]:
+            results = engine.evaluate_each(payload)
+            self.assertEqual([i for i, _, _ in results], engine.compiled_indices)
+            self.assertEqual({i for i, matched, _ in results if matched},
+                             engine.match_indices(payload))
+            self.assertTrue(all(elapsed >= 0 for _, _, elapsed in results))
+
+
+class TestRuleProfiling(unittest.TestCase):
+    """Test per-rule statistics collected by PatternMatcher."""
+
+    def setUp(self):
+        self.rules = [
+            make_rule("k1", PatternType.KEYWORD, "down"),
+            make_rule("r1", PatternType.REGEX, r"link (up|down)"),
+            make_rule("never", PatternType.EXACT, "no such payload"),
+        ]
+
+    def _msg(self, payload):
+        return Message(source_ip="10.0.0.1", message_type=MessageType.SYSLOG,
+                       severity=Severity.INFO, payload=payload)
+
+    def test_match_counts_without_sampling(self):
+        matcher = PatternMatcher(self.rules)
+        for payload in ["link down", "link up", "fan down"]:
+            matcher.match(self._msg(payload))
+
+        stats = {s["rule_id"]: s for s in matcher.get_rule_stats()}
+        self.assertEqual(stats["k1"]["matches"], 2)
+        self.assertEqual(stats["r1"]["matches"], 2)
+        self.assertEqual(stats["k1"]["evaluations"], 0)
+        self.assertEqual(matcher.never_matched(), ["never"])
+        self.assertEqual(matcher.slowest_rules(), [])
+
+    def test_disabled_and_invalid_rules_reported_separately(self):
+        rules = self.rules + [
+            make_rule("off", PatternType.KEYWORD, "down", enabled=False),
+            make_rule("bad", PatternType.REGEX, "link (down"),
+        ]
+        matcher = PatternMatcher(rules)
+        matcher.match(self._msg("link down"))
+
+        self.assertEqual(matcher.never_matched(), ["never"])
+        self.assertEqual(matcher.profiler.not_evaluated(), ["off", "bad"])
+        with self.assertLogs("mutt.processors.rule_profiler", level="INFO") as logs:
+            matcher.log_rule_summary()
+        self.assertIn("2 rules not evaluated (disabled or invalid): off, bad", "\n".join(logs.output))
+
+    def test_sampled_timings(self):
+        matcher = PatternMatcher(self.rules, profile_sample_every=2)
+        for _ in range(10):
+            matcher.match(self._msg("link down"))
+
+        stats = matcher.get_rule_stats()
+        self.assertTrue(all(s["evaluations"] == 5 for s in stats))
+        self.assertEqual(stats[0]["matches"], 10)
+
+        slowest = matcher.slowest_rules(2, key="mean_us")
+        self.assertEqual(len(slowest), 2)
+        self.assertGreaterEqual(slowest[0]["mean_us"], slowest[1]["mean_us"])
+        self.assertGreaterEqual(slowest[0]["p99_us"], 0.0)
+
+    def test_dump_and_reset(self):
+        matcher = PatternMatcher(self.rules, profile_sample_every=1)
+        matcher.match(self._msg("link down"))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "rule_stats.json")
+            matcher.dump_rule_stats(path)
+            with open(path) as f:
+                dumped = json.load(f)
+        self.assertEqual(dumped["messages"], 1)
+        self.assertEqual(dumped["sampled_messages"], 1)
+        self.assertEqual({r["rule_id"] for r in dumped["rules"]}, {"k1", "r1", "never"})
+
+        with self.assertLogs("mutt.processors.rule_profiler", level="INFO") as logs:
+            matcher.log_rule_summary(top=1)
+        self.assertIn("never matched: never", logs.output[-1])
+
+        matcher.reset_rule_stats()
+        self.assertTrue(all(s["matches"] == 0 and s["evaluations"] == 0
+                            for s in matcher.get_rule_stats()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import unittest
+import asyncio
+from unittest.mock import Mock
+from pysnmp.hlapi.v3arch.asyncio import (
+    ContextData, NotificationType, ObjectIdentity, SnmpEngine, UdpTransportTarget, UsmUserData,
+    send_notification
+)
+from pysnmp.entity import config
+from pysnmp.proto import rfc1902
+from mutt.listeners.snmp_listener import SNMPListener
+from mutt.listeners.snmp_usm import RotatingUsmSecurityModel
+from mutt.models.credentials import SNMPv3Credential, SNMPv3CredentialSet
+from mutt.storage.auth_failure_tracker import AuthFailureTracker
+
+
+OLD = SNMPv3Credential(priority=1, auth_type='SHA', auth_password='oldauthpass',
+                       priv_type='NONE', priv_password='')
+NEW = SNMPv3Credential(priority=2, auth_type='SHA', auth_password='newauthpass',
+                       priv_type='NONE', priv_password='')
+
+
+class TestRotatingUsmKeys(unittest.TestCase):
+    """Test localized key caching."""
+
+    def setUp(self):
+        self.usm = RotatingUsmSecurityModel(
+            {'user': SNMPv3CredentialSet(username='user', credentials=[OLD, NEW])}, key_cache_size=2
+        )
+
+    def test_passwords_are_hashed_once_per_credential(self):
+        engines = [rfc1902.OctetString(hexValue=f'80000000010203{n:02x}') for n in range(3)]
+        keys = [self.usm._keys(engine, b'user', 0) for engine in engines]
+        self.usm._keys(engines[2], b'user', 0)
+
+        self.assertEqual(self.usm.stats['key_derivations'], 1)
+        self.assertEqual(self.usm.stats['key_localizations'], 3)
+        self.assertEqual(len({bytes(auth) for auth, _ in keys}), 3)
+        self.assertEqual(len(self.usm._local_keys), 2)
+
+    def test_localized_keys_match_pysnmp(self):
+        engine = rfc1902.OctetString(hexValue='8000000001020304')
+        snmp_engine = SnmpEngine()
+        config.add_v3_user(snmp_engine, 'user', config.USM_AUTH_HMAC96_SHA, 'oldauthpass',
+                           securityEngineId=engine)
+        usm = snmp_engine.security_models[3]
+        expected = usm._SnmpUSMSecurityModel__get_user_info(
+            snmp_engine.message_dispatcher.mib_instrum_controller, engine, rfc1902.OctetString('user')
+        )
+        auth_key, priv_key = self.usm._keys(engine, b'user', 0)
+        self.assertEqual(bytes(auth_key), bytes(expected[3]))
+        self.assertIsNone(priv_key)
+
+    def test_credential_order(self):
+        user = (b'engine', b'user')
+        self.assertEqual(self.usm._order(user, 2), [0, 1])
+        self.usm._remember(user, 1)
+        self.assertEqual(self.usm._order(user, 2), [1, 0])
+        self.assertEqual(self.usm.stats['credential_switches'], 1)
+
+
+class TestSNMPv3Rotation(unittest.IsolatedAsyncioTestCase):
+    """Test SNMPv3 traps from devices on old and new credentials."""
+
+    async def asyncSetUp(self):
+        self.queue = asyncio.Queue()
+        self.tracker = Mock(spec=AuthFailureTracker)
+        self.listener = SNMPListener(
+            queue=self.queue, port=0, host='127.0.0.1', auth_failure_tracker=self.tracker,
+            credentials_dict={'u': SNMPv3CredentialSet(username='u', credentials=[OLD, NEW])}
+        )
+        await self.listener.start()
+        self.addAsyncCleanup(self.listener.stop)
+        self.port = self.listener._sock.getsockname()[1]
+
+    async def send(self, password, engine_id='8000000001020304'):
+        engine = SnmpEngine(rfc1902.OctetString(hexValue=engine_id))
+        try:
+            await send_notification(
+                engine,
+                UsmUserData('u', password, authProtocol=config.USM_AUTH_HMAC96_SHA),
+                await UdpTransportTarget.create(('127.0.0.1', self.port)),
+                ContextData(),
+                'trap',
+                NotificationType(ObjectIdentity('1.3.6.1.6.3.1.1.5.1'))
+            )
+        finally:
+            engine.close_dispatcher()
+        # Wait for the listener to receive and decode it
+        received = self.listener.ingest_stats['received'] + 1
+        for _ in range(200):
+            if self.listener.ingest_stats['received'] >= received and not self.listener._pending_traps:
+                break
+            await asyncio.sleep(0.005)
+        await asyncio.sleep(0)
+
+    async def test_old_and_new_credentials_are_accepted(self):
+        await self.send('newauthpass')
+        await self.send('newauthpass')
+        await self.send('oldauthpass', engine_id='8000000001020305')
+        await self.send('wrongpassword')
+
+        self.assertEqual(self.queue.qsize(), 3)
+        trap = self.queue.get_nowait()
+        self.assertEqual(trap.oid, '1.3.6.1.6.3.1.1.5.1')
+
+        stats = self.listener.get_stats()
+        # The first new-password trap tries the old credential first, the
+        # second uses the remembered one; the wrong password tries both
+        self.assertEqual(stats['credential_retries'], 2)
+        self.assertEqual(stats['credential_switches'], 1)
+        self.assertEqual(stats['key_derivations'], 2)
+        self.assertEqual(stats['key_localizations'], 3)
+        self.assertTrue(self.listener.usm._cache.is_empty())
+        # Only the rejected trap is an auth failure, not the retries
+        self.tracker.note_failure.assert_called_once_with('u', '127.0.0.1')
+
+    async def test_restarted_listener_still_counts_failures(self):
+        await self.listener.stop()
+        await self.listener.start()
+        self.port = self.listener._sock.getsockname()[1]
+        await self.send('newauthpass')
+        await self.send('wrongpassword')
+
+        self.assertEqual(self.queue.qsize(), 1)
+        self.tracker.note_failure.assert_called_once_with('u', '127.0.0.1')
+
+    async def test_unknown_user_is_rejected(self):
+        engine = SnmpEngine(rfc1902.OctetString(hexValue='8000000001020304'))
+        try:
+            await send_notification(
+                engine,
+                UsmUserData('other', 'oldauthpass', authProtocol=config.USM_AUTH_HMAC96_SHA),
+                await UdpTransportTarget.create(('127.0.0.1', self.port)),
+                ContextData(),
+                'trap',
+                NotificationType(ObjectIdentity('1.3.6.1.6.3.1.1.5.1'))
+            )
+        finally:
+            engine.close_dispatcher()
+        for _ in range(200):
+            if self.listener.ingest_stats['received']:
+                break
+            await asyncio.sleep(0.005)
+
+        self.assertEqual(self.listener.ingest_stats['parsed'], 0)
+        self.assertEqual(self.listener.get_stats()['credential_retries'], 0)
+        self.tracker.note_failure.assert_called_once_with('other', '127.0.0.1')
+
+
+if __name__ == '__main__':
+    unittest.main()
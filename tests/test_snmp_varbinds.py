@@ -0,0 +1,82 @@
+import unittest
+from unittest.mock import Mock
+from pyasn1.type import univ
+from pysnmp.proto import rfc1155, rfc1902
+from mutt.listeners import snmp_varbinds
+from mutt.listeners.snmp_varbinds import (
+    SNMP_TRAP_OID, render_oid, render_value, render_varbinds, render_varbinds_pretty
+)
+
+
+VALUES = [
+    rfc1902.Integer(-3),
+    rfc1902.Integer32(2 ** 31 - 1),
+    rfc1902.Counter32(7),
+    rfc1902.Counter64(2 ** 40),
+    rfc1902.Gauge32(3),
+    rfc1902.Unsigned32(4),
+    rfc1902.TimeTicks(123456),
+    rfc1902.OctetString("GigabitEthernet0/1"),
+    rfc1902.OctetString(""),
+    rfc1902.OctetString("two\nlines"),
+    rfc1902.OctetString(b"\x00\x1b\x21\xff\x00\x01"),
+    rfc1902.OctetString(b"caf\xc3\xa9"),
+    rfc1902.OctetString(b"del\x7f"),
+    rfc1902.Opaque(b"\x01\x02"),
+    rfc1902.IpAddress("192.0.2.1"),
+    rfc1155.IpAddress("10.0.0.1"),
+    rfc1902.ObjectIdentifier("1.3.6.1.6.3.1.1.5.3"),
+    rfc1902.Bits(b"\x80"),
+    univ.Null(""),
+]
+
+
+class TestVarbindRendering(unittest.TestCase):
+    """Test fast varbind rendering against prettyPrint()."""
+
+    def test_values_match_pretty_print(self):
+        for value in VALUES:
+            with self.subTest(value=type(value).__name__):
+                self.assertEqual(render_value(value), value.prettyPrint())
+
+    def test_render_oid_is_cached(self):
+        oid = (1, 3, 6, 1, 2, 1, 1, 3, 0)
+        first = render_oid(oid)
+        self.assertEqual(first, "1.3.6.1.2.1.1.3.0")
+        self.assertIs(render_oid(oid), first)
+
+    def test_oid_cache_is_bounded(self):
+        original = snmp_varbinds.OID_CACHE_SIZE
+        snmp_varbinds.OID_CACHE_SIZE = 4
+        self.addCleanup(setattr, snmp_varbinds, "OID_CACHE_SIZE", original)
+        for n in range(10):
+            render_oid((1, 3, n))
+        self.assertLessEqual(len(snmp_varbinds._oid_strings), 4)
+
+    def test_render_varbinds_finds_trap_oid(self):
+        var_binds = [
+            (rfc1902.ObjectName("1.3.6.1.2.1.1.3.0"), rfc1902.TimeTicks(42)),
+            (rfc1902.ObjectName(".".join(map(str, SNMP_TRAP_OID))),
+             rfc1902.ObjectIdentifier("1.3.6.1.6.3.1.1.5.3")),
+            (rfc1902.ObjectName("1.3.6.1.2.1.2.2.1.2.3"), rfc1902.OctetString("Gi0/3")),
+        ]
+        rendered, trap_oid = render_varbinds(var_binds)
+        self.assertEqual(trap_oid, "1.3.6.1.6.3.1.1.5.3")
+        self.assertEqual(rendered, {
+            "1.3.6.1.2.1.1.3.0": "42",
+            "1.3.6.1.6.3.1.1.4.1.0": "1.3.6.1.6.3.1.1.5.3",
+            "1.3.6.1.2.1.2.2.1.2.3": "Gi0/3",
+        })
+        self.assertEqual(render_varbinds_pretty(var_binds), (rendered, trap_oid))
+
+    def test_non_pyasn1_objects_use_pretty_print(self):
+        name, value = Mock(), Mock()
+        name.prettyPrint.return_value = "SNMPv2-MIB::snmpTrapOID.0"
+        value.prettyPrint.return_value = "1.3.6.1.4.1.9.9.41.2.0.1"
+        rendered, trap_oid = render_varbinds([(name, value)])
+        self.assertEqual(rendered, {"SNMPv2-MIB::snmpTrapOID.0": "1.3.6.1.4.1.9.9.41.2.0.1"})
+        self.assertEqual(trap_oid, "1.3.6.1.4.1.9.9.41.2.0.1")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+import os
+import shutil
+import tempfile
+from mutt.storage.database import Database
+from mutt.storage.writer import StorageWriter
+from mutt.storage.device_registry import DeviceRegistry
+from mutt.storage.auth_failure_tracker import AuthFailureTracker
+from mutt.models.message import Message, MessageType, Severity
+
+
+class TestStorageWriter(unittest.IsolatedAsyncioTestCase):
+    """Test StorageWriter grouping and confirmation."""
+
+    async def asyncSetUp(self):
+        """Set up a temporary database and a running writer."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.database = Database(os.path.join(self.temp_dir, 'test.db'))
+        await self.database.initialize()
+        self.writer = StorageWriter(self.database, max_batch_intents=1000, max_batch_delay=0.05)
+        await self.writer.start()
+
+    async def asyncTearDown(self):
+        """Stop the writer and clean up."""
+        await self.writer.stop()
+        if self.database.connection:
+            await self.database.connection.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    async def _count(self, table):
+        cursor = await self.database.execute(f"SELECT COUNT(*) FROM {table}")
+        row = await cursor.fetchone()
+        return row[0]
+
+    async def test_intents_grouped_into_few_transactions(self):
+        """Test that queued intents share transactions."""
+        registry = DeviceRegistry(self.database, writer=self.writer)
+        for i in range(200):
+            await registry.update_device(f"10.0.0.{i}", hostname=f"host{i}")
+
+        future = await self.writer.submit("SELECT 1", confirm=True)
+        await future
+
+        stats = self.writer.get_stats()
+        self.assertEqual(await self._count("devices"), 200)
+        self.assertEqual(stats["intents"], 201)
+        self.assertLess(stats["transactions"], 10)
+        self.assertLess(stats["write_amplification"], 0.1)
+
+    async def test_unconfirmed_submit_returns_none(self):
+        """Test that callers only get a future when they ask for one."""
+        result = await self.writer.submit("SELECT 1")
+        self.assertIsNone(result)
+
+    async def test_store_messages_waits_for_commit(self):
+        """Test batch message storage through the writer."""
+        messages = [
+            Message(
+                source_ip="10.0.0.1",
+                message_type=MessageType.SYSLOG,
+                severity=Severity.INFO,
+                payload=f"message {i}"
+            )
+            for i in range(50)
+        ]
+
+        stored = await self.writer.store_messages(messages)
+
+        self.assertEqual(stored, 50)
+        self.assertEqual(await self._count("messages"), 50)
+
+    async def test_failed_intent_does_not_discard_group(self):
+        """Test that one failing intent is isolated from the rest of its group."""
+        await self.writer.submit(
+            "INSERT INTO devices (ip, hostname) VALUES (?, ?)", ("10.0.0.1", "a")
+        )
+        bad = await self.writer.submit("INSERT INTO no_such_table VALUES (1)", confirm=True)
+        good = await self.writer.submit(
+            "INSERT INTO devices (ip, hostname) VALUES (?, ?)", ("10.0.0.2", "b"), confirm=True
+        )
+
+        with self.assertRaises(Exception):
+            await bad
+        await good
+
+        self.assertEqual(await self._count("devices"), 2)
+        self.assertEqual(self.writer.get_stats()["failed_intents"], 1)
+
+    async def test_transaction_is_atomic(self):
+        """Test that statements of one intent commit or fail together."""
+        future = await self.writer.submit_transaction([
+            ("INSERT INTO devices (ip) VALUES (?)", ("10.0.0.9",), False),
+            ("INSERT INTO devices (ip) VALUES (?)", ("10.0.0.9",), False),
+        ], confirm=True)
+
+        with self.assertRaises(Exception):
+            await future
+        self.assertEqual(await self._count("devices"), 0)
+
+    async def test_stop_drains_pending_intents(self):
+        """Test that stop() applies everything already queued."""
+        tracker = AuthFailureTracker(self.database, writer=self.writer)
+        for _ in range(5):
+            await tracker.record_failure('user1', 'host1')
+
+        await self.writer.stop()
+
+        failures = await tracker.get_all_failures()
+        self.assertEqual(failures[0]['num_failures'], 5)
+        self.assertFalse(self.writer.is_running)
+
+    async def test_submit_fails_when_not_running(self):
+        """Test that submitting to a stopped writer raises instead of hanging."""
+        await self.writer.stop()
+        with self.assertRaises(RuntimeError):
+            await self.writer.store_messages([Message(
+                source_ip='10.0.0.1', message_type=MessageType.SYSLOG,
+                severity=Severity.INFO, payload='late'
+            )])
+
+        tracker = AuthFailureTracker(self.database, writer=self.writer)
+        tracker.note_failure('user1', 'host1')
+        self.assertEqual(await tracker.flush(), 0)
+        self.assertEqual(tracker.get_stats()[0]['pending'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,9 @@
 import unittest
 import asyncio
+import os
+import socket
 from mutt.listeners.syslog_listener import SyslogListener
+from mutt.message_queue import BoundedMessageQueue
 from mutt.models.message import Severity, SyslogMessage
 
 class TestSyslogListener(unittest.IsolatedAsyncioTestCase):
@@ -41,6 +44,82 @@ class TestSyslogListener(unittest.IsolatedAsyncioTestCase):
         
         msg = queue.get_nowait()
         self.assertEqual(msg.payload, "test message")
+    async def test_batch_receive_mode(self):
+        queue = BoundedMessageQueue(max_size=1000)
+        listener = SyslogListener(queue, port=0, host="127.0.0.1",
+                                  receive_mode="batch", batch_size=16)
+        await listener.start()
+        try:
+            port = listener._sock.getsockname()[1]
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                for n in range(40):
+                    sock.sendto(f"<134>Jan 09 20:30:00 myhost myproc: line {n}".encode(),
+                                ("127.0.0.1", port))
+                sock.sendto("plain \u00e9 text".encode(), ("127.0.0.1", port))
+            
+            received = [await asyncio.wait_for(queue.get(), timeout=2) for _ in range(41)]
+        finally:
+            await listener.stop()
+        
+        self.assertEqual([m.payload for m in received[:40]], [f"line {n}" for n in range(40)])
+        self.assertEqual(received[0].process_name, "myproc")
+        self.assertEqual(received[0].source_ip, "127.0.0.1")
+        self.assertEqual(received[40].payload, "plain \u00e9 text")
+        
+        stats = listener.get_receive_stats()
+        self.assertEqual(stats["datagrams"], 41)
+        self.assertLessEqual(stats["max_batch"], 16)
+        self.assertFalse(listener.is_running)
+    
+    def test_invalid_receive_mode(self):
+        with self.assertRaises(ValueError):
+            SyslogListener(asyncio.Queue(), receive_mode="recvmmsg")
+    
+    async def test_ingest_stats(self):
+        listener = SyslogListener(asyncio.Queue())
+        listener.process_data(b"<134>Jan 09 20:30:00 myhost myproc: one", ("127.0.0.1", 514))
+        listener.process_data(b"two", ("127.0.0.1", 514))
+        
+        stats = listener.get_ingest_stats()
+        self.assertEqual((stats["received"], stats["parsed"], stats["enqueued"]), (2, 2, 2))
+        self.assertIsNone(stats["kernel_dropped"])
+        self.assertEqual(stats["loss_rate"], 0.0)
+    
+    async def test_policy_drops_are_not_counted_as_enqueued(self):
+        listener = SyslogListener(BoundedMessageQueue(max_size=1))
+        for n in range(3):
+            listener.process_data(f"<134>Jan 09 20:30:00 myhost myproc: {n}".encode(), ("127.0.0.1", 514))
+        listener._enqueue_batch([listener._parse_datagram(b"batched", "127.0.0.1")])
+        
+        stats = listener.get_ingest_stats()
+        self.assertEqual((stats["parsed"], stats["enqueued"]), (3, 1))
+        self.assertEqual(listener.queue.get_stats()["dropped_newest"], 3)
+    
+    @unittest.skipUnless(os.path.exists("/proc/net/udp"), "needs /proc/net/udp")
+    async def test_kernel_drops_are_counted(self):
+        queue = BoundedMessageQueue(max_size=100000)
+        listener = SyslogListener(queue, port=0, host="127.0.0.1",
+                                  receive_mode="batch", recv_buffer_size=4096)
+        await listener.start()
+        try:
+            port = listener._sock.getsockname()[1]
+            self.assertLessEqual(listener._sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF), 16384)
+            # The event loop does not run while sending, so the small buffer overflows
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                for n in range(500):
+                    sock.sendto(f"<134>Jan 09 20:30:00 myhost myproc: line {n}".encode(),
+                                ("127.0.0.1", port))
+            await asyncio.sleep(0.1)
+            
+            stats = listener.get_ingest_stats()
+        finally:
+            await listener.stop()
+        
+        self.assertGreater(stats["kernel_dropped"], 0)
+        self.assertEqual(stats["received"] + stats["kernel_dropped"], 500)
+        self.assertEqual(stats["enqueued"], queue.qsize())
+        self.assertAlmostEqual(stats["loss_rate"], stats["kernel_dropped"] / 500)
+        self.assertIsNone(listener.kernel_drops())
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,207 @@
+import unittest
+import asyncio
+import json
+import random
+from mutt.listeners.syslog_listener import SyslogListener
+from mutt.listeners.syslog_parser import (
+    parse_rfc3164, parse_rfc3164_regex, parse_rfc5424, split_tag
+)
+from mutt.models.message import Severity
+from mutt.storage.database import Database
+
+# Representative lines from real devices, all in the common layout
+CORPUS = [
+    b"<134>Jan 09 20:30:00 myhost myproc: test message",
+    b"<14>Oct 11 22:14:15 myhost test: integration-test-message",
+    b"<189>Oct  1 03:04:05 core-sw-01 %LINK-3-UPDOWN: Interface GigabitEthernet0/1, changed state to down",
+    b"<38>Feb 28 23:59:59 fw01.dc1.example.com sshd[20841]: Failed password for root from 10.1.1.1 port 22 ssh2",
+    b"<86>Mar  3 12:00:00 web_01 CRON[1234]: (root) CMD (run-parts /etc/cron.hourly)",
+    b"<0>Dec 31 00:00:00 h kernel: panic: attempted to kill init!",
+    b"<191>Jul 14 08:15:30 ap-7 hostapd: wlan0: STA 00:11:22:33:44:55 IEEE 802.11: associated",
+    b"<13>Apr 01 01:01:01 sw1 snmpd[99]:   leading spaces in payload   ",
+    b"<13>Apr 01 01:01:01 sw1 app name with spaces: message",
+    b"<13>Apr 01 01:01:01 sw1 app: caf\xc3\xa9 na\xc3\xafve \xe2\x9c\x93",
+    b"<13>Apr 01 01:01:01 sw1 app[12]:",
+    b"<165>Aug 24 05:34:00 10.0.0.1 ntpd[1]: time reset +0.2 s\n",
+    b"<13>Apr 01 01:01:01 sw1 app: trailing nbsp\xc2\xa0",
+]
+
+# Lines the fast path must hand to the regex (or the unstructured fallback)
+ODD = [
+    b"invalid message",
+    b"<13>Apr 01 01:01:01\tsw1 app: tab separated",
+    b"<13>Apr 01  01:01:01 sw1 app: two spaces before time",
+    b"<13>Apr 01 01:01:01 sw1  app: two spaces before tag",
+    b"<13>Apr 01 01:01:01 s\xc3\xa9w app: non-ascii host",
+    b"<13>Apr 01 01:01:01 sw1 \x1capp: separator control char",
+    b"<13>Apr 01 01:01:01 sw1 no colon anywhere",
+    b"<13>Apr 01 01:01:01 sw1 :empty tag",
+    b"<13>2024-01-01T00:00:00Z sw1 app: iso timestamp",
+    b"<1234567>Apr 01 01:01:01 sw1 app: long pri",
+    b"\xc2\xa0<13>Apr 01 01:01:01 sw1 app: leading nbsp",
+    b"<>Apr 01 01:01:01 sw1 app: empty pri",
+    b"<13>Apr",
+    b"",
+]
+
+
+def fast_fields(data):
+    return parse_rfc3164(data.decode("utf-8", errors="replace"))
+
+
+def regex_fields(data):
+    return parse_rfc3164_regex(data.decode("utf-8", errors="replace").strip())
+
+
+class TestSyslogParser(unittest.TestCase):
+    """Test the RFC 3164 header fast path against SYSLOG_REGEX."""
+
+    def test_corpus_uses_fast_path(self):
+        for line in CORPUS:
+            fields = fast_fields(line)
+            self.assertIsNotNone(fields, line)
+            self.assertEqual(fields, regex_fields(line), line)
+
+    def test_odd_inputs_fall_back(self):
+        for line in ODD:
+            self.assertIsNone(fast_fields(line), line)
+
+    def test_fast_path_agrees_with_regex_on_mutations(self):
+        rng = random.Random(3164)
+        alphabet = b" \t:<>[]0123456789abcXYZ.-_\xc3\xa9\xff\n"
+        for _ in range(20000):
+            line = bytearray(rng.choice(CORPUS))
+            for _ in range(rng.randint(1, 3)):
+                pos = rng.randrange(len(line) + 1)
+                op = rng.random()
+                if op < 0.4 and pos < len(line):
+                    line[pos] = rng.choice(alphabet)
+                elif op < 0.7:
+                    line.insert(pos, rng.choice(alphabet))
+                elif pos < len(line):
+                    del line[pos]
+            line = bytes(line)
+            fields = fast_fields(line)
+            if fields is not None:
+                self.assertEqual(fields, regex_fields(line), line)
+
+    def test_split_tag(self):
+        self.assertEqual(split_tag("sshd[20841]"), ("sshd", 20841))
+        self.assertEqual(split_tag("kernel"), ("kernel", None))
+        self.assertEqual(split_tag("app[abc]"), ("app[abc]", None))
+        self.assertEqual(split_tag("[12]"), ("[12]", None))
+        self.assertEqual(split_tag("%LINK-3-UPDOWN"), ("%LINK-3-UPDOWN", None))
+
+
+class TestSyslogListenerParsing(unittest.TestCase):
+    """Test that both listener parse paths build the same messages."""
+
+    def test_datagram_and_text_paths_agree(self):
+        listener = SyslogListener(asyncio.Queue())
+        for line in CORPUS + ODD:
+            fast = listener._parse_datagram(line, "10.0.0.1")
+            slow = listener._parse_syslog_message(line.decode("utf-8", errors="replace").strip(), "10.0.0.1")
+            for attr in ("severity", "payload", "facility", "priority", "hostname",
+                         "process_name", "process_id", "metadata"):
+                self.assertEqual(getattr(fast, attr), getattr(slow, attr), (line, attr))
+
+    def test_pid_and_timestamp_populated(self):
+        listener = SyslogListener(asyncio.Queue())
+        msg = listener._parse_datagram(CORPUS[3], "10.0.0.1")
+        self.assertEqual(msg.process_name, "sshd")
+        self.assertEqual(msg.process_id, 20841)
+        self.assertEqual(msg.hostname, "fw01.dc1.example.com")
+        self.assertEqual(msg.metadata["syslog_timestamp"], "Feb 28 23:59:59")
+
+
+class TestRFC5424Parser(unittest.TestCase):
+    """Test RFC 5424 parsing, using the examples from the RFC where possible."""
+
+    def test_no_structured_data(self):
+        fields = parse_rfc5424(
+            "<34>1 2003-10-11T22:14:15.003Z mymachine.example.com su - ID47 - "
+            "\ufeff'su root' failed for lonvick on /dev/pts/8"
+        )
+        self.assertEqual(fields, (
+            34, 1, "2003-10-11T22:14:15.003Z", "mymachine.example.com", "su", None, "ID47",
+            {}, "'su root' failed for lonvick on /dev/pts/8"
+        ))
+
+    def test_structured_data_elements(self):
+        fields = parse_rfc5424(
+            '<165>1 2003-10-11T22:14:15.003Z mymachine.example.com evntslog 8710 ID47 '
+            '[exampleSDID@32473 iut="3" eventSource="Application" eventID="1011"]'
+            '[examplePriority@32473 class="high"] An application event log entry...'
+        )
+        self.assertEqual(fields[5], "8710")
+        self.assertEqual(fields[7], {
+            "exampleSDID@32473": {"iut": "3", "eventSource": "Application", "eventID": "1011"},
+            "examplePriority@32473": {"class": "high"},
+        })
+        self.assertEqual(fields[8], "An application event log entry...")
+
+    def test_escapes_and_nil_values(self):
+        fields = parse_rfc5424('<13>1 - - - - - [meta note="a \\"quoted\\" \\] and \\\\"]')
+        self.assertEqual(fields[2:7], (None, None, None, None, None))
+        self.assertEqual(fields[7], {"meta": {"note": 'a "quoted" ] and \\'}})
+        self.assertEqual(fields[8], "")
+
+    def test_line_terminated_without_msg(self):
+        for end in ["\n", "\r\n"]:
+            fields = parse_rfc5424('<165>1 2003-10-11T22:14:15.003Z host app 1 ID47 [ex@1 a="b"]' + end)
+            self.assertEqual(fields[7], {"ex@1": {"a": "b"}})
+            self.assertEqual(fields[8], "")
+
+            fields = parse_rfc5424("<165>1 2003-10-11T22:14:15.003Z host app 1 ID47 -" + end)
+            self.assertEqual(fields[6:], ("ID47", {}, ""))
+
+    def test_malformed_structured_data_kept_as_payload(self):
+        for line in ['<13>1 - host app - - [bad x=1] msg', '<13>1 - host app - - [a]x msg',
+                     '<13>1 - host app - - [unterminated x="1" msg']:
+            fields = parse_rfc5424(line)
+            self.assertEqual(fields[3], "host")
+            self.assertEqual(fields[7], {})
+            self.assertTrue(fields[8].startswith("["), line)
+
+    def test_not_rfc5424(self):
+        self.assertIsNone(parse_rfc5424("<13>Oct 11 22:14:15 h t: m"))
+        self.assertIsNone(parse_rfc5424("plain text"))
+        self.assertIsNone(parse_rfc5424("<13>1 only three fields"))
+
+    def test_listener_autodetects_format(self):
+        queue = asyncio.Queue()
+        listener = SyslogListener(queue)
+        listener.process_data(
+            b'<165>1 2003-10-11T22:14:15.003Z mymachine.example.com evntslog 8710 ID47 '
+            b'[origin ip="192.0.2.1"] link down', ("10.0.0.1", 514)
+        )
+        listener.process_data(b"<13>1 - - appx worker-3 - - started", ("10.0.0.2", 514))
+        listener.process_data(b"<134>Jan 09 20:30:00 myhost myproc: test message", ("10.0.0.3", 514))
+
+        msg = queue.get_nowait()
+        self.assertEqual(msg.payload, "link down")
+        self.assertEqual(msg.hostname, "mymachine.example.com")
+        self.assertEqual(msg.process_name, "evntslog")
+        self.assertEqual(msg.process_id, 8710)
+        self.assertEqual(msg.msg_id, "ID47")
+        self.assertEqual(msg.severity, Severity.NOTICE)
+        self.assertEqual(msg.structured_data, {"origin": {"ip": "192.0.2.1"}})
+        self.assertEqual(msg.metadata["syslog_timestamp"], "2003-10-11T22:14:15.003Z")
+
+        metadata = json.loads(Database.message_row(msg)[6])
+        self.assertEqual(metadata["msg_id"], "ID47")
+        self.assertEqual(metadata["structured_data"], {"origin": {"ip": "192.0.2.1"}})
+
+        msg = queue.get_nowait()
+        self.assertEqual(msg.hostname, "unknown")
+        self.assertIsNone(msg.process_id)
+        self.assertEqual(msg.metadata["procid"], "worker-3")
+
+        msg = queue.get_nowait()
+        self.assertEqual(msg.process_name, "myproc")
+        self.assertIsNone(msg.msg_id)
+        self.assertEqual(msg.structured_data, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,182 @@
+import unittest
+import asyncio
+import os
+import random
+import shutil
+import ssl
+import subprocess
+import tempfile
+from mutt.listeners.syslog_tcp_listener import (
+    FramingError, SyslogFramer, SyslogTCPListener, create_server_ssl_context
+)
+from mutt.message_queue import BoundedMessageQueue
+from mutt.models.message import SyslogMessage
+
+
+LINES = [
+    b"<134>Jan 09 20:30:00 myhost myproc: first",
+    b"<13>1 2003-10-11T22:14:15.003Z host app 12 ID1 [origin ip=\"192.0.2.1\"] second\nwith newline",
+    b"<38>Feb 28 23:59:59 fw01 sshd[42]: third",
+]
+
+
+def octet_counted(line):
+    return str(len(line)).encode() + b" " + line
+
+
+class TestSyslogFramer(unittest.TestCase):
+    """Test RFC 6587 framing independent of the network."""
+
+    def test_octet_counting(self):
+        framer = SyslogFramer()
+        frames = framer.feed_data(b"".join(octet_counted(line) for line in LINES))
+        self.assertEqual(frames, LINES)
+
+    def test_lf_framing(self):
+        framer = SyslogFramer()
+        frames = framer.feed_data(b"<13>a: one\n<13>a: two\r\n\n<13>a: three\n")
+        self.assertEqual(frames, [b"<13>a: one", b"<13>a: two", b"<13>a: three"])
+
+    def test_mixed_framing_split_at_every_boundary(self):
+        stream = (octet_counted(LINES[1]) + LINES[0] + b"\n" + octet_counted(LINES[2])) * 20
+        rng = random.Random(7)
+        for _ in range(50):
+            framer = SyslogFramer(max_frame_size=256)
+            frames = []
+            pos = 0
+            while pos < len(stream):
+                step = rng.randint(1, 40)
+                frames.extend(framer.feed_data(stream[pos:pos + step]))
+                pos += step
+            self.assertEqual(frames, [LINES[1], LINES[0], LINES[2]] * 20)
+
+    def test_oversized_octet_count_is_an_error(self):
+        framer = SyslogFramer(max_frame_size=100)
+        with self.assertRaises(FramingError):
+            framer.feed_data(b"101 " + b"x" * 101)
+        with self.assertRaises(FramingError):
+            SyslogFramer().feed_data(b"12x <13>a: b")
+
+    def test_oversized_lf_frame_is_truncated(self):
+        framer = SyslogFramer(max_frame_size=10)
+        frames = framer.feed_data(b"<13>" + b"x" * 30 + b"\n<13>a: ok\n")
+        self.assertEqual(frames, [b"<13>xxxxxx", b"<13>a: ok"])
+        self.assertEqual(framer.truncated, 1)
+
+    def test_flush_returns_unterminated_lf_frame(self):
+        framer = SyslogFramer()
+        self.assertEqual(framer.feed_data(b"<13>a: one\n<13>a: two"), [b"<13>a: one"])
+        self.assertEqual(bytes(framer.flush()), b"<13>a: two")
+        self.assertIsNone(framer.flush())
+        framer.feed_data(b"50 <13>a: partial")
+        self.assertIsNone(framer.flush())
+
+
+class TestSyslogTCPListener(unittest.IsolatedAsyncioTestCase):
+    """Test syslog over TCP and TLS on localhost."""
+
+    async def _start(self, queue, **kwargs):
+        listener = SyslogTCPListener(queue, port=0, host="127.0.0.1", **kwargs)
+        await listener.start()
+        self.addAsyncCleanup(listener.stop)
+        return listener, listener.server.sockets[0].getsockname()[1]
+
+    async def test_receive_over_tcp(self):
+        queue = asyncio.Queue()
+        listener, port = await self._start(queue)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"".join(octet_counted(line) for line in LINES))
+        writer.write(b"<134>Jan 09 20:30:00 myhost myproc: lf framed\n<134>Jan 09 20:30:00 myhost myproc: no trailer")
+        await writer.drain()
+        writer.write_eof()
+
+        received = [await asyncio.wait_for(queue.get(), timeout=2) for _ in range(5)]
+        writer.close()
+        await writer.wait_closed()
+
+        self.assertTrue(all(isinstance(m, SyslogMessage) for m in received))
+        self.assertEqual([m.payload for m in received],
+                         ["first", "second\nwith newline", "third", "lf framed", "no trailer"])
+        self.assertEqual(received[1].structured_data, {"origin": {"ip": "192.0.2.1"}})
+        self.assertEqual(received[0].source_ip, "127.0.0.1")
+        self.assertEqual(listener.get_stats()["frames"], 5)
+
+    async def test_framing_error_closes_connection(self):
+        queue = asyncio.Queue()
+        listener, port = await self._start(queue)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"99999999999 nonsense")
+        self.assertEqual(await asyncio.wait_for(reader.read(), timeout=2), b"")
+        writer.close()
+        self.assertEqual(listener.get_stats()["framing_errors"], 1)
+
+    async def test_connection_limit(self):
+        listener, port = await self._start(asyncio.Queue(), max_connections=2)
+        writers = []
+        for _ in range(2):
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writers.append(writer)
+        await asyncio.sleep(0.05)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        self.assertEqual(await asyncio.wait_for(reader.read(), timeout=2), b"")
+        writers.append(writer)
+
+        stats = listener.get_stats()
+        self.assertEqual(stats["active_connections"], 2)
+        self.assertEqual(stats["connections_rejected"], 1)
+        for writer in writers:
+            writer.close()
+
+    async def test_pauses_reading_under_backpressure(self):
+        queue = BoundedMessageQueue(max_size=100, high_watermark=0.1, low_watermark=0.0)
+        listener, port = await self._start(queue)
+        queue.add_watermark_callback(listener.on_backpressure)
+
+        _, writer = await asyncio.open_connection("127.0.0.1", port)
+        for n in range(10):
+            writer.write(f"<134>Jan 09 20:30:00 myhost myproc: line {n}\n".encode())
+        await writer.drain()
+        while queue.qsize() < 10:
+            await asyncio.sleep(0.01)
+        self.assertTrue(listener.get_stats()["paused"])
+
+        # Nothing is read while paused
+        writer.write(b"<134>Jan 09 20:30:00 myhost myproc: held back\n")
+        await writer.drain()
+        await asyncio.sleep(0.1)
+        self.assertEqual(queue.qsize(), 10)
+
+        for _ in range(10):
+            queue.get_nowait()
+        msg = await asyncio.wait_for(queue.get(), timeout=2)
+        self.assertEqual(msg.payload, "held back")
+        self.assertFalse(listener.get_stats()["paused"])
+        writer.close()
+
+    @unittest.skipUnless(shutil.which("openssl"), "openssl CLI not available")
+    async def test_receive_over_tls(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            certfile = os.path.join(tmp, "cert.pem")
+            keyfile = os.path.join(tmp, "key.pem")
+            subprocess.run(
+                ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+                 "-subj", "/CN=localhost", "-keyout", keyfile, "-out", certfile],
+                check=True, capture_output=True
+            )
+            server_context = create_server_ssl_context(certfile, keyfile)
+            client_context = ssl.create_default_context(cafile=certfile)
+            client_context.check_hostname = False
+
+        queue = asyncio.Queue()
+        listener, port = await self._start(queue, ssl_context=server_context)
+        _, writer = await asyncio.open_connection("127.0.0.1", port, ssl=client_context)
+        writer.write(b"".join(octet_counted(line) for line in LINES))
+        await writer.drain()
+
+        received = [await asyncio.wait_for(queue.get(), timeout=5) for _ in range(3)]
+        writer.close()
+        self.assertEqual([m.payload for m in received], ["first", "second\nwith newline", "third"])
+
+
+if __name__ == '__main__':
+    unittest.main()
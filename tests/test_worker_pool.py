@@ -0,0 +1,117 @@
+import unittest
+import asyncio
+from mutt.models.message import Message, MessageType, Severity
+from mutt.processors.worker_pool import WorkerPool
+
+
+def make_msg(source_ip, payload):
+    return Message(source_ip=source_ip, message_type=MessageType.SYSLOG,
+                   severity=Severity.INFO, payload=payload)
+
+
+class TestWorkerPool(unittest.IsolatedAsyncioTestCase):
+    """Test the sharded pipeline worker pool."""
+
+    async def test_order_preserved_per_source(self):
+        seen = {}
+
+        async def handler(msgs):
+            for msg in msgs:
+                # Vary the await so unsharded processing would reorder
+                await asyncio.sleep(0.001 * (int(msg.payload) % 3))
+                seen.setdefault(msg.source_ip, []).append(int(msg.payload))
+
+        pool = WorkerPool(handler, workers=4)
+        await pool.start()
+        sources = [f"10.0.0.{i}" for i in range(8)]
+        for n in range(40):
+            for ip in sources:
+                await pool.submit(make_msg(ip, str(n)))
+        await pool.stop()
+
+        self.assertEqual(set(seen), set(sources))
+        for ip in sources:
+            self.assertEqual(seen[ip], list(range(40)))
+
+    async def test_slow_source_does_not_stall_others(self):
+        release = asyncio.Event()
+        done = []
+
+        async def handler(msgs):
+            for msg in msgs:
+                if msg.source_ip == "slow":
+                    await release.wait()
+                done.append(msg.source_ip)
+
+        pool = WorkerPool(handler, workers=4)
+        await pool.start()
+        slow_shard = pool.shard_for("slow")
+        fast_ip = next(f"10.0.0.{i}" for i in range(256) if pool.shard_for(f"10.0.0.{i}") != slow_shard)
+
+        await pool.submit(make_msg("slow", "x"))
+        await pool.submit(make_msg(fast_ip, "y"))
+        await asyncio.sleep(0.05)
+        self.assertEqual(done, [fast_ip])
+
+        release.set()
+        await pool.stop()
+        self.assertEqual(done, [fast_ip, "slow"])
+
+    async def test_stats_and_errors(self):
+        async def handler(msgs):
+            if msgs[0].payload == "bad":
+                raise ValueError("boom")
+
+        pool = WorkerPool(handler, workers=2)
+        await pool.start()
+        for payload in ["ok", "bad", "ok"]:
+            await pool.submit(make_msg("10.0.0.1", payload))
+        await pool.stop()
+
+        stats = pool.get_stats()
+        self.assertEqual(len(stats), 2)
+        shard = pool.shard_for("10.0.0.1")
+        self.assertEqual(stats[shard]["processed"], 3)
+        self.assertEqual(stats[shard]["errors"], 1)
+        self.assertEqual(stats[1 - shard]["processed"], 0)
+        self.assertEqual(pool.pending(), 0)
+
+    async def test_batches_fill_up_to_batch_size(self):
+        batches = []
+
+        async def handler(msgs):
+            batches.append([int(msg.payload) for msg in msgs])
+
+        pool = WorkerPool(handler, workers=1, batch_size=8, max_wait=0.05)
+        await pool.start()
+        for n in range(20):
+            await pool.submit(make_msg("10.0.0.1", str(n)))
+        await pool.stop()
+
+        self.assertEqual([n for batch in batches for n in batch], list(range(20)))
+        self.assertEqual([len(batch) for batch in batches], [8, 8, 4])
+        stats = pool.get_stats()[0]
+        self.assertEqual((stats["processed"], stats["batches"], stats["max_batch"]), (20, 3, 8))
+        self.assertAlmostEqual(stats["avg_batch"], 20 / 3)
+
+    async def test_max_wait_bounds_batch_latency(self):
+        batches = []
+
+        async def handler(msgs):
+            batches.append((asyncio.get_running_loop().time(), len(msgs)))
+
+        pool = WorkerPool(handler, workers=1, batch_size=100, max_wait=0.02)
+        await pool.start()
+        submitted = asyncio.get_running_loop().time()
+        await pool.submit(make_msg("10.0.0.1", "1"))
+        await asyncio.sleep(0.1)
+        await pool.stop()
+
+        self.assertEqual(len(batches), 1)
+        handled_at, size = batches[0]
+        self.assertEqual(size, 1)
+        self.assertLess(handled_at - submitted, 0.08)
+
+
+if __name__ == '__main__':
+    unittest.main()